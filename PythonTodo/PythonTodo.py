@@ -1,13 +1,34 @@
 ﻿import os
+import sys
 import time
+import random
 import datetime
-import threading
+import json
+import array
+import lzma
+import gzip
+import zlib
+import mmap
+import gc
+import shutil
+import signal
+import atexit
+import sqlite3
+import argparse
 import configparser
+import builtins
+import collections
+import threading
+from http import HTTPStatus
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，改用 msvcrt 的字节区间锁
+    fcntl = None
+    import msvcrt
 
 # ========== 核心配置 - 无改动 ==========
 TODO_FILE = "todo_list.txt"
 CONFIG_FILE = "todo_config.configrecorderPythonTodo"  # 专属后缀配置文件
-current_time_str = ""
 ADMIN_PASSWORD = "sun130202"
 STATUS_MAP = {
     0: ("❌ 未完成", "未完成"),
@@ -28,180 +49,2414 @@ FUNCTIONS = {
     "clear_today": "清空今日所有待办",
     "postpone_todo": "顺延今日任务至明天",
     "postpone_yesterday": "顺延昨日任务至今天",  # 新增顺延昨日功能
+    "rollover_backlog": "补顺延积压任务至今天（多日）",
     "search_todo": "查询历史任务（输入日期）",
+    "search_content": "按内容搜索任务（关键词）",
+    "report": "任务完成率报表（按日/周/月）",
+    "recurring": "管理重复任务（每天/工作日/每周/每月）",
+    "switch_list": "切换/新建任务清单",
+    "all_lists_today": "查看全部清单的今日任务",
     "admin_entrance": "🔐 管理员调试入口"
 }
 
-# ========== 配置文件初始化与读写 ==========
-def init_config():
-    config = configparser.ConfigParser()
-    if not os.path.exists(CONFIG_FILE):
-        config["FUNCTION_SWITCH"] = {func: "1" for func in FUNCTIONS.keys()}
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            config.write(f)
-    config.read(CONFIG_FILE, encoding="utf-8")
-    return config
+# ========== 配置文件初始化与读写 ==========
+# 开关配置只在首次使用或文件修改时间变化时解析一次，其余查询全部走内存
+class SwitchRegistry:
+    def __init__(self):
+        self.config = None
+        self.file_stamp = None
+        self.read_count = 0  # 实际读取配置文件的次数，用于性能统计
+
+    def refresh(self):
+        stamp = get_file_stamp(CONFIG_FILE)
+        if stamp is None:
+            config = configparser.ConfigParser()
+            config["FUNCTION_SWITCH"] = {func: "1" for func in FUNCTIONS.keys()}
+            self.write(config)
+            stamp = self.file_stamp
+        if self.config is None or stamp != self.file_stamp:
+            config = configparser.ConfigParser()
+            config.read(CONFIG_FILE, encoding="utf-8")
+            self.read_count += 1
+            self.config = config
+            self.file_stamp = stamp
+        return self.config
+
+    def write(self, config):
+        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+            config.write(f)
+        self.config = config
+        self.file_stamp = get_file_stamp(CONFIG_FILE)
+
+    def get(self, func_name):
+        # 当前清单单独设置过的开关优先，否则用全局开关
+        config = self.refresh()
+        section = get_list_switch_section(list_manager.active)
+        if config.has_option(section, func_name):
+            return config.get(section, func_name) == "1"
+        return config.get("FUNCTION_SWITCH", func_name, fallback="1") == "1"
+
+    def set(self, func_name, status, list_name=None):
+        section = get_list_switch_section(list_name) if list_name else "FUNCTION_SWITCH"
+        self.set_option(section, func_name, "1" if status else "0")
+
+    def clear_list(self, list_name):
+        config = self.refresh()
+        if config.remove_section(get_list_switch_section(list_name)):
+            self.write(config)
+
+    def set_option(self, section, key, value):
+        config = self.refresh()
+        if not config.has_section(section):
+            config.add_section(section)
+        config[section][key] = value
+        self.write(config)
+
+switch_registry = SwitchRegistry()
+
+def init_config():
+    return switch_registry.refresh()
+
+def get_func_status(func_name):
+    return switch_registry.get(func_name)
+
+def set_func_status(func_name, status, list_name=None):
+    switch_registry.set(func_name, status, list_name)
+
+def get_list_switch_section(list_name):
+    return f"FUNCTION_SWITCH:{list_name}"
+
+# ========== 时间相关函数 补全昨日/明日日期 ==========
+WEEK_NAMES = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+
+def get_format_time():
+    now = datetime.datetime.now()
+    return now.strftime(f"%Y-%m-%d %H:%M:%S {WEEK_NAMES[now.weekday()]}")
+
+def get_today_date():
+    return datetime.datetime.now().strftime("%Y-%m-%d")
+
+def get_today_date_yyyymmdd():
+    return datetime.datetime.now().strftime("%Y%m%d")
+
+def get_yesterday_date():
+    # 获取昨日完整日期 2026-01-17
+    yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+    return yesterday.strftime("%Y-%m-%d")
+
+def get_yesterday_date_yyyymmdd():
+    yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
+    return yesterday.strftime("%Y%m%d")
+
+def get_tomorrow_date():
+    # 获取明日完整日期 2026-01-19
+    tomorrow = datetime.datetime.now() + datetime.timedelta(days=1)
+    return tomorrow.strftime("%Y-%m-%d")
+
+def date_convert(ymd_str):
+    if len(ymd_str) == 8 and ymd_str.isdigit():
+        return f"{ymd_str[:4]}-{ymd_str[4:6]}-{ymd_str[6:8]}"
+    return ""
+
+def date_range_convert(range_str):
+    # yyyymmdd 或 yyyymmdd-yyyymmdd，返回 (起始日期, 结束日期)，格式错误返回 None
+    start, _, end = range_str.partition("-")
+    date_from = date_convert(start.strip())
+    date_to = date_convert(end.strip()) if end else date_from
+    if not date_from or not date_to:
+        return None
+    return min(date_from, date_to), max(date_from, date_to)
+
+def parse_selection(selection, total):
+    # 支持 "3"、"1-5,8,12" 这样的序号/区间组合，返回去重后的升序序号列表；格式错误或越界返回 None
+    numbers = set()
+    for part in selection.replace("，", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        start, end = start.strip(), end.strip()
+        if not start.isdigit() or (sep and not end.isdigit()):
+            return None
+        start = int(start)
+        end = int(end) if sep else start
+        if start > end:
+            start, end = end, start
+        if start < 1 or end > total:
+            return None
+        numbers.update(range(start, end + 1))
+    return sorted(numbers) or None
+
+def status_filter_convert(status_str):
+    # 空输入表示不筛选；如 "0,2" 返回 {0, 2}，含非法状态返回 None
+    if not status_str:
+        return set(STATUS_MAP)
+    try:
+        statuses = {int(item) for item in status_str.replace("，", ",").split(",") if item.strip()}
+    except ValueError:
+        return None
+    return statuses if statuses and statuses <= set(STATUS_MAP) else None
+
+# ========== 任务对象 ==========
+# 历史任务可达百万条：用 __slots__ 去掉实例字典，日期存为整数天数、时分秒存为当天秒数，
+# 星期等后缀字符串全局共享；显示用的日期和创建时间字符串在读取时再拼出来，与原格式逐字一致
+date_day_cache = {}  # "2026-01-13" -> 天数，同一天的任务共用一个整数对象
+day_str_cache = {}   # 天数 -> "2026-01-13"
+clock_cache = {}     # 当天秒数的整数对象共享
+
+class Task:
+    __slots__ = ("id", "content", "status", "day", "clock", "suffix")
+
+    def __init__(self, task_id, content, status, day, clock, suffix):
+        self.id = task_id
+        self.content = content
+        self.status = status
+        self.day = day        # 日期的天数(date.toordinal)；无法识别的日期为 0
+        self.clock = clock    # 当天第几秒；无时分秒时为 -1
+        self.suffix = suffix  # 时分秒之后的部分，如 " 周二"；day 为 0 时保存完整创建时间
+
+    @property
+    def task_date(self):
+        if self.day:
+            return day_to_date(self.day)
+        return self.suffix.split(" ")[0]
+
+    @property
+    def create_time(self):
+        if not self.day:
+            return self.suffix
+        if self.clock < 0:
+            return day_to_date(self.day) + self.suffix
+        hour, rest = divmod(self.clock, 3600)
+        minute, second = divmod(rest, 60)
+        return f"{day_to_date(self.day)} {hour:02d}:{minute:02d}:{second:02d}{self.suffix}"
+
+def date_to_day(task_date):
+    day = date_day_cache.get(task_date)
+    if day is None:
+        day = 0
+        # 只接受标准的 yyyy-mm-dd，保证还原出的字符串与原文完全一致
+        if len(task_date) == 10 and task_date[4] == "-" and task_date[7] == "-":
+            try:
+                day = datetime.date.fromisoformat(task_date).toordinal()
+            except ValueError:
+                pass
+        date_day_cache[task_date] = day
+    return day
+
+def day_to_date(day):
+    task_date = day_str_cache.get(day)
+    if task_date is None:
+        task_date = datetime.date.fromordinal(day).isoformat()
+        day_str_cache[day] = task_date
+    return task_date
+
+def parse_clock(text):
+    if len(text) >= 8 and text[2] == ":" and text[5] == ":":
+        hour, minute, second = text[:2], text[3:5], text[6:8]
+        if hour.isdigit() and minute.isdigit() and second.isdigit():
+            hour, minute, second = int(hour), int(minute), int(second)
+            if hour < 24 and minute < 60 and second < 60:
+                clock = hour * 3600 + minute * 60 + second
+                return clock_cache.setdefault(clock, clock)
+    return -1
+
+def make_task(task_id, content, status, create_time):
+    day = date_to_day(create_time[:10]) if create_time[10:11] in ("", " ") else 0
+    if not day:
+        return Task(task_id, content, status, 0, -1, create_time)
+    clock = parse_clock(create_time[11:])
+    if clock < 0:
+        return Task(task_id, content, status, day, -1, sys.intern(create_time[10:]))
+    return Task(task_id, content, status, day, clock, sys.intern(create_time[19:]))
+
+# ========== 多进程写入保护：文件锁 + 代数计数 ==========
+# 同一份任务文件可能同时被多个 PythonTodo 进程（交互界面、命令行脚本）写入：
+# 所有写入都在 TODO_FILE.lock 的排他锁内进行，锁文件开头记录代数（每次提交加一），
+# 提交时若发现代数/文件戳与本进程加载时不同，说明内存视图已过期：记录仍按任务ID追加在别人之后，
+# 提交后重新加载合并，而不是用旧视图覆盖别人的修改
+LOCK_SUFFIX = ".lock"
+GENERATION_WIDTH = 20
+LOCK_RETRY_INTERVAL = 0.01
+storage_lock_depth = 0
+storage_lock_handle = None
+generation_cache = (None, 0)  # ((锁文件路径, 锁文件戳), 代数)
+
+def get_lock_file():
+    return TODO_FILE + LOCK_SUFFIX
+
+def acquire_file_lock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    # msvcrt 的锁是强制锁：锁住代数之后的一个字节，不影响其他进程不加锁读取代数
+    f.seek(GENERATION_WIDTH)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return
+        except OSError:
+            time.sleep(LOCK_RETRY_INTERVAL)
+
+def release_file_lock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(GENERATION_WIDTH)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class StorageLock:
+    # 可重入：压缩日志、迁移等在提交内部再次加锁时直接通过
+    def __enter__(self):
+        global storage_lock_depth, storage_lock_handle
+        if storage_lock_depth == 0:
+            f = open(get_lock_file(), "a+b")
+            acquire_file_lock(f)
+            storage_lock_handle = f
+        storage_lock_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global storage_lock_depth, storage_lock_handle
+        storage_lock_depth -= 1
+        if storage_lock_depth == 0:
+            release_file_lock(storage_lock_handle)
+            storage_lock_handle.close()
+            storage_lock_handle = None
+        return False
+
+def storage_lock():
+    return StorageLock()
+
+def read_generation_file(lock_file):
+    try:
+        with open(lock_file, "rb") as f:
+            return int(f.read(GENERATION_WIDTH) or 0)
+    except (OSError, ValueError):
+        return 0
+
+def read_generation():
+    # 锁文件的大小和修改时间都没变就沿用上次读到的代数：界面空闲重绘时只 stat，不打开文件
+    global generation_cache
+    lock_file = get_lock_file()
+    key = (lock_file, get_file_stamp(lock_file))
+    if generation_cache[0] != key:
+        generation_cache = (key, read_generation_file(lock_file))
+    return generation_cache[1]
+
+def bump_generation():
+    # 只能在持有锁时调用；定长写回，不截断文件；持锁时直接读文件，不用缓存
+    global generation_cache
+    lock_file = get_lock_file()
+    generation = read_generation_file(lock_file) + 1
+    with open(lock_file, "r+b") as f:
+        f.write(str(generation).zfill(GENERATION_WIDTH).encode("ascii"))
+    generation_cache = ((lock_file, get_file_stamp(lock_file)), generation)
+    return generation
+
+def atomic_write_lines(path, lines):
+    # 先写临时文件并落盘，再用 os.replace 原子替换：写到一半崩溃时原文件保持完整
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+# ========== 任务加载与保存 ==========
+# 存储由两部分组成：快照文件 TODO_FILE（完整任务列表）+ 日志文件（增量修改记录）
+# 日常增删改只往日志末尾追加一行，日志超过阈值后再压缩重建快照
+# 快照行格式：状态|内容|创建时间|任务ID；旧版的 2 段/3 段行加载时自动分配ID并回写
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_COMPACT_SIZE = 512 * 1024  # 日志超过该字节数时自动压缩进快照
+BASE36_CHARS = "0123456789abcdefghijklmnopqrstuvwxyz"
+last_id_ms = 0  # 上一个ID使用的毫秒时间戳，保证同一进程内ID严格递增
+legacy_line_count = 0  # 最近一次加载中缺少任务ID的旧格式行数
+
+def get_journal_file():
+    return TODO_FILE + JOURNAL_SUFFIX
+
+def to_base36(num):
+    chars = ""
+    while num:
+        num, rem = divmod(num, 36)
+        chars = BASE36_CHARS[rem] + chars
+    return chars or "0"
+
+def new_task_id():
+    # 12位紧凑ID：8位毫秒时间戳(36进制) + 4位随机数，同一秒内添加多条也不会重复
+    global last_id_ms
+    last_id_ms = max(last_id_ms + 1, time.time_ns() // 1_000_000)
+    return to_base36(last_id_ms).rjust(8, "0") + to_base36(random.randrange(36 ** 4)).rjust(4, "0")
+
+def is_create_time(text):
+    return len(text) >= 10 and text[4] == "-" and text[:4].isdigit()
+
+def parse_todo_line(line, today):
+    # 返回 (任务ID, 状态, 内容, 创建时间)；旧格式行的任务ID为 None
+    head, _, task_id = line.rpartition("|")
+    status_content, _, create_time = head.rpartition("|")
+    if "|" in status_content and is_create_time(create_time):
+        status, content = status_content.split("|", 1)
+    else:
+        task_id = None
+        line_split = line.split("|", 2)
+        if len(line_split) == 2:
+            status, content = line_split
+            create_time = f"{today} 00:00:00 历史任务"
+        else:
+            status, content, create_time = line_split
+    return task_id, parse_status(status), content, create_time
+
+def parse_status(text):
+    # 无法识别的状态量按未完成处理
+    try:
+        status_int = int(text)
+    except ValueError:
+        return 0
+    return status_int if status_int in STATUS_MAP else 0
+
+def load_text_todos(is_today_only=True):
+    global legacy_line_count
+    if is_today_only:
+        today = get_today_date()
+        return list(iter_text_todos(today, today))
+    todos = {}
+    today = get_today_date()
+    legacy_line_count = 0
+    # 批量创建上百万个任务对象时分代垃圾回收会被反复触发却回收不到东西，加载期间暂停，结束后恢复原状
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if os.path.exists(TODO_FILE):
+            chunks = parse_snapshot_parallel(TODO_FILE, today)
+            if chunks is None:
+                with open(TODO_FILE, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            task_id, status_int, content, create_time = parse_todo_line(line, today)
+                            if task_id is None:
+                                task_id = new_task_id()
+                                legacy_line_count += 1
+                            todos[task_id] = make_task(task_id, content, status_int, create_time)
+            else:
+                # 按块的顺序合并：旧格式行在这里按文件顺序分配ID；天数/秒数换成共享的整数对象，与逐行加载一样省内存
+                days = {}
+                for columns in chunks:
+                    for task_id, content, status_int, day, clock, suffix in zip(*columns):
+                        if task_id is None:
+                            task_id = new_task_id()
+                            legacy_line_count += 1
+                        todos[task_id] = Task(task_id, content, status_int, days.setdefault(day, day),
+                                              clock_cache.setdefault(clock, clock), suffix)
+        replay_journal(todos)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return list(todos.values())
+
+# ========== 大文件并行解析：按换行切块，多进程解析后按原顺序合并 ==========
+# 快照文件超过 PARALLEL_PARSE_MIN_BYTES 且有多个 CPU 时启用；每块在子进程中按与逐行加载完全相同的规则解析，
+# 返回构造任务所需的字段，由主进程按块顺序合并（旧格式行的ID也在主进程按顺序分配，与逐行加载一致）
+# 文件较小、单核或子进程无法启动时自动退回逐行解析
+PARALLEL_PARSE_MIN_BYTES = 16 * 1024 * 1024
+PARALLEL_PARSE_CHUNKS_PER_WORKER = 4
+PARSE_WORKERS = None  # None=按 CPU 核数
+
+def split_chunks(path, count):
+    # 在换行处切成约 count 块，返回 [(起始, 结束)] 字节区间
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        bounds = [0]
+        for i in range(1, count):
+            newline = mm.find(b"\n", max(size * i // count, bounds[-1]))
+            if newline < 0:
+                break
+            bounds.append(newline + 1)
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def parse_snapshot_chunk(path, start, end, today):
+    # 在子进程中运行；逐行规则与 load_text_todos 的逐行路径相同，文本模式的换行转换也一并照做
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode("utf-8")
+    # 按列返回：状态、天数、秒数用紧凑数组，传回主进程时序列化的数据量约为逐行元组的一半
+    ids, contents, statuses, days, clocks, suffixes = [], [], bytearray(), array.array("l"), array.array("l"), []
+    for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = line.strip()
+        if line:
+            task_id, status_int, content, create_time = parse_todo_line(line, today)
+            task = make_task(task_id, content, status_int, create_time)
+            ids.append(task_id)
+            contents.append(task.content)
+            statuses.append(task.status)
+            days.append(task.day)
+            clocks.append(task.clock)
+            suffixes.append(task.suffix)
+    return ids, contents, bytes(statuses), days, clocks, suffixes
+
+def parse_snapshot_parallel(path, today, workers=None):
+    # 返回按文件顺序排列的各块解析结果（每块为列的元组）；不适合并行时返回 None，由调用方逐行解析
+    workers = workers or PARSE_WORKERS or os.cpu_count() or 1
+    if workers <= 1 or os.path.getsize(path) < PARALLEL_PARSE_MIN_BYTES:
+        return None
+    import concurrent.futures  # 只有大文件才用到进程池，不拖慢每次启动
+    chunks = split_chunks(path, workers * PARALLEL_PARSE_CHUNKS_PER_WORKER)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(parse_snapshot_chunk, path, start, end, today) for start, end in chunks]
+            return [future.result() for future in futures]
+    except (OSError, concurrent.futures.BrokenExecutor):
+        return None
+
+def parse_journal_record(record):
+    # 返回 (操作, 任务ID, 参数)：A 的参数为任务对象，E 为新内容，S 为状态量，D 为 None；
+    # 字段不全的记录返回 None，回放时跳过，一条坏记录不影响整个文件的加载
+    op, _, rest = record.partition("|")
+    if op == "A":
+        fields = rest.split("|", 3)
+        if len(fields) == 4:
+            task_id, status, create_time, content = fields
+            return op, task_id, make_task(task_id, content, parse_status(status), create_time)
+    elif op == "E" or op == "S":
+        task_id, sep, value = rest.partition("|")
+        if sep:
+            return op, task_id, value if op == "E" else parse_status(value)
+    elif op == "D" and rest:
+        return op, rest, None
+    return None
+
+def replay_journal(todos):
+    # 按顺序回放日志：A=新增 E=改内容 S=改状态 D=删除；只回放完整的行（末尾残缺记录视为未写入）
+    journal_file = get_journal_file()
+    if not os.path.exists(journal_file):
+        return
+    with open(journal_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            parsed = parse_journal_record(line[:-1])
+            if parsed is None:
+                continue
+            op, task_id, value = parsed
+            if op == "A":
+                todos[task_id] = value
+            elif op == "E":
+                if task_id in todos:
+                    todos[task_id].content = value
+            elif op == "S":
+                if task_id in todos:
+                    todos[task_id].status = value
+            elif op == "D":
+                todos.pop(task_id, None)
+
+def journal_add(task):
+    return f"A|{task.id}|{task.status}|{task.create_time}|{task.content}"
+
+def journal_edit(task_id, content):
+    return f"E|{task_id}|{content}"
+
+def journal_status(task_id, status):
+    return f"S|{task_id}|{status}"
+
+def journal_delete(task_id):
+    return f"D|{task_id}"
+
+def append_journal(records):
+    # 一次操作的所有记录合并为一次追加写入
+    journal_file = get_journal_file()
+    with storage_lock():
+        with open(journal_file, "a", encoding="utf-8") as f:
+            f.write("".join(record + "\n" for record in records))
+        if os.path.getsize(journal_file) >= JOURNAL_COMPACT_SIZE:
+            compact_journal()
+
+def compact_journal():
+    # 快照+日志合并为新快照；任务ID已写入快照，中途崩溃后重放旧日志结果不变
+    with storage_lock():
+        save_text_todos(load_text_todos(False))
+
+def save_text_todos(todos):
+    with storage_lock():
+        atomic_write_lines(TODO_FILE, (f"{todo.status}|{todo.content}|{todo.create_time}|{todo.id}\n" for todo in todos))
+        if os.path.exists(get_journal_file()):
+            os.remove(get_journal_file())
+
+# ========== SQLite 存储后端（可选，标准库自带） ==========
+# 日期存为整数天数、状态存为单字节整数，按日期建索引，只加载今日时只读当天的数据
+# 配置文件 [STORAGE] backend = text/sqlite 切换，环境变量 PYTHONTODO_BACKEND 优先
+SQLITE_SUFFIX = ".db"
+sqlite_conn = None
+sqlite_conn_path = None
+
+def get_storage_backend():
+    backend = os.environ.get("PYTHONTODO_BACKEND")
+    if not backend:
+        backend = init_config().get("STORAGE", "backend", fallback="text")
+    return backend if backend in ("text", "sqlite") else "text"
+
+def get_sqlite_file():
+    return os.path.splitext(TODO_FILE)[0] + SQLITE_SUFFIX
+
+def get_sqlite_conn():
+    global sqlite_conn, sqlite_conn_path
+    db_file = get_sqlite_file()
+    if sqlite_conn is None or sqlite_conn_path != db_file:
+        is_new = not os.path.exists(db_file)
+        # 后台写入线程也用这个连接写库，两个线程的访问由 write_behind.lock 串行
+        sqlite_conn = sqlite3.connect(db_file, check_same_thread=False)
+        sqlite_conn_path = db_file
+        sqlite_conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                day INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                time_part TEXT NOT NULL,
+                content TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_day ON tasks (day, seq);
+        """)
+        if is_new and (os.path.exists(TODO_FILE) or os.path.exists(archive_store.get_manifest_file())):
+            # 首次启用 SQLite 时自动导入现有的文本任务，连同已归档的任务；文本文件和归档保持原样
+            sqlite_save_todos(load_all_todos("text"))
+    return sqlite_conn
+
+def task_to_row(task):
+    # 创建时间拆成「天数 + 时分秒及星期」两部分；日期无法识别的旧数据整体存入 time_part，天数记 0
+    if task.day:
+        time_part = task.create_time[11:]
+    else:
+        time_part = task.create_time
+    return task.id, task.day, task.status, time_part, task.content
+
+def row_to_task(row):
+    task_id, day, status, time_part, content = row
+    if day:
+        task_date = day_to_date(day)
+        create_time = f"{task_date} {time_part}" if time_part else task_date
+    else:
+        create_time = time_part
+    return make_task(task_id, content, status, create_time)
+
+def sqlite_load_todos(is_today_only=True):
+    conn = get_sqlite_conn()
+    columns = "SELECT id, day, status, time_part, content FROM tasks"
+    if is_today_only:
+        rows = conn.execute(f"{columns} WHERE day = ? ORDER BY seq", (date_to_day(get_today_date()),))
+    else:
+        rows = conn.execute(f"{columns} ORDER BY seq")
+    return [row_to_task(row) for row in rows]
+
+def sqlite_save_todos(todos):
+    conn = get_sqlite_conn()
+    with conn:
+        conn.execute("DELETE FROM tasks")
+        conn.executemany("INSERT INTO tasks (id, day, status, time_part, content) VALUES (?, ?, ?, ?, ?)",
+                         (task_to_row(todo) for todo in todos))
+
+def sqlite_apply_records(records):
+    # 与文本日志使用同一套记录格式，一次操作在一个事务内完成
+    conn = get_sqlite_conn()
+    with conn:
+        for record in records:
+            parsed = parse_journal_record(record)
+            if parsed is None:
+                continue
+            op, task_id, value = parsed
+            if op == "A":
+                conn.execute("INSERT OR REPLACE INTO tasks (id, day, status, time_part, content) VALUES (?, ?, ?, ?, ?)",
+                             task_to_row(value))
+            elif op == "E":
+                conn.execute("UPDATE tasks SET content = ? WHERE id = ?", (value, task_id))
+            elif op == "S":
+                conn.execute("UPDATE tasks SET status = ? WHERE id = ?", (value, task_id))
+            elif op == "D":
+                conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+def parse_import_lines(lines):
+    # 文本格式(todo_list.txt)的行原样导入，保留已有任务ID；不含"|"的行视为一条今日新任务的内容
+    today = get_today_date()
+    create_time = get_format_time()
+    tasks = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if "|" in line:
+            task_id, status_int, content, task_time = parse_todo_line(line, today)
+            tasks.append(make_task(task_id or new_task_id(), content, status_int, task_time))
+        else:
+            tasks.append(make_task(new_task_id(), line, 0, create_time))
+    return tasks
+
+def import_text_todos(text_file):
+    # 导入到当前后端，追加在现有任务之后
+    with open(text_file, "r", encoding="utf-8") as f:
+        tasks = parse_import_lines(f)
+    task_store.add_many(tasks)
+    return len(tasks)
+
+def export_text_todos(text_file):
+    todos = load_all_todos()
+    with open(text_file, "w", encoding="utf-8") as f:
+        for todo in todos:
+            f.write(f"{todo.status}|{todo.content}|{todo.create_time}|{todo.id}\n")
+    return len(todos)
+
+# ========== 存储后端统一入口 ==========
+def load_todos(is_today_only=True):
+    if get_storage_backend() == "sqlite":
+        todos = sqlite_load_todos(is_today_only)
+    else:
+        todos = load_text_todos(is_today_only)
+    if is_today_only:
+        # 今日列表补上尚未写入的重复任务实例；全部加载用于改写存储，不含即时生成的实例
+        stored = {todo.id for todo in todos}
+        todos += [task for task in recurrence_store.get_date(get_today_date()) if task.id not in stored]
+    return todos
+
+def save_todos(todos):
+    if get_storage_backend() == "sqlite":
+        sqlite_save_todos(todos)
+    else:
+        save_text_todos(todos)
+
+def commit_records(records):
+    if get_storage_backend() == "sqlite":
+        sqlite_apply_records(records)
+    else:
+        append_journal(records)
+
+# ========== 流式查询：边读边筛选，不构建完整任务列表 ==========
+# 日期区间和状态条件下推到逐行解析中：先从行尾取出创建时间判断日期，不在区间内的行直接跳过，
+# 不做 split/int 解析；峰值内存只与结果条数（以及有限大小的日志）有关，与历史文件大小无关
+def read_journal_overlay():
+    # 日志按任务ID归组，保持各自的修改顺序；日志超过阈值就会被压缩，所以体积有上限
+    overlay = {}
+    journal_file = get_journal_file()
+    if os.path.exists(journal_file):
+        with open(journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                parsed = parse_journal_record(line[:-1])
+                if parsed is not None:
+                    op, task_id, value = parsed
+                    overlay.setdefault(task_id, []).append((op, value))
+    return overlay
+
+def apply_journal_ops(task, ops):
+    for op, value in ops:
+        if op == "A":
+            task = value
+        elif op == "E" and task is not None:
+            task.content = value
+        elif op == "S" and task is not None:
+            task.status = value
+        elif op == "D":
+            task = None
+    return task
+
+def line_task_date(line, today):
+    # 不拆分整行，只从行尾定位创建时间取出日期；规则与 parse_todo_line 保持一致
+    last = line.rfind("|")
+    prev = line.rfind("|", 0, last)
+    if prev >= 0 and "|" in line[:prev] and is_create_time(line[prev + 1:last]):
+        return line[prev + 1:last].split(" ")[0]
+    if prev >= 0:
+        return line.split("|", 2)[2].split(" ")[0]
+    return today
+
+def task_matches(task, date_from, date_to, statuses):
+    task_date = task.task_date
+    return ((date_from is None or task_date >= date_from) and (date_to is None or task_date <= date_to)
+            and (statuses is None or task.status in statuses))
+
+def iter_snapshot_lines(date_from, date_to, today):
+    # 有日期条件时按日期索引只读命中的字节区间，否则逐行读整个快照
+    lines = date_index.read_lines(date_from, date_to, today) if date_from is not None or date_to is not None else None
+    if lines is not None:
+        yield from lines
+        return
+    with open(TODO_FILE, "r", encoding="utf-8") as f:
+        yield from f
+
+def iter_text_todos(date_from=None, date_to=None, statuses=None):
+    today = get_today_date()
+    overlay = read_journal_overlay()
+    if os.path.exists(TODO_FILE):
+        for line in iter_snapshot_lines(date_from, date_to, today):
+            line = line.strip()
+            if not line:
+                continue
+            ops = overlay.pop(line[line.rfind("|") + 1:], None)
+            if ops is None:
+                task_date = line_task_date(line, today)
+                if (date_from is not None and task_date < date_from) or (date_to is not None and task_date > date_to):
+                    continue
+            task_id, status_int, content, create_time = parse_todo_line(line, today)
+            if statuses is not None and ops is None and status_int not in statuses:
+                continue
+            task = make_task(task_id or new_task_id(), content, status_int, create_time)
+            if ops is not None:
+                task = apply_journal_ops(task, ops)
+            if task is not None and task_matches(task, date_from, date_to, statuses):
+                yield task
+    # 只存在于日志中的新增任务；按日期索引读取时，区间外的行上的修改也留在这里，只有重新新增到区间内的才会命中
+    for ops in overlay.values():
+        task = apply_journal_ops(None, ops)
+        if task is not None and task_matches(task, date_from, date_to, statuses):
+            yield task
+
+def iter_sqlite_todos(date_from=None, date_to=None, statuses=None):
+    conditions, params = [], []
+    if date_from is not None:
+        conditions.append("day >= ?")
+        params.append(date_to_day(date_from))
+    if date_to is not None:
+        conditions.append("day <= ?")
+        params.append(date_to_day(date_to))
+    if statuses is not None:
+        conditions.append(f"status IN ({','.join('?' * len(statuses))})")
+        params.extend(statuses)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    for row in get_sqlite_conn().execute(f"SELECT id, day, status, time_part, content FROM tasks{where} ORDER BY seq", params):
+        yield row_to_task(row)
+
+def iter_todos(date_from=None, date_to=None, statuses=None):
+    # 日期为 yyyy-mm-dd 字符串（含两端），statuses 为状态集合，None 表示不限
+    if get_storage_backend() == "sqlite":
+        return iter_sqlite_todos(date_from, date_to, statuses)
+    return iter_text_todos(date_from, date_to, statuses)
+
+def get_file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def get_storage_stamp():
+    # 代数覆盖所有经过本程序的写入；文件戳兜底外部编辑器直接修改文件的情况
+    if get_storage_backend() == "sqlite":
+        return read_generation(), get_file_stamp(get_sqlite_file()), None
+    return read_generation(), get_file_stamp(TODO_FILE), get_file_stamp(get_journal_file())
+
+# ========== 日期索引：快照中每个日期的行所在的字节区间 ==========
+# TODO_FILE.dtidx 记录 {日期: [[起始, 结束], ...]}，同一日期相邻的行合并成一个区间；快照格式不变，仍可直接编辑
+# 有效性按快照的大小、修改时间和校验和（开头与末尾各 DATE_INDEX_CHECK_BYTES 字节的 CRC32）判断：
+# 完全一致直接使用；文件变长且原有部分的校验和不变，视为只在末尾追加了行，只索引新增的部分；其余情况整体重建
+# 读取时再核对读到的每一行确实属于所选日期，对不上就重建索引，重建后仍对不上则退回逐行扫描
+# 只有「状态|内容」两段的旧格式行按规则算作今天，归在空字符串日期下；快照较小时不建索引
+DATE_INDEX_SUFFIX = ".dtidx"
+DATE_INDEX_MIN_BYTES = 1024 * 1024
+DATE_INDEX_CHECK_BYTES = 4096
+
+class DateIndex:
+    def __init__(self):
+        self.data = None  # {"size", "mtime_ns", "checksum", "legacy", "dates"}
+        self.path = None
+
+    def get_file(self):
+        return TODO_FILE + DATE_INDEX_SUFFIX
+
+    def checksum(self, f, size):
+        f.seek(0)
+        head = f.read(min(size, DATE_INDEX_CHECK_BYTES))
+        f.seek(max(size - DATE_INDEX_CHECK_BYTES, 0))
+        return zlib.crc32(f.read(size - f.tell()), zlib.crc32(head))
+
+    def scan(self, f, start, dates):
+        # 从 start 开始逐行记录日期和字节区间，返回新增的旧格式（无任务ID）行数
+        legacy = 0
+        offset = start
+        f.seek(start)
+        for raw in f:
+            end = offset + len(raw)
+            text = raw.decode("utf-8")
+            for line in (text.replace("\r\n", "\n").replace("\r", "\n").split("\n") if "\r" in text else (text,)):
+                line = line.strip()
+                if not line:
+                    continue
+                # 与 line_task_date 相同的判断：带任务ID的新格式行直接取出创建时间中的日期
+                last = line.rfind("|")
+                prev = line.rfind("|", 0, last)
+                if prev >= 0 and "|" in line[:prev] and is_create_time(line[prev + 1:last]):
+                    task_date = line[prev + 1:last].split(" ")[0]
+                else:
+                    legacy += 1
+                    task_date = line_task_date(line, "")
+                ranges = dates.setdefault(task_date, [])
+                if ranges and ranges[-1][1] == offset:
+                    ranges[-1][1] = end
+                elif not ranges or ranges[-1][1] != end:
+                    ranges.append([offset, end])
+            offset = end
+        return legacy
+
+    def build(self, stat, previous=None):
+        # previous 为仍然有效的旧索引时只索引末尾追加的部分
+        with open(TODO_FILE, "rb") as f:
+            if previous is not None and self.checksum(f, previous["size"]) == previous["checksum"]:
+                dates = previous["dates"]
+                legacy = previous["legacy"] + self.scan(f, previous["size"], dates)
+            else:
+                dates = {}
+                legacy = self.scan(f, 0, dates)
+            data = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "checksum": self.checksum(f, stat.st_size),
+                    "legacy": legacy, "dates": dates}
+        atomic_write_lines(self.get_file(), [json.dumps(data, separators=(",", ":"))])
+        self.data = data
+        self.path = TODO_FILE
+
+    def ensure_valid(self, rebuild=False):
+        # 返回可用的索引；快照不存在或较小时返回 None
+        try:
+            stat = os.stat(TODO_FILE)
+        except FileNotFoundError:
+            return None
+        if stat.st_size < DATE_INDEX_MIN_BYTES:
+            return None
+        data = self.data if self.path == TODO_FILE else None
+        if data is None and not rebuild:
+            try:
+                with open(self.get_file(), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+        if data is None or rebuild:
+            self.build(stat)
+        elif stat.st_size > data["size"]:
+            self.build(stat, data)
+        else:
+            with open(TODO_FILE, "rb") as f:
+                unchanged = (data["size"], data["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns) and \
+                    self.checksum(f, stat.st_size) == data["checksum"]
+            if unchanged:
+                self.data, self.path = data, TODO_FILE
+            else:
+                self.build(stat)
+        return self.data
+
+    def usable(self):
+        # 快照足够大、索引有效且没有待迁移的旧格式行（这些行每次读取都会分到新的任务ID）
+        data = self.ensure_valid() if get_storage_backend() == "text" else None
+        return data is not None and not data["legacy"]
+
+    def read_ranges(self, f, ranges, wanted, size):
+        # 读出各区间的行；区间不在行边界上或读到别的日期的行时返回 None
+        lines = []
+        for start, end in ranges:
+            f.seek(start - 1 if start else 0)
+            chunk = f.read(end - start + (1 if start else 0))
+            if start:
+                if chunk[:1] != b"\n":
+                    return None
+                chunk = chunk[1:]
+            if len(chunk) != end - start or not chunk.endswith(b"\n") and end != size:
+                return None
+            try:
+                text = chunk.decode("utf-8")
+            except UnicodeDecodeError:
+                return None
+            for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+                line = line.strip()
+                if line:
+                    if line_task_date(line, "") not in wanted:
+                        return None
+                    lines.append(line)
+        return lines
+
+    def read_lines(self, date_from, date_to, today):
+        # 返回区间内各日期的行（按文件顺序）；不使用索引时返回 None
+        if get_storage_backend() != "text":
+            return None
+        for rebuild in (False, True):
+            data = self.ensure_valid(rebuild)
+            if data is None:
+                return None
+            wanted = {task_date for task_date in data["dates"]
+                      if (date_from is None or task_date >= date_from) and (date_to is None or task_date <= date_to)}
+            if "" in data["dates"] and (date_from is None or today >= date_from) and (date_to is None or today <= date_to):
+                wanted.add("")
+            # 一行中夹着单独的 \r 时会登记在多个日期下，合并重叠的区间，每个字节只读一次
+            ranges = []
+            for start, end in sorted(r for task_date in wanted for r in data["dates"][task_date]):
+                if ranges and start <= ranges[-1][1]:
+                    ranges[-1][1] = max(ranges[-1][1], end)
+                else:
+                    ranges.append([start, end])
+            with open(TODO_FILE, "rb") as f:
+                lines = self.read_ranges(f, ranges, wanted, data["size"])
+            if lines is not None:
+                return lines
+        return None
+
+date_index = DateIndex()
+
+# ========== 分层归档：早于保留窗口的月份压缩成分段文件 ==========
+# TODO_FILE.archive/ 下每月一个分段（lzma 或 gzip 压缩，行格式与快照相同），manifest.json 记录各分段的日期范围和条数；
+# 热文件只保留最近的任务，加载今日/热数据不再逐行跳过多年历史；按日期查询和历史编辑只打开覆盖该日期的分段
+# 配置 [ARCHIVE] window_days（默认 0=不归档，需管理员在存储菜单中开启；开启后每次启动按窗口自动归档）、
+# compression（lzma/gzip）；仅文本后端使用
+# 归档顺序：先写分段和清单，最后改写热文件——中途崩溃最多出现重复（按任务ID去重，下次归档合并），不会丢任务
+ARCHIVE_SUFFIX = ".archive"
+ARCHIVE_WINDOW_DAYS = 0  # 默认不归档：升级后不能悄悄把用户可直接阅读的 todo_list.txt 搬空
+ARCHIVE_EXTENSIONS = {"lzma": ".txt.xz", "gzip": ".txt.gz"}
+ARCHIVE_LZMA_PRESET = 1  # 归档以读为主，低压缩级别写入快得多，体积差别不大
+
+def open_segment(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    if "w" in mode:
+        return lzma.open(path, mode, encoding="utf-8", preset=ARCHIVE_LZMA_PRESET)
+    return lzma.open(path, mode, encoding="utf-8")
+
+def get_archive_window_days():
+    try:
+        return init_config().getint("ARCHIVE", "window_days", fallback=ARCHIVE_WINDOW_DAYS)
+    except ValueError:
+        return ARCHIVE_WINDOW_DAYS
+
+def get_archive_cutoff(window_days):
+    # 按整月归档：保留窗口起点所在月份的月初之前的任务进入归档
+    start = datetime.date.today() - datetime.timedelta(days=window_days)
+    return f"{start:%Y-%m}-01"
+
+class ArchiveStore:
+    def __init__(self):
+        self.manifest_key = None
+        self.manifest_data = None
+        self.segments = {}  # 月份 -> ((路径, 文件戳), {任务ID: 任务}, {日期: [任务]})
+
+    def get_dir(self):
+        return TODO_FILE + ARCHIVE_SUFFIX
+
+    def get_manifest_file(self):
+        return os.path.join(self.get_dir(), "manifest.json")
+
+    def manifest(self):
+        path = self.get_manifest_file()
+        key = (path, get_file_stamp(path))
+        if key[1] is None:
+            return {"cutoff": None, "segments": {}}
+        if key != self.manifest_key:
+            with open(path, "r", encoding="utf-8") as f:
+                self.manifest_data = json.load(f)
+            self.manifest_key = key
+        return self.manifest_data
+
+    def write_manifest(self, manifest):
+        atomic_write_lines(self.get_manifest_file(), [json.dumps(manifest, ensure_ascii=False, indent=1)])
+
+    def active(self):
+        return get_storage_backend() == "text" and bool(self.manifest()["segments"])
+
+    def load_segment(self, month):
+        info = self.manifest()["segments"][month]
+        path = os.path.join(self.get_dir(), info["file"])
+        key = (path, get_file_stamp(path))
+        cached = self.segments.get(month)
+        if cached is not None and cached[0] == key:
+            return cached
+        today = get_today_date()
+        by_id, by_date = {}, {}
+        with open_segment(path, "rt") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    task_id, status_int, content, create_time = parse_todo_line(line, today)
+                    task = make_task(task_id or new_task_id(), content, status_int, create_time)
+                    by_id[task.id] = task
+                    by_date.setdefault(task.task_date, []).append(task)
+        self.segments[month] = (key, by_id, by_date)
+        return self.segments[month]
+
+    def months_between(self, date_from=None, date_to=None):
+        segments = self.manifest()["segments"]
+        return [month for month in sorted(segments)
+                if (date_from is None or segments[month]["last"] >= date_from)
+                and (date_to is None or segments[month]["first"] <= date_to)]
+
+    def iter_range(self, date_from=None, date_to=None, statuses=None):
+        if not self.active():
+            return
+        for month in self.months_between(date_from, date_to):
+            by_date = self.load_segment(month)[2]
+            for task_date in sorted(by_date):
+                if (date_from is None or task_date >= date_from) and (date_to is None or task_date <= date_to):
+                    for task in by_date[task_date]:
+                        if statuses is None or task.status in statuses:
+                            yield task
+
+    def iter_all(self):
+        # 不论当前后端，按月份顺序读出全部归档任务
+        for month in sorted(self.manifest()["segments"]):
+            yield from self.load_segment(month)[1].values()
+
+    def get_date(self, task_date):
+        if not self.active() or task_date[:7] not in self.manifest()["segments"]:
+            return []
+        return list(self.load_segment(task_date[:7])[2].get(task_date, []))
+
+    def get_task(self, month, task_id):
+        if not self.active() or month not in self.manifest()["segments"]:
+            return None
+        return self.load_segment(month)[1].get(task_id)
+
+    def find(self, task_id):
+        # 只在已打开的分段里找：历史编辑总是先按日期取出任务，对应分段已在缓存中
+        for month, (_, by_id, _) in self.segments.items():
+            if task_id in by_id:
+                return month, by_id[task_id]
+        return None
+
+    def write_segment(self, month, tasks):
+        compression = init_config().get("ARCHIVE", "compression", fallback="lzma")
+        file_name = month + ARCHIVE_EXTENSIONS.get(compression, ARCHIVE_EXTENSIONS["lzma"])
+        path = os.path.join(self.get_dir(), file_name)
+        tmp_path = os.path.join(self.get_dir(), "tmp-" + file_name)  # 保留扩展名，按扩展名选择压缩格式
+        with open_segment(tmp_path, "wt") as f:
+            f.writelines(f"{t.status}|{t.content}|{t.create_time}|{t.id}\n" for t in tasks)
+        os.replace(tmp_path, path)
+        for other in ARCHIVE_EXTENSIONS.values():
+            if month + other != file_name and os.path.exists(os.path.join(self.get_dir(), month + other)):
+                os.remove(os.path.join(self.get_dir(), month + other))
+        dates = [t.task_date for t in tasks]
+        days = {}
+        for t in tasks:
+            days.setdefault(t.task_date, [0, 0, 0, 0])[t.status] += 1
+        return {"file": file_name, "first": min(dates), "last": max(dates), "count": len(tasks), "days": days}
+
+    def apply(self, records):
+        # 归档中任务的修改：按月份改写对应分段（调用方已持有存储锁）
+        by_month = {}
+        for record in records:
+            op, _, rest = record.partition("|")
+            task_id = rest.split("|", 1)[0]
+            found = self.find(task_id)
+            if found is None:
+                raise KeyError(task_id)
+            by_month.setdefault(found[0], []).append((op, task_id, rest))
+        manifest = self.manifest()
+        for month, ops in by_month.items():
+            by_id = dict(self.load_segment(month)[1])
+            for op, task_id, rest in ops:
+                if op == "E":
+                    by_id[task_id].content = rest.split("|", 1)[1]
+                elif op == "S":
+                    by_id[task_id].status = int(rest.split("|", 1)[1])
+                elif op == "D":
+                    by_id.pop(task_id, None)
+            if by_id:
+                manifest["segments"][month] = self.write_segment(month, list(by_id.values()))
+            else:
+                os.remove(os.path.join(self.get_dir(), manifest["segments"].pop(month)["file"]))
+            self.segments.pop(month, None)
+        self.write_manifest(manifest)
+
+    def archive(self, cutoff):
+        # 热数据中早于 cutoff 的任务按月并入分段，热文件只保留其余任务；返回归档条数
+        with storage_lock():
+            hot, old_by_month = [], {}
+            for task in load_text_todos(False):
+                if task.task_date < cutoff:
+                    old_by_month.setdefault(task.task_date[:7], []).append(task)
+                else:
+                    hot.append(task)
+            os.makedirs(self.get_dir(), exist_ok=True)
+            manifest = self.manifest()
+            for month, tasks in sorted(old_by_month.items()):
+                if month in manifest["segments"]:
+                    merged = dict(self.load_segment(month)[1])
+                    merged.update((task.id, task) for task in tasks)
+                    tasks = list(merged.values())
+                manifest["segments"][month] = self.write_segment(month, tasks)
+                self.segments.pop(month, None)
+            manifest["cutoff"] = max(cutoff, manifest["cutoff"] or cutoff)
+            self.write_manifest(manifest)
+            if old_by_month:
+                before_stamp = get_storage_stamp()
+                save_text_todos(hot)
+                bump_generation()
+                stats_rollup.record_commit(before_stamp, get_storage_stamp(), [])  # 任务只是换了存放位置，统计不变
+        return sum(len(tasks) for tasks in old_by_month.values())
+
+    def maybe_archive(self):
+        # 启动时调用：保留窗口跨过新的月份才真正读一遍热文件，否则只看一眼清单
+        window_days = get_archive_window_days()
+        if window_days <= 0 or get_storage_backend() != "text" or not os.path.exists(TODO_FILE):
+            return 0
+        cutoff = get_archive_cutoff(window_days)
+        if (self.manifest()["cutoff"] or "") >= cutoff:
+            return 0
+        return self.archive(cutoff)
+
+    def clear(self):
+        shutil.rmtree(self.get_dir(), ignore_errors=True)
+        self.segments = {}
+        self.manifest_key = None
+
+archive_store = ArchiveStore()
+
+def load_all_todos(backend=None):
+    # 归档 + 热数据，用于导出和切换后端；backend 默认为当前后端，
+    # 首次启用 SQLite 时当前后端已是 sqlite，导入要指定 "text" 读取文本任务和归档
+    if (backend or get_storage_backend()) == "sqlite":
+        return sqlite_load_todos(False)
+    return list(archive_store.iter_all()) + load_text_todos(False)
+
+# ========== 重复任务：规则只存一份，按日期即时生成当天的实例 ==========
+# TODO_FILE.rules 保存规则（每天/工作日/每周/每月），不再每天写一份任务副本；
+# 查询某天时逐条规则判断当天是否重复，只与规则条数有关，与规则已持续多少天无关
+# 实例的任务ID为「规则ID@yyyymmdd」，第一次改状态/改内容时才整条写入任务库，之后与普通任务相同；
+# 已写入或被删除的日期记在规则的 detached 中，不再即时生成
+RULES_SUFFIX = ".rules"
+RECUR_FREQS = {"daily": "每天", "weekdays": "工作日", "weekly": "每周", "monthly": "每月"}
+RECUR_MAX_AHEAD_DAYS = 366  # 查询区间不设上限时，最多生成到今天之后这么多天
+
+def is_recur_instance(task_id):
+    return "@" in task_id
+
+class RecurrenceStore:
+    def __init__(self):
+        self.key = None
+        self.rules = []
+
+    def get_file(self):
+        return TODO_FILE + RULES_SUFFIX
+
+    def load(self):
+        path = self.get_file()
+        key = (path, get_file_stamp(path))
+        if key != self.key:
+            self.rules = []
+            if key[1] is not None:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.rules = json.load(f)["rules"]
+                for rule in self.rules:
+                    rule["detached"] = set(rule["detached"])
+            self.key = key
+        return self.rules
+
+    def save(self, rules):
+        # 调用方已持有存储锁
+        data = [dict(rule, detached=sorted(rule["detached"])) for rule in rules]
+        atomic_write_lines(self.get_file(), [json.dumps({"rules": data}, ensure_ascii=False, indent=1)])
+        self.rules = rules
+        self.key = (self.get_file(), get_file_stamp(self.get_file()))
+
+    def get_rule(self, rule_id):
+        for rule in self.load():
+            if rule["id"] == rule_id:
+                return rule
+        return None
+
+    def occurrences(self, rule, date_from, date_to):
+        # 规则在 [date_from, date_to] 内的重复日期，直接按周期跳到下一次，不逐日判断
+        try:
+            first = datetime.date.fromisoformat(max(date_from, rule["start"]))
+            last = datetime.date.fromisoformat(min(date_to, rule["end"] or date_to))
+        except ValueError:
+            return  # 手工输入的日期可能不存在，如 2026-02-30
+        start = datetime.date.fromisoformat(rule["start"])
+        freq = rule["freq"]
+        if freq == "weekly":
+            first += datetime.timedelta(days=(start.weekday() - first.weekday()) % 7)
+        step = datetime.timedelta(days=7 if freq == "weekly" else 1)
+        if freq == "monthly":
+            month = first.replace(day=1)
+            while month <= last:
+                next_month = (month + datetime.timedelta(days=32)).replace(day=1)
+                day = month.replace(day=min(start.day, (next_month - datetime.timedelta(days=1)).day))
+                if first <= day <= last:
+                    yield day.isoformat()
+                month = next_month
+            return
+        day = first
+        while day <= last:
+            if freq != "weekdays" or day.weekday() < 5:
+                yield day.isoformat()
+            day += step
+
+    def make_instance(self, rule, task_date):
+        week_name = WEEK_NAMES[datetime.date.fromisoformat(task_date).weekday()]
+        return make_task(f"{rule['id']}@{task_date.replace('-', '')}", rule["content"], 0,
+                         f"{task_date} {rule['time']} {week_name}")
+
+    def expand(self, date_from=None, date_to=None):
+        # 返回 {日期: [实例]}，只含尚未写入任务库、也未被删除的实例
+        horizon = (datetime.date.today() + datetime.timedelta(days=RECUR_MAX_AHEAD_DAYS)).isoformat()
+        date_to = min(date_to or horizon, horizon)
+        by_date = {}
+        for rule in self.load():
+            for task_date in self.occurrences(rule, date_from or rule["start"], date_to):
+                if task_date not in rule["detached"]:
+                    by_date.setdefault(task_date, []).append(self.make_instance(rule, task_date))
+        return by_date
+
+    def get_date(self, task_date):
+        return self.expand(task_date, task_date).get(task_date, [])
+
+    def pending(self, task_ids):
+        # 尚未写入任务库的实例 {任务ID: 实例}
+        result = {}
+        for task_id in task_ids:
+            if not is_recur_instance(task_id):
+                continue
+            rule_id, _, ymd = task_id.partition("@")
+            rule = self.get_rule(rule_id)
+            task_date = date_convert(ymd)
+            if rule and task_date and task_date not in rule["detached"] and task_date in self.occurrences(rule, task_date, task_date):
+                result[task_id] = self.make_instance(rule, task_date)
+        return result
+
+    def detach(self, task_ids):
+        # 这些实例已写入任务库或被删除，以后不再即时生成
+        with storage_lock():
+            rules = self.load()
+            by_id = {rule["id"]: rule for rule in rules}
+            for task_id in task_ids:
+                rule_id, _, ymd = task_id.partition("@")
+                if rule_id in by_id:
+                    by_id[rule_id]["detached"].add(date_convert(ymd))
+            self.save(rules)
+
+    def add_rule(self, content, freq, start):
+        rule = {"id": new_task_id(), "content": content, "freq": freq, "start": start, "end": None,
+                "time": get_format_time()[11:19], "detached": set()}
+        with storage_lock():
+            self.save(self.load() + [rule])
+        return rule
+
+    def stop_rule(self, rule_id):
+        # 从今天起不再重复：之前的日期照常保留；还没开始的规则直接删除
+        yesterday = get_yesterday_date()
+        with storage_lock():
+            rules = self.load()
+            rule = next((rule for rule in rules if rule["id"] == rule_id), None)
+            if rule is None:
+                raise KeyError(rule_id)
+            if rule["start"] > yesterday:
+                rules.remove(rule)
+            else:
+                rule["end"] = min(rule["end"] or yesterday, yesterday)
+            self.save(rules)
+        return rule
+
+recurrence_store = RecurrenceStore()
+
+def format_rule(rule):
+    start = datetime.date.fromisoformat(rule["start"])
+    detail = {"weekly": f"（{WEEK_NAMES[start.weekday()]}）", "monthly": f"（{start.day}日）"}.get(rule["freq"], "")
+    period = f"{rule['start']} 起" + (f"，至 {rule['end']} 止" if rule["end"] else "")
+    return f"{RECUR_FREQS[rule['freq']]}{detail} | {rule['content']} | {period}"
+
+# ========== 内存任务库：启动加载一次，按日期/编号建索引 ==========
+
+class TaskStore:
+    def __init__(self):
+        self.by_date = {}
+        self.by_id = {}
+        self.file_stamp = None
+        self.loaded = False
+        self.date_cache = (None, [])  # 未加载时按日期索引读到的某天任务：((存储文件戳, 日期), 任务)
+
+    def current_stamp(self):
+        return get_storage_stamp()
+
+    def refresh(self):
+        # 文件大小/修改时间变化说明被外部改过，才重新加载；否则不读文件
+        if not self.loaded or self.current_stamp() != self.file_stamp:
+            if write_behind.queue:
+                # 还有排队未写盘的修改：先写出，提交时发现视图过期会重新加载合并，不会丢掉这些修改
+                write_behind.flush()
+            else:
+                self.reload()
+
+    def reload(self):
+        self.by_date = {}
+        self.by_id = {}
+        # 加锁读取：避免读到一半时别的进程压缩日志，拿到新文件戳却缺了日志里的记录
+        with storage_lock():
+            tasks = load_todos(False)
+            if get_storage_backend() == "text" and legacy_line_count:
+                # 旧格式行本次分配的ID需要写回快照，否则下次加载会变
+                save_todos(tasks)
+                bump_generation()
+            self.file_stamp = self.current_stamp()
+        for task in tasks:
+            self.index_task(task)
+        self.loaded = True
+
+    def index_task(self, task):
+        self.by_id[task.id] = task
+        self.by_date.setdefault(task.task_date, []).append(task)
+
+    def unindex_task(self, task):
+        del self.by_id[task.id]
+        date_tasks = self.by_date[task.task_date]
+        date_tasks.remove(task)
+        if not date_tasks:
+            del self.by_date[task.task_date]
+
+    def get_date(self, task_date):
+        key = (self.current_stamp(), task_date) if not self.loaded else None
+        if key is not None and (self.date_cache[0] == key or date_index.usable()):
+            # 尚未加载时按日期索引只读这一天的行，浏览今日/历史某天不加载全部历史；第一次修改时才整体加载
+            # 存储文件没变时沿用上次读到的结果，菜单空闲重绘不做文件读取
+            if self.date_cache[0] != key:
+                self.date_cache = (key, list(iter_todos(task_date, task_date)))
+            hot = self.date_cache[1]
+            stored = {task.id for task in hot}
+        else:
+            self.refresh()
+            hot = self.by_date.get(task_date, [])
+            stored = self.by_id
+        archived = [task for task in archive_store.get_date(task_date) if task.id not in stored]
+        recurring = [task for task in recurrence_store.get_date(task_date) if task.id not in stored]
+        return archived + hot + recurring
+
+    def lookup(self, task_id):
+        task = self.by_id.get(task_id)
+        if task is None:
+            found = archive_store.find(task_id)
+            if found is None:
+                task = recurrence_store.pending([task_id]).get(task_id)
+                if task is None:
+                    raise KeyError(task_id)
+                return task
+            task = found[1]
+        return task
+
+    def take_pending(self, task_ids):
+        # 尚未写入的重复任务实例：第一次修改时整条写入任务库
+        pending = recurrence_store.pending(task_id for task_id in task_ids if task_id not in self.by_id)
+        for task in pending.values():
+            self.index_task(task)
+        return pending
+
+    def route(self, task_ids, make_record):
+        # 热数据中的任务写日志；归档中的任务改写所在月份的分段
+        records, archived_records = [], []
+        for task_id in task_ids:
+            (records if task_id in self.by_id else archived_records).append(make_record(task_id))
+        return records, archived_records
+
+    def get_today(self):
+        return self.get_date(get_today_date())
+
+    def query(self, date_from=None, date_to=None, statuses=None):
+        # 任务库已加载且文件未变时直接查内存索引，否则走流式查询，不为一次查询加载全部历史；归档部分只打开区间覆盖的分段
+        if write_behind.queue:
+            self.refresh()  # 排队的修改只在内存里，文件被外部改过时先写出再查
+        for task in archive_store.iter_range(date_from, date_to, statuses):
+            if task.id not in self.by_id:
+                yield task
+        # 重复任务实例状态都是未完成，不查未完成时不必生成
+        recurring = recurrence_store.expand(date_from, date_to) if statuses is None or 0 in statuses else {}
+        if self.loaded and self.current_stamp() == self.file_stamp:
+            for task_date in sorted(self.by_date.keys() | recurring.keys()):
+                if (date_from is None or task_date >= date_from) and (date_to is None or task_date <= date_to):
+                    for task in list(self.by_date.get(task_date, ())):
+                        if statuses is None or task.status in statuses:
+                            yield task
+                    for task in recurring.get(task_date, ()):
+                        if task.id not in self.by_id:
+                            yield task
+        else:
+            yield from iter_todos(date_from, date_to, statuses)
+            for task_date in sorted(recurring):
+                yield from recurring[task_date]
+
+    def ensure_stable_ids(self):
+        # 流式查询只能给旧格式行临时ID，每次读取都不同：要输出或按ID操作之前，除非日期索引确认没有旧格式行，
+        # 先整体加载一次（加载时把旧格式行连同分配的ID写回快照），之后的查询走内存索引
+        if not self.loaded and get_storage_backend() == "text" and not date_index.usable():
+            self.refresh()
+
+    def has_tasks(self):
+        if not self.loaded and date_index.usable():
+            return True  # 快照足够大才有日期索引
+        self.refresh()
+        return bool(self.by_id) or archive_store.active()
+
+    def has_storage(self):
+        # 只看存储文件是否存在，不为此加载全部历史
+        return any(get_storage_stamp()[1:])
+
+    def commit(self, records, archived_records=(), deltas=None, after=None):
+        # 开启后台写入时热数据的修改只排队，由 write_behind 合并写盘；after 为必须在这些记录写盘之后才能做的附带写入
+        if write_behind.accepts(self, archived_records):
+            write_behind.submit(self, records, deltas, after)
+            return
+        write_behind.flush()  # 同步提交之前先写出排队的修改，日志顺序与操作顺序一致
+        with storage_lock():
+            self.write(records, archived_records, deltas)
+            if after:
+                after()
+
+    def write(self, records, archived_records=(), deltas=None):
+        # 记录以任务ID为单位，过期视图的提交也不会覆盖别人的修改：追加在最新状态之后，再重新加载合并
+        # deltas 为本次提交对每日统计的增减 [(日期, 状态, ±1)]；视图过期时旧状态不可信，统计交给下次重建
+        with storage_lock():
+            before_stamp = self.current_stamp()
+            stale = self.loaded and before_stamp != self.file_stamp
+            if records:
+                commit_records(records)
+            if archived_records:
+                archive_store.apply(archived_records)
+            bump_generation()
+            self.file_stamp = self.current_stamp()
+            content_index.record_commit(before_stamp, self.file_stamp, list(records) + list(archived_records))
+            stats_rollup.record_commit(before_stamp, self.file_stamp, None if stale else deltas)
+        if stale:
+            self.reload()
+
+    def add_many(self, tasks, after=None):
+        # 尚未加载时只追加写入、不为新增而加载全部历史（命令行批量导入走这条路径），下次访问时再整体加载；
+        # 这时不知道导入的任务ID是否已存在，统计交给下次重建
+        deltas = None
+        if self.loaded:
+            self.refresh()
+            deltas = []
+            for task in tasks:
+                if task.id in self.by_id:
+                    old = self.by_id[task.id]
+                    deltas.append((old.task_date, old.status, -1))
+                    self.unindex_task(old)
+                self.index_task(task)
+                deltas.append((task.task_date, task.status, 1))
+        self.commit([journal_add(task) for task in tasks], deltas=deltas, after=after)
+
+    def add(self, task):
+        self.add_many([task])
+
+    def edit_content(self, task_id, content):
+        self.refresh()
+        pending = self.take_pending([task_id])
+        self.lookup(task_id).content = content
+        if pending:
+            # 实例写盘之后才记为已脱离规则：中途崩溃时实例仍按规则生成，不会凭空消失
+            self.commit([journal_add(pending[task_id])], deltas=[(pending[task_id].task_date, 0, 1)],
+                        after=lambda: recurrence_store.detach(pending))
+        else:
+            self.commit(*self.route([task_id], lambda task_id: journal_edit(task_id, content)), deltas=[])
+
+    def set_status_many(self, task_ids, status):
+        # 一批任务的状态修改作为一次提交写入
+        self.refresh()
+        pending = self.take_pending(task_ids)
+        deltas = []
+        for task_id in task_ids:
+            task = self.lookup(task_id)
+            if task_id not in pending:
+                deltas.append((task.task_date, task.status, -1))
+            deltas.append((task.task_date, status, 1))
+            task.status = status
+        records, archived_records = self.route([task_id for task_id in task_ids if task_id not in pending],
+                                               lambda task_id: journal_status(task_id, status))
+        self.commit([journal_add(task) for task in pending.values()] + records, archived_records, deltas,
+                    (lambda: recurrence_store.detach(pending)) if pending else None)
+
+    def set_status(self, task_id, status):
+        self.set_status_many([task_id], status)
+
+    def delete_many(self, task_ids):
+        self.refresh()
+        # 未写入的重复任务实例只需记下该日期不再生成
+        pending = recurrence_store.pending(task_id for task_id in task_ids if task_id not in self.by_id)
+        task_ids = [task_id for task_id in task_ids if task_id not in pending]
+        routed = self.route(task_ids, journal_delete)
+        deltas = []
+        for task_id in task_ids:
+            task = self.lookup(task_id)
+            deltas.append((task.task_date, task.status, -1))
+            if task_id in self.by_id:
+                self.unindex_task(task)
+        if task_ids:
+            self.commit(*routed, deltas=deltas)
+        if pending:
+            recurrence_store.detach(pending)
+
+    def delete(self, task_id):
+        self.delete_many([task_id])
+
+    def search_content(self, keyword):
+        write_behind.flush()  # 全文索引随提交更新，排队的新增/改内容先写盘才搜得到
+        return content_index.search(keyword)
+
+    def backlog(self, date_from, date_to):
+        return rollover_engine.backlog(date_from, date_to)
+
+    def carry(self, tasks, target_date):
+        self.refresh()  # 按日期索引浏览时尚未加载：先加载，新增副本才能记下统计增减、交给后台写入
+        return rollover_engine.carry(tasks, target_date)
+
+    def day_counts(self, date_from, date_to):
+        # 汇总只含已写盘的任务：排队中的修改按其增减补上；尚未写入的重复任务实例按未完成补上，最多算到今天
+        # 先取汇总：汇总需要重建时会先写出排队的修改
+        counts = stats_rollup.day_counts(date_from, date_to)
+        deltas = write_behind.pending_deltas()
+        if deltas is None:
+            write_behind.flush()
+            counts = stats_rollup.day_counts(date_from, date_to)
+            deltas = []
+        for task_date, status, diff in deltas:
+            if date_from <= task_date <= date_to:
+                day = list(counts.get(task_date, (0, 0, 0, 0)))
+                day[status] += diff
+                if any(day):
+                    counts[task_date] = tuple(day)
+                else:
+                    counts.pop(task_date, None)
+        for task_date, tasks in recurrence_store.expand(date_from, min(date_to, get_today_date())).items():
+            uncompleted, completed, ongoing, unknown = counts.get(task_date, (0, 0, 0, 0))
+            # 已修改、排队等待写盘的实例已计入上面的增减
+            count = sum(task.id not in self.by_id for task in tasks)
+            counts[task_date] = (uncompleted + count, completed, ongoing, unknown)
+        return dict(sorted(counts.items()))
+
+    def list_rules(self):
+        return recurrence_store.load()
+
+    def add_rule(self, content, freq, start):
+        return recurrence_store.add_rule(content, freq, start)
+
+    def stop_rule(self, rule_id):
+        return recurrence_store.stop_rule(rule_id)
+
+task_store = TaskStore()
+
+# ========== 后台写入：修改先进内存，由后台线程按间隔合并写盘 ==========
+# 交互界面中任务库的增删改只更新内存索引并排队，界面不等磁盘；后台线程在第一次修改之后等一个间隔，
+# 把这段时间排队的修改合并成一次提交（一次加锁、一次追加日志）。日志记录以任务ID为单位，重复回放结果不变，
+# 写到一半被打断时整批重写即可；写盘成功后才出队
+# 选择「0. 退出程序」、收到 SIGTERM/SIGHUP 或异常退出时先写完再退出；今日列表底部显示尚未写盘的修改数
+# 界面线程平时持有 write_behind.lock，只在等待菜单输入时放开，后台线程写盘时界面不会同时读写内存索引
+# 归档中的任务、命令行和服务模式仍然同步写入；配置 [STORAGE] write_behind_interval（秒，默认 1，0=每次操作立即写入）
+WRITE_BEHIND_INTERVAL = 1.0
+FLUSH_SIGNALS = ("SIGTERM", "SIGHUP", "SIGBREAK")
+
+def get_write_behind_interval():
+    try:
+        return init_config().getfloat("STORAGE", "write_behind_interval", fallback=WRITE_BEHIND_INTERVAL)
+    except ValueError:
+        return WRITE_BEHIND_INTERVAL
+
+class IdleWindow:
+    # with write_behind.idle(): 等待输入期间放开锁，让后台线程写盘
+    def __init__(self, lock):
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.release()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.lock.acquire()
+        return False
+
+class WriteBehind:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.queue = []      # [(任务库, 日志记录, 统计增减, 写盘之后的附带写入)]
+        self.flushed = 0     # 已写盘的提交数
+        self.error = None    # 最近一次后台写盘失败的原因，写盘成功后清除
+        self.thread = None
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+
+    def start(self, interval):
+        if self.thread is not None or interval <= 0:
+            return
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, args=(interval,), name="write-behind", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        # 停止后台写入并在当前线程写出剩余的修改；之后的提交恢复为同步写入
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.wake.set()
+        self.thread = None
+        self.flush()
+
+    def run(self, interval):
+        while not self.stopping.is_set():
+            self.wake.wait()
+            # 第一次修改之后再等一个间隔，期间的修改一起写出；退出时提前结束等待
+            self.stopping.wait(interval)
+            self.wake.clear()
+            try:
+                with self.lock:
+                    self.flush()
+                    self.error = None
+            except Exception as e:
+                self.error = str(e)
+                self.wake.set()  # 修改还在队列里，下个间隔重试
+
+    def accepts(self, store, archived_records):
+        return self.thread is not None and store.loaded and not archived_records
+
+    def submit(self, store, records, deltas, after):
+        with self.lock:
+            if self.queue and self.queue[0][0] is not store:
+                self.flush()
+            self.queue.append((store, records, deltas, after))
+        self.wake.set()
+
+    def pending_deltas(self):
+        # 排队修改对每日统计的增减；其中有增减未知的提交时返回 None
+        with self.lock:
+            if any(deltas is None for _, _, deltas, _ in self.queue):
+                return None
+            return [delta for _, _, deltas, _ in self.queue for delta in deltas]
+
+    def flush(self):
+        with self.lock:
+            if not self.queue:
+                return
+            batch = list(self.queue)
+            store = batch[0][0]
+            deltas = None if any(entry[2] is None for entry in batch) else [delta for entry in batch for delta in entry[2]]
+            with storage_lock():
+                store.write([record for entry in batch for record in entry[1]], (), deltas)
+                del self.queue[:len(batch)]
+                self.flushed += len(batch)
+                for entry in batch:
+                    if entry[3]:
+                        entry[3]()
+
+    def idle(self):
+        return IdleWindow(self.lock)
+
+    def describe(self):
+        if self.error:
+            return f" | ⚠️ {len(self.queue)} 项修改写盘失败，稍后重试：{self.error}"
+        if self.queue:
+            return f" | 💾 {len(self.queue)} 项修改待写盘"
+        return ""
+
+write_behind = WriteBehind()
+atexit.register(write_behind.stop)
+
+def exit_on_signal(signum, frame):
+    # 按正常退出处理：退出时由 atexit 写出排队的修改
+    raise SystemExit(128 + signum)
+
+def install_flush_signals():
+    for name in FLUSH_SIGNALS:
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), exit_on_signal)
+
+# ========== 派生数据的持久化：快照 + 增量日志 ==========
+# 全文索引、每日统计等由任务库派生的数据共用：TODO_FILE+后缀 为快照，第一行是 JSON（对应的存储文件戳和数据），
+# 之后是子类写出的二进制数组（如倒排表）；快照只含数据、不含可执行的内容，被改坏了也只会触发重建
+# 后缀.log 每次提交追加一行 JSON 增量，记录提交前后的存储文件戳；
+# 加载时快照+增量能一路接上当前存储文件戳才有效，否则从任务库重建（文件被外部修改过）
+# 从未建过快照时不记增量（第一次使用时反正要重建）；日志超过阈值时，内存中的数据接得上就写新快照，
+# 否则删掉快照和日志等下次使用时重建——不使用该功能的用户，日志不会无限增长
+# 子类提供 SUFFIX、LOG_COMPACT_SIZE，以及 restore(快照数据, 数组字节)、snapshot()、replay(增量)、rebuild_data()，
+# 有数组要写时再提供 write_arrays(f)；快照内容不合法时 restore 抛出 ValueError/TypeError/KeyError
+class StampedSnapshot:
+    SUFFIX = None
+    LOG_COMPACT_SIZE = None
+
+    def __init__(self):
+        self.stamp = None  # 内存中数据对应的存储文件戳
+        self.file = None   # 内存中数据所属的快照文件；None=未加载，切换清单后与 get_file() 不同
+
+    def get_file(self):
+        return TODO_FILE + self.SUFFIX
+
+    def get_log_file(self):
+        return TODO_FILE + self.SUFFIX + ".log"
+
+    def is_current(self):
+        return self.file is not None and self.file == self.get_file()
+
+    def rebuild(self):
+        write_behind.flush()  # 重建取自内存任务库，排队的修改先写盘，数据才与文件戳对应
+        task_store.refresh()
+        self.file = self.get_file()
+        self.rebuild_data()
+        self.stamp = repr(task_store.file_stamp)
+        self.save()
+
+    def save(self):
+        path = self.get_file()
+        with open(path + ".tmp", "wb") as f:
+            f.write(json.dumps({"stamp": self.stamp, "data": self.snapshot()}, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.write_arrays(f)
+        os.replace(path + ".tmp", path)
+        if os.path.exists(self.get_log_file()):
+            os.remove(self.get_log_file())
+
+    def load(self):
+        # 快照+增量日志能接上当前存储文件戳才算有效，否则重建；有效时不加载任务库
+        self.file = self.get_file()
+        try:
+            with open(self.file, "rb") as f:
+                data = json.loads(f.readline())
+                self.restore(data["data"], f.read())
+            if not isinstance(data["stamp"], str):
+                raise ValueError(data["stamp"])
+            self.stamp = data["stamp"]
+            if os.path.exists(self.get_log_file()):
+                with open(self.get_log_file(), "r", encoding="utf-8") as f:
+                    for line in f:
+                        if not line.endswith("\n"):
+                            break
+                        entry = json.loads(line)
+                        if entry["before"] != self.stamp:
+                            break
+                        self.replay(entry["data"])
+                        self.stamp = entry["after"]
+        except (OSError, KeyError, ValueError, TypeError, IndexError):
+            self.stamp = None
+        if self.stamp != repr(get_storage_stamp()):
+            self.rebuild()
+        elif os.path.exists(self.get_log_file()) and os.path.getsize(self.get_log_file()) >= self.LOG_COMPACT_SIZE:
+            self.save()
+
+    def write_arrays(self, f):
+        pass
+
+    def ensure_loaded(self):
+        if not self.is_current() or self.stamp != repr(get_storage_stamp()):
+            self.load()
+
+    def record_commit(self, before_stamp, after_stamp, payload):
+        # payload 为 None 表示增量未知：不追加日志，增量链在此断开，下次使用时重建
+        if payload is None:
+            self.file = None
+            return
+        entry = {"before": repr(before_stamp), "after": repr(after_stamp), "data": payload}
+        chained = self.is_current() and self.stamp == entry["before"]
+        if chained:
+            self.replay(payload)
+            self.stamp = entry["after"]
+        if not os.path.exists(self.get_file()):
+            return
+        with open(self.get_log_file(), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        if os.path.getsize(self.get_log_file()) >= self.LOG_COMPACT_SIZE:
+            if chained:
+                self.save()
+            else:
+                os.remove(self.get_file())
+                os.remove(self.get_log_file())
+
+# ========== 任务内容全文索引：字符二元组倒排索引 ==========
+# 内容以中文为主，不分词，按相邻两个字符建倒排表；查询时取各二元组倒排表的交集，再用原文核对
+# 删除和改内容不去倒排表里删旧条目，查询核对时自然过滤，重建索引时清理
+# 持久化：TODO_FILE.ftidx 为索引快照，TODO_FILE.ftidx.log 为增量日志（见 StampedSnapshot）
+FTS_SUFFIX = ".ftidx"
+FTS_LOG_COMPACT_SIZE = 1024 * 1024
+
+def content_grams(text):
+    text = text.casefold()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+class ContentIndex(StampedSnapshot):
+    SUFFIX = FTS_SUFFIX
+    LOG_COMPACT_SIZE = FTS_LOG_COMPACT_SIZE
+
+    def __init__(self):
+        super().__init__()
+        self.postings = None   # 二元组 -> array('I') 文档编号
+        self.doc_ids = []      # 文档编号 -> 任务ID
+        self.doc_of = {}       # 任务ID -> 文档编号
+        self.doc_month = {}    # 归档中的任务ID -> 所在月份，查询时只打开命中的分段
+
+    def add_doc(self, task_id, content):
+        doc = self.doc_of.get(task_id)
+        if doc is None:
+            doc = len(self.doc_ids)
+            self.doc_ids.append(task_id)
+            self.doc_of[task_id] = doc
+        for gram in content_grams(content):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array.array("I")
+            posting.append(doc)
+
+    def rebuild_data(self):
+        self.postings = {}
+        self.doc_ids = []
+        self.doc_of = {}
+        self.doc_month = {}
+        for task in task_store.by_id.values():
+            self.add_doc(task.id, task.content)
+        for task in archive_store.iter_range():
+            self.add_doc(task.id, task.content)
+            self.doc_month[task.id] = task.task_date[:7]
+
+    def snapshot(self):
+        # 倒排表不写成 JSON 数字列表：JSON 中只记二元组和各自的长度，文档编号按同样顺序接在后面整体写出
+        return {"doc_ids": self.doc_ids, "doc_month": self.doc_month, "grams": list(self.postings),
+                "lengths": [len(posting) for posting in self.postings.values()],
+                "itemsize": array.array("I").itemsize, "byteorder": sys.byteorder}
+
+    def write_arrays(self, f):
+        for posting in self.postings.values():
+            posting.tofile(f)
+
+    def restore(self, data, blob):
+        if data["itemsize"] != array.array("I").itemsize or data["byteorder"] != sys.byteorder:
+            raise ValueError("快照来自不同平台")
+        docs = array.array("I")
+        docs.frombytes(blob)
+        doc_ids = data["doc_ids"]
+        if sum(data["lengths"]) != len(docs) or len(data["grams"]) != len(data["lengths"]) or (docs and max(docs) >= len(doc_ids)):
+            raise ValueError("快照不完整")
+        postings = {}
+        offset = 0
+        for gram, length in zip(data["grams"], data["lengths"]):
+            postings[gram] = docs[offset:offset + length]
+            offset += length
+        self.postings = postings
+        self.doc_ids = doc_ids
+        self.doc_of = {task_id: doc for doc, task_id in enumerate(doc_ids)}
+        self.doc_month = data["doc_month"]
+
+    def replay(self, docs):
+        for task_id, content in docs:
+            self.add_doc(task_id, content)
+
+    def record_commit(self, before_stamp, after_stamp, records):
+        # 只有新增和改内容会产生新的二元组
+        docs = []
+        for record in records:
+            op, _, rest = record.partition("|")
+            if op == "A":
+                task_id, _, _, content = rest.split("|", 3)
+                docs.append((task_id, content))
+            elif op == "E":
+                docs.append(tuple(rest.split("|", 1)))
+        super().record_commit(before_stamp, after_stamp, docs)
+
+    def resolve(self, task_id):
+        task = task_store.by_id.get(task_id)
+        if task is None and task_id in self.doc_month:
+            task = archive_store.get_task(self.doc_month[task_id], task_id)
+        return task
+
+    def search(self, keyword):
+        keyword = keyword.casefold()
+        task_store.refresh()  # 命中的任务从内存任务库取
+        self.ensure_loaded()
+        if len(keyword) < 2:
+            candidates = list(task_store.by_id.values()) + list(archive_store.iter_range())
+        else:
+            postings = sorted((self.postings.get(gram, ()) for gram in content_grams(keyword)), key=len)
+            docs = set(postings[0])
+            for posting in postings[1:]:
+                if not docs:
+                    break
+                docs.intersection_update(posting)
+            candidates = [self.resolve(self.doc_ids[doc]) for doc in docs]
+        results = [task for task in candidates if task is not None and keyword in task.content.casefold()]
+        results.sort(key=lambda task: (task.day, task.clock))
+        return results
+
+content_index = ContentIndex()
+
+# ========== 每日统计汇总：按日期维护各状态的任务条数 ==========
+# 每次提交顺带记下对每日统计的增减，统计和报表只读汇总，不再扫描历史任务
+# 持久化：TODO_FILE.stats 为快照，TODO_FILE.stats.log 为增量日志（见 StampedSnapshot）；
+# 重建时归档部分直接取清单里各分段的每日条数，不解压分段
+STATS_SUFFIX = ".stats"
+STATS_LOG_COMPACT_SIZE = 256 * 1024
+
+class StatsRollup(StampedSnapshot):
+    SUFFIX = STATS_SUFFIX
+    LOG_COMPACT_SIZE = STATS_LOG_COMPACT_SIZE
+
+    def __init__(self):
+        super().__init__()
+        self.days = None   # 日期 -> [未完成, 已完成, 进行中, 未知] 条数
+
+    def apply(self, deltas):
+        for task_date, status, diff in deltas:
+            counts = self.days.setdefault(task_date, [0, 0, 0, 0])
+            counts[status] += diff
+            if not any(counts):
+                del self.days[task_date]
+
+    def rebuild_data(self):
+        self.days = {}
+        self.apply((task.task_date, task.status, 1) for task in task_store.by_id.values())
+        if archive_store.active():
+            segments = archive_store.manifest()["segments"]
+            for month in sorted(segments):
+                if "days" in segments[month]:
+                    for task_date, counts in segments[month]["days"].items():
+                        self.apply((task_date, status, count) for status, count in enumerate(counts) if count)
+                else:
+                    # 早期版本写的清单没有每日条数，只能打开分段统计
+                    self.apply((task.task_date, task.status, 1) for task in archive_store.load_segment(month)[1].values()
+                               if task.id not in task_store.by_id)
+
+    def snapshot(self):
+        return self.days
+
+    def restore(self, data, blob):
+        if not isinstance(data, dict) or not all(isinstance(counts, list) and len(counts) == len(STATUS_MAP)
+                                                 and all(type(count) is int for count in counts) for counts in data.values()):
+            raise ValueError("统计快照不完整")
+        self.days = data
+
+    def replay(self, deltas):
+        self.apply(deltas)
+
+    def day_counts(self, date_from, date_to):
+        self.ensure_loaded()
+        return {task_date: tuple(counts) for task_date, counts in sorted(self.days.items())
+                if date_from <= task_date <= date_to}
+
+stats_rollup = StatsRollup()
+
+# 报表按日/周/月汇总；周以周一为起点
+REPORT_PERIODS = {"day": "按日", "week": "按周", "month": "按月"}
+REPORT_DEFAULT_DAYS = 30
+REPORT_BAR_WIDTH = 20
+
+def report_period_key(task_date, period):
+    if period == "month":
+        return task_date[:7]
+    if period == "week":
+        # 旧版本留下的非标准日期无法归到某一周，单独成行
+        day = date_to_day(task_date)
+        if not day:
+            return task_date
+        return f"{day_to_date(day - datetime.date.fromordinal(day).weekday())} 起一周"
+    return task_date
+
+def build_report(day_counts, period):
+    # 返回 [(周期, [未完成, 已完成, 进行中, 未知])]，最后一行为合计
+    rows = {}
+    total = [0, 0, 0, 0]
+    for task_date, counts in day_counts.items():
+        row = rows.setdefault(report_period_key(task_date, period), [0, 0, 0, 0])
+        for status, count in enumerate(counts):
+            row[status] += count
+            total[status] += count
+    return list(rows.items()) + [("合计", total)]
+
+def format_report_row(label, counts):
+    total = sum(counts)
+    rate = counts[1] / total if total else 0
+    bar = "█" * round(rate * REPORT_BAR_WIDTH)
+    return (f"{label:<12} | 总数 {total:>5} | ✅{counts[1]:>5} ⚡{counts[2]:>4} ❌{counts[0]:>4} ❓{counts[3]:>4} "
+            f"| 完成率 {rate:>6.1%} {bar}")
+
+# ========== 多个任务清单：每个清单是一个独立分片 ==========
+# 默认清单仍是 todo_list.txt，其余清单存为 todo_list.清单名.txt，日志、锁、索引、归档、规则等附属文件各自跟随；
+# 清单名登记在配置 [LISTS] names；功能开关可按清单单独设置（配置节 FUNCTION_SWITCH:清单名），未设置的沿用全局
+# 切换清单时替换本模块中按清单区分的全局对象，之前清单的内存视图保留，切回来不必重新加载；
+# 每次会话只加载当前清单，加载和保存的开销只与当前清单的大小有关
+DEFAULT_LIST = "default"
+LIST_NAME_MAX_LENGTH = 32
+LIST_NAME_FORBIDDEN = set('\\/:*?"<>|,.%')
+LIST_STATE_FACTORIES = {
+    "task_store": lambda: TaskStore(),
+    "content_index": lambda: ContentIndex(),
+    "stats_rollup": lambda: StatsRollup(),
+    "archive_store": lambda: ArchiveStore(),
+    "rollover_engine": lambda: RolloverEngine(),
+    "recurrence_store": lambda: RecurrenceStore(),
+    "date_index": lambda: DateIndex(),
+}
+
+def check_list_name(name):
+    if not name or len(name) > LIST_NAME_MAX_LENGTH:
+        return f"清单名不能为空，且不超过 {LIST_NAME_MAX_LENGTH} 个字符"
+    if any(c in LIST_NAME_FORBIDDEN or c.isspace() for c in name):
+        return "清单名不能包含空白和 \\ / : * ? \" < > | , . % 等字符"
+    return None
+
+class UsingList:
+    # with list_manager.using(清单名): 临时切换到另一个清单，结束后切回
+    def __init__(self, name):
+        self.name = name
+        self.previous = None
+
+    def __enter__(self):
+        self.previous = list_manager.active
+        list_manager.switch(self.name)
+
+    def __exit__(self, exc_type, exc, tb):
+        list_manager.switch(self.previous)
+
+class ListManager:
+    def __init__(self):
+        self.active = DEFAULT_LIST
+        self.base_file = None  # 默认清单的任务文件，第一次切换时记下
+        self.states = {}       # 清单名 -> {全局对象名: 对象}
+
+    def get_file(self, name):
+        if self.base_file is None:
+            self.base_file = TODO_FILE
+        if name == DEFAULT_LIST:
+            return self.base_file
+        root, ext = os.path.splitext(self.base_file)
+        return f"{root}.{name}{ext}"
+
+    def names(self):
+        extra = init_config().get("LISTS", "names", fallback="")
+        return [DEFAULT_LIST] + [name for name in extra.split(",") if name]
+
+    def add(self, name):
+        error = check_list_name(name)
+        if error:
+            raise ValueError(error)
+        names = self.names()
+        if name not in names:
+            switch_registry.set_option("LISTS", "names", ",".join(names[1:] + [name]))
+
+    def switch(self, name):
+        if name == self.active:
+            return
+        if name not in self.names():
+            raise KeyError(name)
+        if storage_lock_depth:
+            raise RuntimeError("持有存储锁时不能切换清单")  # 锁文件跟随清单，锁内切换会写到未加锁的分片
+        write_behind.flush()  # 排队的修改属于当前清单的文件，切换前写出
+        module = globals()
+        self.states[self.active] = {key: module[key] for key in LIST_STATE_FACTORIES}
+        state = self.states.get(name)
+        if state is None:
+            state = {key: factory() for key, factory in LIST_STATE_FACTORIES.items()}
+        module.update(state)
+        module["TODO_FILE"] = self.get_file(name)
+        self.active = name
+
+    def using(self, name):
+        return UsingList(name)
+
+    def today_by_list(self):
+        # 逐个清单取今日任务，用到哪个清单才读哪个；已加载的清单直接查内存，其余只流式读出今天的任务
+        for name in self.names():
+            with self.using(name):
+                tasks = task_store.get_today() if task_store.loaded else load_todos(True)
+            yield name, tasks
+
+list_manager = ListManager()
+
+# ========== 性能统计：菜单操作耗时、文件读写与配置读取计数 ==========
+# 默认关闭，关闭时每次菜单操作只多一次属性判断；环境变量 PYTHONTODO_STATS=1 或管理员菜单中开启
+# 开启后才在本模块内挂上计数用的 open；界面上的等待输入和提示停顿都经过 ui_input/ui_sleep，开启时计入等待时间，
+# 从操作耗时中扣除（只统计本模块的界面等待，不替换 time.sleep 等全局函数）
+# 环境变量 PYTHONTODO_CPROFILE=文件路径 时整个会话在 cProfile 下运行，退出时写出统计文件
+PERF_HISTORY_SIZE = 200
+PERF_TOP_N = 10
+PERF_BAR_WIDTH = 30
+PERF_BUCKETS = ((0.001, "<1ms"), (0.005, "<5ms"), (0.01, "<10ms"), (0.05, "<50ms"),
+                (0.1, "<100ms"), (0.5, "<500ms"), (1.0, "<1s"), (float("inf"), "≥1s"))
+
+class CountedFile:
+    # with 块内拿到的是真实文件对象，逐行读写不经过包装；关闭时按底层文件位置记下字节数
+    def __init__(self, file, writing):
+        self.file = file
+        self.writing = writing
+        self.start = self.raw_position()
+
+    def raw_position(self):
+        raw = getattr(self.file, "buffer", self.file)
+        raw = getattr(raw, "raw", raw)
+        try:
+            return raw.tell()
+        except (OSError, ValueError):
+            return 0
+
+    def record(self):
+        if self.file.closed:
+            return
+        if self.writing:
+            self.file.flush()
+        moved = max(self.raw_position() - self.start, 0)
+        if self.writing:
+            perf_stats.writes += 1
+            perf_stats.write_bytes += moved
+        else:
+            perf_stats.reads += 1
+            perf_stats.read_bytes += moved
+
+    def __enter__(self):
+        return self.file.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record()
+        return self.file.__exit__(exc_type, exc, tb)
+
+    def close(self):
+        self.record()
+        self.file.close()
+
+    def __iter__(self):
+        return iter(self.file)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+def counted_open(file, mode="r", *args, **kwargs):
+    return CountedFile(builtins.open(file, mode, *args, **kwargs), any(c in mode for c in "wax+"))
+
+def ui_input(prompt=""):
+    if not perf_stats.enabled:
+        return input(prompt)
+    begin = time.perf_counter()
+    try:
+        return input(prompt)
+    finally:
+        perf_stats.waited += time.perf_counter() - begin
+
+def ui_sleep(seconds):
+    if perf_stats.enabled:
+        perf_stats.waited += seconds
+    time.sleep(seconds)
+
+class PerfStats:
+    def __init__(self):
+        self.enabled = False
+        self.history = collections.deque(maxlen=PERF_HISTORY_SIZE)
+        self.reads = self.writes = self.read_bytes = self.write_bytes = 0
+        self.waited = 0.0
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        globals()["open"] = counted_open
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        globals().pop("open", None)
+
+    def run(self, name, action):
+        if not self.enabled:
+            return action()
+        before = (self.reads, self.writes, self.read_bytes, self.write_bytes, switch_registry.read_count, self.waited)
+        begin = time.perf_counter()
+        try:
+            return action()
+        finally:
+            wall = time.perf_counter() - begin
+            self.history.append({
+                "name": name,
+                "at": datetime.datetime.now().strftime("%H:%M:%S"),
+                "wall": wall,
+                "busy": max(wall - (self.waited - before[5]), 0.0),
+                "reads": self.reads - before[0],
+                "writes": self.writes - before[1],
+                "read_bytes": self.read_bytes - before[2],
+                "write_bytes": self.write_bytes - before[3],
+                "config_reads": switch_registry.read_count - before[4],
+                "tasks": len(getattr(task_store, "by_id", ())),
+            })
+
+    def clear(self):
+        self.history.clear()
 
-def get_func_status(func_name):
-    config = init_config()
-    return config.get("FUNCTION_SWITCH", func_name, fallback="1") == "1"
+perf_stats = PerfStats()
+if os.environ.get("PYTHONTODO_STATS") == "1":
+    perf_stats.enable()
 
-def set_func_status(func_name, status):
-    config = init_config()
-    config["FUNCTION_SWITCH"][func_name] = "1" if status else "0"
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        config.write(f)
+def format_perf_record(record):
+    return (f"{record['busy'] * 1000:>9.2f}ms  {FUNCTIONS.get(record['name'], record['name'])}  "
+            f"读{record['reads']}次/{record['read_bytes'] / 1024:.1f}KB 写{record['writes']}次/{record['write_bytes'] / 1024:.1f}KB "
+            f"配置读取{record['config_reads']}次 任务{record['tasks']}条 [{record['at']}]")
 
-# ========== 时间相关函数 补全昨日/明日日期 ==========
-def get_format_time():
-    week_dict = {0: "周一", 1: "周二", 2: "周三", 3: "周四", 4: "周五", 5: "周六", 6: "周日"}
-    now = datetime.datetime.now()
-    week_num = now.weekday()
-    return now.strftime(f"%Y-%m-%d %H:%M:%S {week_dict[week_num]}")
+def build_perf_report():
+    records = list(perf_stats.history)
+    lines = [f"状态：{'✅ 已开启' if perf_stats.enabled else '❌ 未开启（启动时设置 PYTHONTODO_STATS=1 也可开启）'}"]
+    if not records:
+        lines.append("\n暂无记录，开启后执行菜单操作即可统计")
+        return lines
+    lines.append(f"最近 {len(records)} 次操作：耗时合计 {sum(r['busy'] for r in records) * 1000:.1f}ms，"
+                 f"读文件 {sum(r['reads'] for r in records)} 次/{sum(r['read_bytes'] for r in records) / 1024:.1f}KB，"
+                 f"写文件 {sum(r['writes'] for r in records)} 次/{sum(r['write_bytes'] for r in records) / 1024:.1f}KB，"
+                 f"配置读取 {sum(r['config_reads'] for r in records)} 次")
+    counts = [0] * len(PERF_BUCKETS)
+    for record in records:
+        counts[next(i for i, (limit, _) in enumerate(PERF_BUCKETS) if record["busy"] < limit)] += 1
+    lines.append("\n耗时分布（不含等待输入和提示停顿）：")
+    for (_, label), count in zip(PERF_BUCKETS, counts):
+        lines.append(f"  {label:>6} {'█' * round(count / max(counts) * PERF_BAR_WIDTH):<{PERF_BAR_WIDTH}} {count}")
+    lines.append(f"\n最慢的 {min(PERF_TOP_N, len(records))} 次操作：")
+    for index, record in enumerate(sorted(records, key=lambda r: r["busy"], reverse=True)[:PERF_TOP_N], start=1):
+        lines.append(f"  {index:>2}.{format_perf_record(record)}")
+    return lines
 
-def get_today_date():
-    return datetime.datetime.now().strftime("%Y-%m-%d")
+def run_profiled(func):
+    # 设置了 PYTHONTODO_CPROFILE 时在 cProfile 下运行整个会话，退出时写出统计文件（可用 python -m pstats 查看）
+    profile_file = os.environ.get("PYTHONTODO_CPROFILE")
+    if not profile_file:
+        return func()
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+        profiler.dump_stats(profile_file)
+        print(f"📊 cProfile 统计已写入 {profile_file}", file=sys.stderr)
 
-def get_today_date_yyyymmdd():
-    return datetime.datetime.now().strftime("%Y%m%d")
+# ========== 终端渲染层 ==========
+# 清屏用 ANSI 转义序列，不再每次重绘都启动 cls/clear 子进程；
+# 每一帧先拼成完整字符串再一次写出，当前时间在渲染时现取，不再需要每秒刷新的后台线程
+ANSI_CLEAR = "\033[2J\033[3J\033[H"
+ansi_enabled = False
 
-def get_yesterday_date():
-    # 获取昨日完整日期 2026-01-17
-    yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
-    return yesterday.strftime("%Y-%m-%d")
+def enable_ansi():
+    # Windows 控制台需要先打开虚拟终端处理才能识别转义序列
+    global ansi_enabled
+    if ansi_enabled:
+        return
+    ansi_enabled = True
+    if os.name == "nt":
+        try:
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.GetStdHandle(-11)
+            mode = ctypes.c_uint32()
+            if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+                kernel32.SetConsoleMode(handle, mode.value | 0x0004)
+        except (AttributeError, OSError):
+            pass
 
-def get_yesterday_date_yyyymmdd():
-    yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
-    return yesterday.strftime("%Y%m%d")
+def render_frame(lines):
+    enable_ansi()
+    sys.stdout.write(ANSI_CLEAR + "\n".join(lines) + "\n")
+    sys.stdout.flush()
 
-def get_tomorrow_date():
-    # 获取明日完整日期 2026-01-19
-    tomorrow = datetime.datetime.now() + datetime.timedelta(days=1)
-    return tomorrow.strftime("%Y-%m-%d")
+# ========== 分页显示：按终端高度只格式化当前可见的一页 ==========
+# 今日列表按页渲染，菜单输入 n/p 翻页；序号始终是在整个列表中的位置，编辑/改状态/删除输入的序号不受翻页影响
+# 查询结果等长列表每页拼成一个字符串一次写出，终端中翻页前等待回车；输出被重定向时不等待
+PAGE_MIN_SIZE = 5
+PAGED_RESERVED_LINES = 4  # 标题、翻页提示和结束后的提示行
 
-def date_convert(ymd_str):
-    if len(ymd_str) == 8 and ymd_str.isdigit():
-        return f"{ymd_str[:4]}-{ymd_str[4:6]}-{ymd_str[6:8]}"
-    return ""
+def count_screen_lines(lines):
+    return sum(line.count("\n") + 1 for line in lines)
 
-# ========== 任务加载与保存 ==========
-def load_todos(is_today_only=True):
-    todos = []
-    today = get_today_date()
-    if os.path.exists(TODO_FILE):
-        with open(TODO_FILE, "r", encoding="utf-8") as f:
-            for line in f.readlines():
-                line = line.strip()
-                if line:
-                    line_split = line.split("|", 2)
-                    if len(line_split) == 2:
-                        status, content = line_split
-                        create_time = f"{today} 00:00:00 历史任务"
-                    else:
-                        status, content, create_time = line_split
-                    try:
-                        status_int = int(status)
-                        if status_int not in STATUS_MAP:
-                            status_int = 0
-                    except ValueError:
-                        status_int = 0
-                    task_date = create_time.split(" ")[0]
-                    if not is_today_only or task_date == today:
-                        todos.append({
-                            "content": content,
-                            "status": status_int,
-                            "create_time": create_time,
-                            "task_date": task_date
-                        })
-    return todos
+def get_page_size(reserved_lines):
+    return max(shutil.get_terminal_size().lines - reserved_lines, PAGE_MIN_SIZE)
 
-def save_todos(todos):
-    with open(TODO_FILE, "w", encoding="utf-8") as f:
-        for todo in todos:
-            f.write(f"{todo['status']}|{todo['content']}|{todo['create_time']}\n")
+class Pager:
+    def __init__(self):
+        self.page = 0
+        self.page_size = 0
+        self.page_count = 1
 
-# ========== 实时时间线程 ==========
-def time_update_thread():
-    global current_time_str
-    while True:
-        current_time_str = get_format_time()
-        time.sleep(1)
+    def window(self, total, page_size):
+        # 返回当前页的 [起始, 结束) 下标；列表变短时退回到最后一页
+        self.page_size = page_size
+        self.page_count = max((total + page_size - 1) // page_size, 1)
+        self.page = min(self.page, self.page_count - 1)
+        start = self.page * page_size
+        return start, min(start + page_size, total)
+
+    def move(self, step):
+        self.page = min(max(self.page + step, 0), self.page_count - 1)
+
+today_pager = Pager()
+
+def print_paged(lines, title=None):
+    # lines 可以是生成器：只有显示到的那几页才会被格式化；返回 (已显示条数, 是否全部显示完)
+    interactive = sys.stdout.isatty()
+    page_size = get_page_size(PAGED_RESERVED_LINES)
+    buffer = [title] if title else []
+    count = 0
+    for line in lines:
+        if count and count % page_size == 0:
+            sys.stdout.write("\n".join(buffer) + "\n")
+            sys.stdout.flush()
+            buffer = []
+            if interactive and ui_input(f"—— 已显示 {count} 条，回车显示下一页，q 结束显示 ——").strip().lower() == "q":
+                return count, False
+        buffer.append(line)
+        count += 1
+    if count:
+        sys.stdout.write("\n".join(buffer) + "\n")
+        sys.stdout.flush()
+    return count, True
 
 # ========== 任务展示 ==========
-def show_todos(todos):
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print("=" * 70)
-    print("        📋 Python Todo List (无日志+双顺延+全功能可控+无BUG)")
-    print("=" * 70)
+def build_todo_frame(todos, reserved_lines=0):
     today = get_today_date()
-    print(f"\n📅 今日日期：{today} ({get_today_date_yyyymmdd()}) | 昨日日期：{get_yesterday_date()} ({get_yesterday_date_yyyymmdd()})")
-    print(f"📌 {STATUS_TIPS}")
-    
-    total = len(todos)
-    uncompleted = len([t for t in todos if t["status"] == 0])
-    ongoing = len([t for t in todos if t["status"] == 2])
-    completed = len([t for t in todos if t["status"] == 1])
-    unknown = len([t for t in todos if t["status"] == 3])
-    print(f"📊 今日任务统计：总任务: {total} | ❌未完成: {uncompleted} | ⚡进行中: {ongoing} | ✅已完成: {completed} | ❓未知: {unknown}")
-    
-    print("\n【今日待办事项 | 次日自动隐藏，历史任务可查询/修改】")
+    list_title = "" if list_manager.active == DEFAULT_LIST else f"清单「{list_manager.active}」· "
+    # 统计取自每日汇总，不再逐条数一遍今日任务
+    uncompleted, completed, ongoing, unknown = task_store.day_counts(today, today).get(today, (0, 0, 0, 0))
+    total = uncompleted + completed + ongoing + unknown
+    lines = [
+        "=" * 70,
+        "        📋 Python Todo List (无日志+双顺延+全功能可控+无BUG)",
+        "=" * 70,
+        f"\n📅 今日日期：{today} ({get_today_date_yyyymmdd()}) | 昨日日期：{get_yesterday_date()} ({get_yesterday_date_yyyymmdd()})",
+        f"📌 {STATUS_TIPS}",
+        f"📊 今日任务统计：总任务: {total} | ❌未完成: {uncompleted} | ⚡进行中: {ongoing} | ✅已完成: {completed} | ❓未知: {unknown}",
+        f"\n【{list_title}今日待办事项 | 次日自动隐藏，历史任务可查询/修改】"
+    ]
+    footer = ["\n" + " " * 22 + f"🕒 当前时间：{get_format_time()}{write_behind.describe()}", "=" * 70]
     if not todos:
-        print("    ✨ 暂无今日待办，添加你的第一条待办吧！✨")
+        today_pager.window(0, 1)
+        lines.append("    ✨ 暂无今日待办，添加你的第一条待办吧！✨")
     else:
-        for index, todo in enumerate(todos, start=1):
-            status_label = STATUS_MAP[todo["status"]][0]
-            print(f"    {index}. {status_label} | {todo['content']} | 添加于：{todo['create_time']}")
+        # 只格式化当前页；页头页尾、菜单和翻页提示行之外的终端高度都用来显示任务
+        page_size = get_page_size(count_screen_lines(lines + footer) + reserved_lines + 1)
+        start, end = today_pager.window(len(todos), page_size)
+        for index in range(start, end):
+            todo = todos[index]
+            status_label = STATUS_MAP[todo.status][0]
+            lines.append(f"    {index + 1}. {status_label} | {todo.content} | 添加于：{todo.create_time}")
+        if today_pager.page_count > 1:
+            lines.append(f"    —— 第 {today_pager.page + 1}/{today_pager.page_count} 页，"
+                         f"共 {len(todos)} 条 | 菜单输入 n 下一页、p 上一页 ——")
+    return lines + footer
 
-    print("\n" + " " * 22 + f"🕒 当前时间：{current_time_str}")
-    print("=" * 70)
+def show_todos(todos, menu_lines=()):
+    # 菜单之后还有一行输入提示
+    render_frame(build_todo_frame(todos, count_screen_lines(menu_lines) + 2) + list(menu_lines))
 
 # ========== 核心功能函数（全部加开关校验，无改动） ==========
 def add_todo(todos):
     if not get_func_status("add_todo"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    content = input("请输入待办事项内容：").strip()
+    content = ui_input("请输入待办事项内容：").strip()
     if not content:
         print("❌ 待办内容不能为空！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    create_time = get_format_time()
-    new_task = {
-        "content": content,
-        "status": 0,
-        "create_time": create_time,
-        "task_date": get_today_date()
-    }
-    todos.append(new_task)
-    all_todos = load_todos(False)
-    all_todos.append(new_task)
-    save_todos(all_todos)
+    new_task = make_task(new_task_id(), content, 0, get_format_time())
+    task_store.add(new_task)
     print(f"✅ 成功添加今日待办：{content}（默认状态：未完成 0）")
-    time.sleep(1)
+    ui_sleep(1)
 
 def edit_todo(todos):
     if not get_func_status("edit_todo"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
     if not todos:
         print("❌ 暂无待办事项！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
     try:
-        num = int(input("请输入要编辑的待办序号："))
+        num = int(ui_input("请输入要编辑的待办序号："))
         if 1 <= num <= len(todos):
-            old_content = todos[num-1]["content"]
-            new_content = input(f"当前内容：{old_content}\n请输入修改后的内容：").strip()
+            old_content = todos[num-1].content
+            new_content = ui_input(f"当前内容：{old_content}\n请输入修改后的内容：").strip()
             if new_content:
-                all_todos = load_todos(False)
-                target_task = todos[num-1]
-                for i in range(len(all_todos)):
-                    if all_todos[i]["create_time"] == target_task["create_time"]:
-                        all_todos[i]["content"] = new_content
-                        break
-                save_todos(all_todos)
+                task_store.edit_content(todos[num-1].id, new_content)
                 print(f"✅ 已修改为：{new_content}")
             else:
                 print("❌ 修改内容不能为空！")
@@ -209,343 +2464,1417 @@ def edit_todo(todos):
             print("❌ 序号不存在！")
     except ValueError:
         print("❌ 请输入正确数字！")
-    time.sleep(1)
+    ui_sleep(1)
 
 def edit_history_todo_content():
     if not get_func_status("edit_history_content"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    all_todos = load_todos(False)
-    if not all_todos:
+    if not task_store.has_tasks():
         print("❌ 暂无历史任务！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
     print(f"\n===== ✏️ 修改历史任务内容 (输入格式：yyyymmdd) =====")
     print(f"💡 昨日日期：{get_yesterday_date_yyyymmdd()} | {STATUS_TIPS}")
-    date_input = input("请输入要修改的任务日期：").strip()
+    date_input = ui_input("请输入要修改的任务日期：").strip()
     target_date = date_convert(date_input)
     if not target_date:
         print("❌ 日期格式错误（8位纯数字）！")
-        time.sleep(2)
+        ui_sleep(2)
         return
-    target_todos = [t for t in all_todos if t["task_date"] == target_date]
+    target_todos = task_store.get_date(target_date)
     if not target_todos:
         print(f"❌ {date_input} 该日期无任务！")
-        time.sleep(2)
+        ui_sleep(2)
         return
-    print(f"\n✅ 共查询到 {len(target_todos)} 条任务：")
-    for index, todo in enumerate(target_todos, start=1):
-        print(f"    {index}. {STATUS_MAP[todo['status']][0]} | {todo['content']}")
+    print_paged((f"    {index}. {STATUS_MAP[todo.status][0]} | {todo.content}" for index, todo in enumerate(target_todos, start=1)),
+                f"\n✅ 共查询到 {len(target_todos)} 条任务：")
     try:
-        num = int(input("\n请输入要修改的任务序号："))
+        num = int(ui_input("\n请输入要修改的任务序号："))
         if 1 <= num <= len(target_todos):
-            target_index = all_todos.index(target_todos[num-1])
-            old_content = all_todos[target_index]["content"]
-            new_content = input(f"当前内容：{old_content}\n新内容：").strip()
+            target_task = target_todos[num-1]
+            old_content = target_task.content
+            new_content = ui_input(f"当前内容：{old_content}\n新内容：").strip()
             if new_content:
-                all_todos[target_index]["content"] = new_content
-                save_todos(all_todos)
+                task_store.edit_content(target_task.id, new_content)
                 print(f"✅ 修改成功！")
             else:
                 print("❌ 内容不能为空！")
     except ValueError:
         print("❌ 请输入正确数字！")
-    time.sleep(2)
+    ui_sleep(2)
 
 def edit_history_todo_status():
     if not get_func_status("edit_history_status"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    all_todos = load_todos(False)
-    if not all_todos:
+    if not task_store.has_tasks():
         print("❌ 暂无历史任务！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
     print(f"\n===== 📝 修改历史任务状态 (输入格式：yyyymmdd) =====")
     print(f"💡 昨日日期：{get_yesterday_date_yyyymmdd()} | {STATUS_TIPS}")
-    date_input = input("请输入要修改的任务日期：").strip()
+    date_input = ui_input("请输入要修改的任务日期：").strip()
     target_date = date_convert(date_input)
     if not target_date:
         print("❌ 日期格式错误！")
-        time.sleep(2)
+        ui_sleep(2)
         return
-    target_todos = [t for t in all_todos if t["task_date"] == target_date]
+    target_todos = task_store.get_date(target_date)
     if not target_todos:
         print(f"❌ {date_input} 该日期无任务！")
-        time.sleep(2)
+        ui_sleep(2)
         return
-    print(f"\n✅ 共查询到 {len(target_todos)} 条任务：")
-    for index, todo in enumerate(target_todos, start=1):
-        print(f"    {index}. {STATUS_MAP[todo['status']][0]} | {todo['content']}")
+    print_paged((f"    {index}. {STATUS_MAP[todo.status][0]} | {todo.content}" for index, todo in enumerate(target_todos, start=1)),
+                f"\n✅ 共查询到 {len(target_todos)} 条任务：")
     try:
-        num = int(input("\n请输入要修改状态的任务序号："))
-        if 1 <= num <= len(target_todos):
-            new_status = int(input(f"\n请输入新状态量 {STATUS_TIPS} ："))
+        selection = parse_selection(ui_input("\n请输入要修改状态的任务序号(支持批量，如 1-5,8)：").strip(), len(target_todos))
+        if selection:
+            new_status = int(ui_input(f"\n请输入新状态量 {STATUS_TIPS} ："))
             if new_status in STATUS_MAP:
-                target_index = all_todos.index(target_todos[num-1])
-                old_status = all_todos[target_index]["status"]
-                all_todos[target_index]["status"] = new_status
-                save_todos(all_todos)
-                print(f"✅ 状态修改成功！{STATUS_MAP[old_status][1]} → {STATUS_MAP[new_status][1]}")
+                print_status_change([target_todos[num-1] for num in selection], new_status)
             else:
                 print(f"❌ 状态量错误！只能输入 0/1/2/3")
         else:
-            print("❌ 序号不存在！")
+            print("❌ 序号不存在或格式错误！")
     except ValueError:
         print("❌ 请输入正确的数字！")
-    time.sleep(2)
+    ui_sleep(2)
 
 def complete_todo(todos):
     if not get_func_status("edit_today_status"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
     if not todos:
         print("❌ 暂无今日任务！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
     try:
-        num = int(input("请输入要修改状态的任务序号："))
-        if 1 <= num <= len(todos):
-            new_status = int(input(f"\n请输入新状态量 {STATUS_TIPS} ："))
+        selection = parse_selection(ui_input("请输入要修改状态的任务序号(支持批量，如 1-5,8)：").strip(), len(todos))
+        if selection:
+            new_status = int(ui_input(f"\n请输入新状态量 {STATUS_TIPS} ："))
             if new_status in STATUS_MAP:
-                all_todos = load_todos(False)
-                target_task = todos[num-1]
-                for i in range(len(all_todos)):
-                    if all_todos[i]["create_time"] == target_task["create_time"]:
-                        old_status = all_todos[i]["status"]
-                        all_todos[i]["status"] = new_status
-                        save_todos(all_todos)
-                        print(f"✅ 状态修改成功！{STATUS_MAP[old_status][1]} → {STATUS_MAP[new_status][1]}")
-                        break
+                print_status_change([todos[num-1] for num in selection], new_status)
             else:
                 print(f"❌ 状态量错误！仅支持 0/1/2/3")
         else:
-            print("❌ 序号不存在！")
+            print("❌ 序号不存在或格式错误！")
     except ValueError:
         print("❌ 请输入正确的数字！")
-    time.sleep(1)
+    ui_sleep(1)
+
+def print_status_change(target_tasks, new_status):
+    # 批量修改一次写入；单条时保持原来的「旧状态 → 新状态」提示
+    old_status = target_tasks[0].status
+    task_store.set_status_many([t.id for t in target_tasks], new_status)
+    if len(target_tasks) == 1:
+        print(f"✅ 状态修改成功！{STATUS_MAP[old_status][1]} → {STATUS_MAP[new_status][1]}")
+    else:
+        print(f"✅ 已将 {len(target_tasks)} 条任务状态修改为【{STATUS_MAP[new_status][1]}】")
 
 def delete_todo(todos):
     if not get_func_status("delete_todo"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
     if not todos:
         print("❌ 暂无任务可删！")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    try:
-        num = int(input("请输入要删除的任务序号："))
-        if 1 <= num <= len(todos):
-            all_todos = load_todos(False)
-            target_task = todos[num-1]
-            for i in range(len(all_todos)):
-                if all_todos[i]["create_time"] == target_task["create_time"]:
-                    del all_todos[i]
-                    break
-            save_todos(all_todos)
-            print(f"✅ 已删除：{target_task['content']}")
-        else:
-            print("❌ 序号不存在！")
-    except ValueError:
-        print("❌ 请输入数字！")
-    time.sleep(1)
+    selection = parse_selection(ui_input("请输入要删除的任务序号(支持批量，如 1-5,8)：").strip(), len(todos))
+    if selection:
+        target_tasks = [todos[num-1] for num in selection]
+        task_store.delete_many([t.id for t in target_tasks])
+        print(f"✅ 已删除：{'、'.join(t.content for t in target_tasks)}")
+    else:
+        print("❌ 序号不存在或格式错误！")
+    ui_sleep(1)
 
 def clear_today_todo():
     if not get_func_status("clear_today"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    all_todos = load_todos(False)
-    today = get_today_date()
-    remain_todos = [t for t in all_todos if t["task_date"] != today]
-    if len(all_todos) == len(remain_todos):
+    today_todos = task_store.get_today()
+    if not today_todos:
         print("❌ 暂无今日任务可清空！")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    if input("⚠️ 确认清空今日所有任务？(输入y确认)：").strip().lower() == "y":
-        save_todos(remain_todos)
+    if ui_input("⚠️ 确认清空今日所有任务？(输入y确认)：").strip().lower() == "y":
+        task_store.delete_many([t.id for t in today_todos])
         print("✅ 今日任务已清空！")
     else:
         print("✅ 取消清空")
-    time.sleep(1)
+    ui_sleep(1)
+
+# ========== 多日顺延引擎：谱系记录 + 集合去重，重复执行不会重复生成 ==========
+# 每生成一份顺延副本，就在 TODO_FILE.lineage 追加一行「最初任务ID|目标日期|副本ID」；
+# 加载后得到 (最初任务ID, 目标日期) 集合和每条谱系已顺延到的最晚日期，判断是否顺延过只需查集合，不必扫描历史
+# 一条谱系只由最新的那份副本决定是否继续顺延：已被顺延到更晚日期的旧副本即使仍未完成也跳过
+# 先写任务、再追加谱系：中途崩溃最多在重跑时多出一份副本，不会漏顺延
+# 重复任务的实例每期各自生成，不参与顺延
+LINEAGE_SUFFIX = ".lineage"
+ROLLOVER_DEFAULT_DAYS = 7
+
+class RolloverEngine:
+    def __init__(self):
+        self.key = None
+        self.root_of = {}     # 顺延副本ID -> 最初的任务ID
+        self.carried = set()  # (最初任务ID, 目标日期)
+        self.latest = {}      # 最初任务ID -> 已顺延到的最晚日期
+        self.unwritten = []   # 副本还在排队等待写盘、尚未追加到文件的谱系
+
+    def get_file(self):
+        return TODO_FILE + LINEAGE_SUFFIX
+
+    def refresh(self):
+        path = self.get_file()
+        key = (path, get_file_stamp(path))
+        if key == self.key:
+            return
+        self.root_of, self.carried, self.latest = {}, set(), {}
+        if key[1] is not None:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    self.index(*line[:-1].split("|"))
+            for entry in self.unwritten:
+                self.index(*entry)
+        self.key = key
+
+    def index(self, root, target_date, new_id):
+        self.root_of[new_id] = root
+        self.carried.add((root, target_date))
+        if target_date > self.latest.get(root, ""):
+            self.latest[root] = target_date
+
+    def backlog(self, date_from, date_to):
+        # 区间内未完成/进行中、且没有被顺延到更晚日期的任务；谱系以持久化的任务ID为根，旧格式行先迁移
+        self.refresh()
+        task_store.ensure_stable_ids()
+        return [task for task in task_store.query(date_from, date_to, {0, 2}) if not is_recur_instance(task.id)
+                and self.latest.get(self.root_of.get(task.id, task.id), "") <= task.task_date]
+
+    def carry(self, tasks, target_date):
+        # 同一谱系在目标日期只生成一份副本；全部副本一次写入任务库，谱系一次追加
+        create_time = get_format_time().replace(get_today_date(), target_date)
+        with storage_lock():
+            self.refresh()
+            new_tasks, lineage = [], []
+            seen = set()
+            for task in tasks:
+                root = self.root_of.get(task.id, task.id)
+                if (root, target_date) in self.carried or root in seen or is_recur_instance(task.id):
+                    continue
+                seen.add(root)
+                new_task = make_task(new_task_id(), task.content, 0, create_time)
+                new_tasks.append(new_task)
+                lineage.append((root, target_date, new_task.id))
+            if new_tasks:
+                for entry in lineage:
+                    self.index(*entry)
+                self.unwritten.extend(lineage)
+                task_store.add_many(new_tasks, after=lambda: self.write_lineage(lineage))
+        return new_tasks
+
+    def write_lineage(self, lineage):
+        # 副本写盘之后才追加谱系；追加前内存已与文件一致时顺带更新文件戳，不必重读
+        path = self.get_file()
+        fresh = self.key == (path, get_file_stamp(path))
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(f"{root}|{date}|{new_id}\n" for root, date, new_id in lineage)
+        self.unwritten = [entry for entry in self.unwritten if entry not in lineage]
+        if fresh:
+            self.key = (path, get_file_stamp(path))
+
+    def rollover(self, date_from, date_to=None):
+        # 把 [date_from, date_to] 内积压的任务一次性顺延到今天；date_to 最晚到昨天
+        date_to = min(date_to or get_yesterday_date(), get_yesterday_date())
+        backlog = self.backlog(date_from, date_to) if date_from <= date_to else []
+        return backlog, self.carry(backlog, get_today_date())
+
+rollover_engine = RolloverEngine()
+
+def get_days_ago_date(days):
+    return (datetime.datetime.now() - datetime.timedelta(days=days)).strftime("%Y-%m-%d")
 
 # ========== ✅ 顺延今日任务至明天 原有功能 ==========
+def select_postpone_tasks(postpone_tasks, prompt):
+    # 输入y顺延全部，输入序号(如 1-3,5)只顺延选中的任务，其他输入视为取消
+    print_paged(f"    {index}. {STATUS_MAP[task.status][0]} | {task.content}" for index, task in enumerate(postpone_tasks, start=1))
+    confirm = ui_input(f"{prompt}(输入y全部顺延，或输入序号如1-3,5部分顺延)：").strip().lower()
+    if confirm == "y":
+        return postpone_tasks
+    selection = parse_selection(confirm, len(postpone_tasks)) if confirm[:1].isdigit() else None
+    if not selection:
+        print("✅ 取消顺延操作")
+        return []
+    return [postpone_tasks[num-1] for num in selection]
+
+def postpone_tasks_to(postpone_tasks, target_date):
+    # 顺延的副本使用当前时刻、日期换成目标日期，状态重置为未完成，一次写入；返回新生成的条数，已顺延过的跳过
+    return len(task_store.carry(postpone_tasks, target_date))
+
+def print_postpone_result(postpone_count, selected_count, target_name):
+    print(f"✅ 成功顺延 {postpone_count} 条任务至{target_name}！状态重置为【未完成】")
+    if postpone_count < selected_count:
+        print(f"💡 另有 {selected_count - postpone_count} 条此前已顺延过或为重复任务，未重复生成")
+
 def postpone_today_todo():
     if not get_func_status("postpone_todo"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    today_todos = load_todos(True)
+    today_todos = task_store.get_today()
     if not today_todos:
         print("❌ 暂无今日任务可顺延！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    postpone_tasks = [t for t in today_todos if t["status"] in [0, 2]]
+    postpone_tasks = [t for t in today_todos if t.status in [0, 2]]
     if not postpone_tasks:
         print("✅ 今日无【未完成/进行中】的任务，无需顺延！")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    confirm = input(f"⚠️ 检测到{len(postpone_tasks)}条可顺延任务，是否顺延至明天？(输入y确认)：").strip().lower()
-    if confirm != "y":
-        print("✅ 取消顺延操作")
-        time.sleep(1)
-        return
-    all_todos = load_todos(False)
-    tomorrow_date = get_tomorrow_date()
-    postpone_count = 0
-    for task in postpone_tasks:
-        tomorrow_create_time = get_format_time().replace(get_today_date(), tomorrow_date)
-        new_task = {
-            "content": task["content"],
-            "status": 0,
-            "create_time": tomorrow_create_time,
-            "task_date": tomorrow_date
-        }
-        all_todos.append(new_task)
-        postpone_count += 1
-    save_todos(all_todos)
-    print(f"✅ 成功顺延 {postpone_count} 条任务至明天！状态重置为【未完成】")
-    time.sleep(1.5)
+    postpone_tasks = select_postpone_tasks(postpone_tasks, f"⚠️ 检测到{len(postpone_tasks)}条可顺延任务，是否顺延至明天？")
+    if not postpone_tasks:
+        ui_sleep(1)
+        return
+    postpone_count = postpone_tasks_to(postpone_tasks, get_tomorrow_date())
+    print_postpone_result(postpone_count, len(postpone_tasks), "明天")
+    ui_sleep(1.5)
 
 # ========== ✅ 核心新增：顺延昨日任务至今天 完整功能 ==========
 def postpone_yesterday_todo():
     if not get_func_status("postpone_yesterday"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    all_todos = load_todos(False)
     yesterday_date = get_yesterday_date()
-    # 筛选昨日所有任务
-    yesterday_todos = [t for t in all_todos if t["task_date"] == yesterday_date]
+    # 按日期索引直接取昨日所有任务
+    yesterday_todos = task_store.get_date(yesterday_date)
     if not yesterday_todos:
         print("❌ 暂无昨日任务可顺延！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
     # 只顺延未完成/进行中的任务
-    postpone_tasks = [t for t in yesterday_todos if t["status"] in [0, 2]]
+    postpone_tasks = [t for t in yesterday_todos if t.status in [0, 2]]
     if not postpone_tasks:
         print("✅ 昨日无【未完成/进行中】的任务，无需顺延！")
-        time.sleep(1)
+        ui_sleep(1)
         return
     # 二次确认
-    confirm = input(f"⚠️ 检测到{len(postpone_tasks)}条昨日待办任务，是否顺延至今天？(输入y确认)：").strip().lower()
-    if confirm != "y":
-        print("✅ 取消顺延操作")
-        time.sleep(1)
+    postpone_tasks = select_postpone_tasks(postpone_tasks, f"⚠️ 检测到{len(postpone_tasks)}条昨日待办任务，是否顺延至今天？")
+    if not postpone_tasks:
+        ui_sleep(1)
         return
     # 执行顺延：新增到今日，状态重置为未完成，昨日任务保留
-    today_date = get_today_date()
-    postpone_count = 0
-    for task in postpone_tasks:
-        today_create_time = get_format_time().replace(yesterday_date, today_date)
-        new_task = {
-            "content": task["content"],
-            "status": 0,
-            "create_time": today_create_time,
-            "task_date": today_date
-        }
-        all_todos.append(new_task)
-        postpone_count += 1
-    save_todos(all_todos)
-    print(f"✅ 成功顺延 {postpone_count} 条昨日任务至今天！状态重置为【未完成】")
-    time.sleep(1.5)
+    postpone_count = postpone_tasks_to(postpone_tasks, get_today_date())
+    print_postpone_result(postpone_count, len(postpone_tasks), "今天")
+    ui_sleep(1.5)
+
+# ========== 补顺延多日积压任务至今天 ==========
+def rollover_backlog_todo():
+    if not get_func_status("rollover_backlog"):
+        print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
+        ui_sleep(1)
+        return
+    print(f"\n===== ⏩ 补顺延积压任务至今天 (输入格式：yyyymmdd-yyyymmdd，直接回车=最近{ROLLOVER_DEFAULT_DAYS}天) =====")
+    date_input = ui_input("请输入日期区间：").strip()
+    date_range = date_range_convert(date_input) if date_input else (get_days_ago_date(ROLLOVER_DEFAULT_DAYS), get_yesterday_date())
+    if not date_range:
+        print("❌ 日期格式错误（yyyymmdd 或 yyyymmdd-yyyymmdd）！")
+        ui_sleep(2)
+        return
+    date_to = min(date_range[1], get_yesterday_date())
+    if date_range[0] > date_to:
+        print("❌ 只能顺延今天之前的任务！")
+        ui_sleep(2)
+        return
+    backlog = task_store.backlog(date_range[0], date_to)
+    if not backlog:
+        print(f"✅ {date_range[0]} ~ {date_to} 没有需要顺延的任务（已顺延过的不会重复生成）")
+        ui_sleep(2)
+        return
+    postpone_tasks = select_postpone_tasks(backlog, f"⚠️ {date_range[0]} ~ {date_to} 共有{len(backlog)}条积压任务，是否顺延至今天？")
+    if not postpone_tasks:
+        ui_sleep(1)
+        return
+    print_postpone_result(postpone_tasks_to(postpone_tasks, get_today_date()), len(postpone_tasks), "今天")
+    ui_sleep(1.5)
 
 def search_todo_by_date():
     if not get_func_status("search_todo"):
         print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    all_todos = load_todos(False)
-    if not all_todos:
+    if not task_store.has_storage():
         print("❌ 暂无历史任务！")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    print(f"\n===== 📖 查询历史任务 (输入格式：yyyymmdd) =====")
-    date_input = input("请输入查询日期：").strip()
-    target_date = date_convert(date_input)
-    if not target_date:
+    print(f"\n===== 📖 查询历史任务 (输入格式：yyyymmdd 或 yyyymmdd-yyyymmdd) =====")
+    date_input = ui_input("请输入查询日期：").strip()
+    date_range = date_range_convert(date_input)
+    if not date_range:
         print("❌ 日期格式错误！")
-        time.sleep(2)
+        ui_sleep(2)
         return
-    target_todos = [t for t in all_todos if t["task_date"] == target_date]
-    if not target_todos:
+    statuses = status_filter_convert(ui_input(f"筛选状态(直接回车=全部，多个用逗号分隔) {STATUS_TIPS}：").strip())
+    if statuses is None:
+        print("❌ 状态量错误！只能输入 0/1/2/3")
+        ui_sleep(2)
+        return
+    # 边查边输出，不先收集全部结果；只格式化显示到的页
+    count, finished = print_paged((f"    {index}. {STATUS_MAP[todo.status][0]} | {todo.content} | {todo.create_time}"
+                                   for index, todo in enumerate(task_store.query(date_range[0], date_range[1], statuses), start=1)),
+                                  f"\n✅ {date_input} 查询结果：")
+    if not count:
         print(f"❌ {date_input} 无任务！")
-        time.sleep(2)
+        ui_sleep(2)
+        return
+    print(f"\n共 {count} 条任务" if finished else f"\n已显示前 {count} 条任务")
+    ui_input("\n查询完成，按回车键返回菜单...")
+
+def search_todo_by_content():
+    if not get_func_status("search_content"):
+        print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
+        ui_sleep(1)
+        return
+    if not task_store.has_tasks():
+        print("❌ 暂无历史任务！")
+        ui_sleep(1)
+        return
+    print(f"\n===== 🔍 按内容搜索任务 (支持中文/英文关键词，不区分大小写) =====")
+    keyword = ui_input("请输入搜索关键词：").strip()
+    if not keyword:
+        print("❌ 关键词不能为空！")
+        ui_sleep(2)
+        return
+    results = task_store.search_content(keyword)
+    if not results:
+        print(f"❌ 没有包含「{keyword}」的任务！")
+        ui_sleep(2)
+        return
+    print_paged((f"    {index}. {STATUS_MAP[todo.status][0]} | {todo.content} | {todo.create_time}"
+                 for index, todo in enumerate(results, start=1)),
+                f"\n✅ 共找到 {len(results)} 条包含「{keyword}」的任务：")
+    ui_input("\n搜索完成，按回车键返回菜单...")
+
+# ========== 完成率报表：读每日统计汇总，不扫描历史任务 ==========
+def report_todo():
+    if not get_func_status("report"):
+        print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
+        ui_sleep(1)
+        return
+    print(f"\n===== 📈 任务完成率报表 (输入格式：yyyymmdd-yyyymmdd，直接回车=最近{REPORT_DEFAULT_DAYS}天) =====")
+    date_input = ui_input("请输入日期区间：").strip()
+    date_range = date_range_convert(date_input) if date_input else (get_days_ago_date(REPORT_DEFAULT_DAYS - 1), get_today_date())
+    if not date_range:
+        print("❌ 日期格式错误（yyyymmdd 或 yyyymmdd-yyyymmdd）！")
+        ui_sleep(2)
+        return
+    period_input = ui_input("汇总方式：1=按日 2=按周 3=按月（直接回车=按日）：").strip() or "1"
+    period = {"1": "day", "2": "week", "3": "month"}.get(period_input)
+    if not period:
+        print("❌ 请输入 1/2/3！")
+        ui_sleep(2)
+        return
+    day_counts = task_store.day_counts(*date_range)
+    if not day_counts:
+        print(f"❌ {date_range[0]} ~ {date_range[1]} 无任务！")
+        ui_sleep(2)
+        return
+    print(f"\n✅ {date_range[0]} ~ {date_range[1]} 完成率（{REPORT_PERIODS[period]}）：")
+    for label, counts in build_report(day_counts, period):
+        print("    " + format_report_row(label, counts))
+    ui_input("\n报表已生成，按回车键返回菜单...")
+
+# ========== 重复任务管理 ==========
+def recurring_todo():
+    if not get_func_status("recurring"):
+        print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
+        ui_sleep(1)
+        return
+    while True:
+        rules = task_store.list_rules()
+        print(f"\n===== 🔁 重复任务（规则只保存一份，每天的任务按规则自动出现） =====")
+        print_paged(f"    {index}. {format_rule(rule)}" for index, rule in enumerate(rules, start=1))
+        if not rules:
+            print("    暂无重复任务")
+        choice = ui_input("\n1. 新增重复任务  2. 停止重复任务  0. 返回菜单\n请选择：").strip()
+        if choice == "0":
+            return
+        elif choice == "1":
+            content = ui_input("请输入任务内容：").strip()
+            if not content:
+                print("❌ 任务内容不能为空！")
+                ui_sleep(1)
+                continue
+            freq_input = ui_input("重复方式：1=每天 2=工作日 3=每周 4=每月：").strip()
+            freq = {"1": "daily", "2": "weekdays", "3": "weekly", "4": "monthly"}.get(freq_input)
+            if not freq:
+                print("❌ 请输入 1/2/3/4！")
+                ui_sleep(1)
+                continue
+            start_input = ui_input("开始日期 yyyymmdd（直接回车=今天，每周/每月按开始日期的星期/日子重复）：").strip()
+            start = date_convert(start_input) if start_input else get_today_date()
+            if not start:
+                print("❌ 日期格式错误（8位纯数字）！")
+                ui_sleep(1)
+                continue
+            rule = task_store.add_rule(content, freq, start)
+            print(f"✅ 已添加重复任务：{format_rule(rule)}")
+            ui_sleep(1)
+        elif choice == "2":
+            selection = parse_selection(ui_input("请输入要停止的规则序号(支持批量，如 1-3,5)：").strip(), len(rules))
+            if not selection:
+                print("❌ 序号不存在或格式错误！")
+                ui_sleep(1)
+                continue
+            for num in selection:
+                task_store.stop_rule(rules[num-1]["id"])
+            print(f"✅ 已停止 {len(selection)} 条重复任务，今天起不再出现，之前的记录保留")
+            ui_sleep(1)
+        else:
+            print("❌ 输入错误！请输入 0-2")
+            ui_sleep(1)
+
+# ========== 任务清单切换与跨清单今日视图 ==========
+def switch_list_todo():
+    if not get_func_status("switch_list"):
+        print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
+        ui_sleep(1)
+        return
+    if os.environ.get("PYTHONTODO_SERVER"):
+        print("❌ 瘦客户端模式下清单由服务端决定（--list 清单名 serve）！")
+        ui_sleep(2)
         return
-    print(f"\n✅ {date_input} 共 {len(target_todos)} 条任务：")
-    for index, todo in enumerate(target_todos, start=1):
-        print(f"    {index}. {STATUS_MAP[todo['status']][0]} | {todo['content']} | {todo['create_time']}")
-    input("\n查询完成，按回车键返回菜单...")
+    names = list_manager.names()
+    print(f"\n===== 🗂️ 任务清单（当前：{list_manager.active}） =====")
+    for index, name in enumerate(names, start=1):
+        mark = " ← 当前" if name == list_manager.active else ""
+        print(f"    {index}. {name} | {list_manager.get_file(name)}{mark}")
+    choice = ui_input("\n请输入要切换的清单序号，输入 n 新建清单，直接回车返回：").strip()
+    if not choice:
+        return
+    if choice.lower() == "n":
+        name = ui_input("请输入新清单名：").strip()
+        try:
+            list_manager.add(name)
+        except ValueError as e:
+            print(f"❌ {e}")
+            ui_sleep(2)
+            return
+    elif choice.isdigit() and 1 <= int(choice) <= len(names):
+        name = names[int(choice)-1]
+    else:
+        print("❌ 序号不存在！")
+        ui_sleep(1)
+        return
+    list_manager.switch(name)
+    today_pager.page = 0  # 只在用户切换清单时回到第一页；using() 临时切换再切回不影响当前页
+    archive_store.maybe_archive()
+    print(f"✅ 已切换到清单：{name}")
+    ui_sleep(1)
+
+def all_lists_today_todo():
+    if not get_func_status("all_lists_today"):
+        print("❌ 该功能已被管理员关闭！1秒后返回菜单...")
+        ui_sleep(1)
+        return
+    if os.environ.get("PYTHONTODO_SERVER"):
+        print("❌ 瘦客户端模式下只能查看服务端的当前清单！")
+        ui_sleep(2)
+        return
+    def lines():
+        for name, tasks in list_manager.today_by_list():
+            yield f"\n【{name}】{len(tasks)} 条"
+            for index, todo in enumerate(tasks, start=1):
+                yield f"    {index}. {STATUS_MAP[todo.status][0]} | {todo.content} | {todo.create_time}"
+    print_paged(lines(), f"\n===== 📋 全部清单的今日任务（{get_today_date()}） =====")
+    ui_input("\n按回车键返回菜单...")
 
 # ========== 管理员功能（自动适配新增开关，无改动） ==========
-def show_func_switch_menu():
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print("=" * 60)
-    print("        ⚙️  功能开关配置中心 | 管理员专属")
-    print("=" * 60)
-    print("\n当前功能开关状态：")
+def show_func_switch_menu(list_name=None):
+    scope = f"清单「{list_name}」单独设置" if list_name else "全局（所有清单）"
+    lines = [
+        "=" * 60,
+        "        ⚙️  功能开关配置中心 | 管理员专属",
+        "=" * 60,
+        f"\n当前修改范围：{scope} | 当前清单：{list_manager.active}",
+        "当前清单实际生效的功能开关状态："
+    ]
+    config = init_config()
     for func_key, func_name in FUNCTIONS.items():
         status = "✅ 开启" if get_func_status(func_key) else "❌ 关闭"
-        print(f"  {func_key:<20} {func_name:<25} {status}")
-    print("\n操作说明：输入功能标识(如add_todo)切换开关，输入0返回管理员菜单")
+        source = "（本清单）" if config.has_option(get_list_switch_section(list_manager.active), func_key) else ""
+        lines.append(f"  {func_key:<20} {func_name:<25} {status}{source}")
+    lines.append("\n操作说明：输入功能标识(如add_todo)切换开关，s 切换修改范围(全局/当前清单)，"
+                 "c 清除当前清单的单独设置，输入0返回管理员菜单")
+    render_frame(lines)
 
 def toggle_func_switch():
-    show_func_switch_menu()
+    list_name = None
+    show_func_switch_menu(list_name)
     while True:
-        choice = input("\n请输入要切换的功能标识(输入0返回)：").strip()
+        choice = ui_input("\n请输入要切换的功能标识(输入0返回)：").strip()
         if choice == "0":
             return
-        if choice in FUNCTIONS.keys():
+        if choice.lower() == "s":
+            list_name = None if list_name else list_manager.active
+            show_func_switch_menu(list_name)
+        elif choice.lower() == "c":
+            switch_registry.clear_list(list_manager.active)
+            print(f"\n✅ 已清除清单「{list_manager.active}」的单独设置，沿用全局开关！")
+            ui_sleep(1)
+            show_func_switch_menu(list_name)
+        elif choice in FUNCTIONS.keys():
             current_status = get_func_status(choice)
-            set_func_status(choice, not current_status)
+            set_func_status(choice, not current_status, list_name)
             new_status = "开启" if not current_status else "关闭"
             print(f"\n✅ 功能【{FUNCTIONS[choice]}】已{new_status}！")
-            time.sleep(1)
-            show_func_switch_menu()
+            ui_sleep(1)
+            show_func_switch_menu(list_name)
         else:
             print("\n❌ 功能标识不存在！请重新输入")
 
+def storage_admin_menu():
+    write_behind.flush()  # 迁移、导入、归档都直接读写存储文件
+    while True:
+        backend = get_storage_backend()
+        render_frame([
+            "=" * 60,
+            "        💾 存储后端与数据导入导出 | 管理员专属",
+            "=" * 60,
+            f"\n当前存储后端：{backend}（text=文本快照+日志，sqlite=按日期索引的数据库）",
+            "1. 切换存储后端（自动迁移全部任务）",
+            "2. 从文本文件导入任务",
+            "3. 导出全部任务为文本文件",
+            f"4. 立即归档旧任务（保留最近 {get_archive_window_days()} 天，按月压缩）" if get_archive_window_days() > 0
+            else "4. 立即归档旧任务（未开启，请先用 5 设置保留天数）",
+            "5. 设置归档保留天数（0=不归档，开启后每次启动自动归档）",
+            f"6. 设置后台写入间隔（当前 {get_write_behind_interval():g} 秒，0=每次操作立即写入，下次启动生效）",
+            "0. 返回管理员菜单"
+        ])
+        choice = ui_input("\n请输入操作序号：").strip()
+        if choice == "0":
+            return
+        elif choice == "1":
+            if os.environ.get("PYTHONTODO_BACKEND"):
+                print("❌ 已通过环境变量 PYTHONTODO_BACKEND 指定后端，无法在此切换！")
+                ui_sleep(2)
+                continue
+            target = "sqlite" if backend == "text" else "text"
+            # 后端是全局设置：所有清单一起迁移，先全部读出再切换
+            migrated = {}
+            for name in list_manager.names():
+                with list_manager.using(name), storage_lock():
+                    migrated[name] = load_all_todos()
+            switch_registry.set_option("STORAGE", "backend", target)
+            for name, todos in migrated.items():
+                with list_manager.using(name), storage_lock():
+                    save_todos(todos)
+                    archive_store.clear()  # 归档任务已随全部任务迁移，切回文本后端时由下次归档重新生成
+                    bump_generation()
+                    if task_store.loaded:
+                        task_store.reload()
+            total = sum(len(todos) for todos in migrated.values())
+            print(f"✅ 已切换为 {target} 后端，{len(migrated)} 个清单共迁移 {total} 条任务！")
+            ui_sleep(2)
+        elif choice in ("2", "3"):
+            path = ui_input("请输入文本文件路径：").strip()
+            if not path:
+                print("❌ 路径不能为空！")
+            elif choice == "2" and not os.path.exists(path):
+                print("❌ 文件不存在！")
+            elif choice == "2":
+                count = import_text_todos(path)
+                task_store.reload()
+                print(f"✅ 成功导入 {count} 条任务！")
+            else:
+                print(f"✅ 成功导出 {export_text_todos(path)} 条任务！")
+            ui_sleep(2)
+        elif choice == "4":
+            if backend != "text" or get_archive_window_days() <= 0:
+                print("❌ 仅文本后端且保留天数大于 0 时可归档！")
+            else:
+                count = archive_store.archive(get_archive_cutoff(get_archive_window_days()))
+                task_store.refresh()
+                manifest = archive_store.manifest()
+                print(f"✅ 已归档 {count} 条任务，归档共 {len(manifest['segments'])} 个月份分段")
+            ui_sleep(2)
+        elif choice == "5":
+            days = ui_input("请输入保留最近多少天的任务在热文件中：").strip()
+            if days.isdigit():
+                switch_registry.set_option("ARCHIVE", "window_days", days)
+                print(f"✅ 归档保留天数已设置为 {days}")
+            else:
+                print("❌ 请输入非负整数！")
+            ui_sleep(2)
+        elif choice == "6":
+            interval = ui_input("请输入后台写入间隔秒数：").strip()
+            try:
+                if float(interval) < 0:
+                    raise ValueError(interval)
+                switch_registry.set_option("STORAGE", "write_behind_interval", interval)
+                print(f"✅ 后台写入间隔已设置为 {interval} 秒，下次启动生效")
+            except ValueError:
+                print("❌ 请输入非负数！")
+            ui_sleep(2)
+        else:
+            print("❌ 输入错误！请输入0-6")
+            ui_sleep(1)
+
+def perf_stats_menu():
+    while True:
+        render_frame(["=" * 60, "        📊 性能统计", "=" * 60] + build_perf_report() + [
+            "",
+            f"1. {'关闭' if perf_stats.enabled else '开启'}性能统计（仅本次运行）",
+            "2. 清空统计记录",
+            "0. 返回管理员菜单"
+        ])
+        choice = ui_input("\n请输入操作序号：").strip()
+        if choice == "0":
+            return
+        elif choice == "1":
+            if perf_stats.enabled:
+                perf_stats.disable()
+            else:
+                perf_stats.enable()
+        elif choice == "2":
+            perf_stats.clear()
+        else:
+            print("❌ 输入错误！请输入0-2")
+            ui_sleep(1)
+
 def admin_entrance():
     if not get_func_status("admin_entrance"):
         print("❌ 管理员入口已被关闭！1秒后返回菜单...")
-        time.sleep(1)
+        ui_sleep(1)
         return
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print("=" * 60)
-    print("        🔐 管理员调试入口 | 验证页面")
-    print("=" * 60)
-    input_pwd = input("\n请输入管理员密码：").strip()
+    render_frame([
+        "=" * 60,
+        "        🔐 管理员调试入口 | 验证页面",
+        "=" * 60
+    ])
+    input_pwd = ui_input("\n请输入管理员密码：").strip()
     if input_pwd != ADMIN_PASSWORD:
         print(f"\n❌ 密码错误！请确认密码后重试")
-        time.sleep(2)
+        ui_sleep(2)
         return
     while True:
-        os.system('cls' if os.name == 'nt' else 'clear')
-        print("=" * 60)
-        print("        ✅ 管理员调试中心")
-        print("=" * 60)
-        print("1. 功能开关配置")
-        print("0. 返回主程序菜单")
-        choice = input("\n请输入操作序号：").strip()
+        render_frame([
+            "=" * 60,
+            "        ✅ 管理员调试中心",
+            "=" * 60,
+            "1. 功能开关配置",
+            "2. 存储后端与数据导入导出",
+            "3. 性能统计（耗时分布/慢操作）",
+            "0. 返回主程序菜单"
+        ])
+        choice = ui_input("\n请输入操作序号：").strip()
         if choice == "0":
             return
         elif choice == "1":
             toggle_func_switch()
+        elif choice == "2":
+            storage_admin_menu()
+        elif choice == "3":
+            perf_stats_menu()
         else:
-            print("❌ 输入错误！请输入0或1")
-            time.sleep(1)
+            print("❌ 输入错误！请输入0-3")
+            ui_sleep(1)
+
+# ========== 本地 JSON API 服务：多个客户端共享一个进程内的任务库 ==========
+# python PythonTodo.py serve [--host 127.0.0.1] [--port 8765]
+# 读请求直接查内存索引；写请求全部排入队列，由唯一的写协程按顺序提交，不会交错
+#   GET  /tasks?from=yyyy-mm-dd&to=yyyy-mm-dd&status=0,2&limit=N   按日期查询（默认今日）
+#   GET  /search?text=关键词
+#   GET  /backlog?from=yyyy-mm-dd&to=yyyy-mm-dd   区间内尚未顺延过的未完成/进行中任务
+#   GET  /stats?from=yyyy-mm-dd&to=yyyy-mm-dd     每日各状态条数 {"days": {日期: [未完成, 已完成, 进行中, 未知]}}
+#   GET  /rules    重复任务规则列表
+#   POST /add      {"tasks": [{"content": "...", "status": 0, "create_time": "...", "id": "..."}]}
+#   POST /edit     {"id": "...", "content": "..."}
+#   POST /status   {"ids": [...], "status": 1}
+#   POST /delete   {"ids": [...]}
+#   POST /postpone {"from": "today" | "yesterday", "ids": [...]}  ids 省略时顺延全部未完成/进行中任务
+#   POST /carry    {"ids": [...], "to": "yyyy-mm-dd"}  把指定任务顺延到目标日期，已顺延过的跳过
+#   POST /rollover {"from": "yyyy-mm-dd", "to": "yyyy-mm-dd"}  多日积压任务一次顺延到今天，重复调用不会重复生成
+#   POST /rules/add  {"content": "...", "freq": "daily" | "weekdays" | "weekly" | "monthly", "start": "yyyy-mm-dd"}
+#   POST /rules/stop {"id": "..."}  从今天起不再重复
+# 终端界面设置环境变量 PYTHONTODO_SERVER=127.0.0.1:8765 后作为瘦客户端运行，任务读写都转发给服务
+# 只接受本机客户端：带 Origin 头（浏览器发起的跨站请求）或 Host 不是监听地址（DNS 重绑定）的请求一律拒绝，
+# 写请求必须是 application/json；每次启动生成访问令牌写入 todo_list.txt.token（仅本用户可读），
+# 请求须在 X-Todo-Token 头中带上，瘦客户端从同一目录读取，也可用环境变量 PYTHONTODO_TOKEN 指定
+# 功能开关：每个接口登记能调用它的界面操作；瘦客户端在 X-Todo-Action 头中带上触发请求的菜单操作，
+# 服务端按该操作的开关判断，未带或不在登记范围内时按接口的默认操作判断；每日统计(/stats)用于界面刷新，不受开关控制
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+TOKEN_SUFFIX = ".token"
+TOKEN_BYTES = 16
+current_action = None  # 正在执行的菜单操作（功能开关名），瘦客户端随请求发给服务端
+
+def get_token_file():
+    return list_manager.get_file(DEFAULT_LIST) + TOKEN_SUFFIX
+
+def write_token_file(token):
+    # 先删再以 0600 新建，不沿用旧文件的权限
+    path = get_token_file()
+    if os.path.exists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+
+def task_to_json(task):
+    return {"id": task.id, "status": task.status, "create_time": task.create_time, "content": task.content}
+
+def check_status(status):
+    # true/1.0 与 1 相等，会以 "True"/"1.0" 写进文件导致之后无法加载，必须是整数
+    if type(status) is not int or status not in STATUS_MAP:
+        raise ValueError("状态量错误！只能输入 0/1/2/3")
+    return status
+
+def task_from_json(item):
+    content = str(item.get("content", "")).strip()
+    status = check_status(item.get("status", 0))
+    if not content or "\n" in content:
+        raise ValueError("任务内容不能为空且不能换行")
+    task_id = item.get("id") or new_task_id()
+    if not isinstance(task_id, str) or not task_id.isalnum():
+        raise ValueError("任务ID只能由字母和数字组成")
+    create_time = item.get("create_time") or get_format_time()
+    if not isinstance(create_time, str) or not is_create_time(create_time) or "|" in create_time or "\n" in create_time:
+        raise ValueError("创建时间格式错误（yyyy-mm-dd hh:mm:ss）")
+    task = make_task(task_id, content, status, create_time)
+    if not task.day:
+        raise ValueError("创建时间格式错误（yyyy-mm-dd hh:mm:ss）")
+    return task
+
+def check_task_ids(task_ids):
+    task_store.refresh()
+    missing = []
+    for task_id in task_ids:
+        try:
+            task_store.lookup(task_id)
+        except KeyError:
+            missing.append(task_id)
+    if missing:
+        raise KeyError(f"任务ID不存在：{','.join(missing)}")
+    return task_ids
+
+def api_list(query):
+    today = get_today_date()
+    statuses = status_filter_convert(query.get("status", ""))
+    if statuses is None:
+        raise ValueError("状态格式错误！")
+    task_store.refresh()
+    tasks = task_store.query(query.get("from", today), query.get("to", query.get("from", today)), statuses)
+    limit = int(query.get("limit", 0))
+    result = []
+    for task in tasks:
+        result.append(task_to_json(task))
+        if len(result) == limit:
+            break
+    return {"tasks": result}
+
+def api_search(query):
+    keyword = query.get("text", "").strip()
+    if not keyword:
+        raise ValueError("关键词不能为空！")
+    return {"tasks": [task_to_json(task) for task in content_index.search(keyword)]}
+
+def api_backlog(query):
+    task_store.refresh()
+    return {"tasks": [task_to_json(task) for task in rollover_engine.backlog(
+        query.get("from", get_days_ago_date(ROLLOVER_DEFAULT_DAYS)), query.get("to", get_yesterday_date()))]}
+
+def api_stats(query):
+    today = get_today_date()
+    return {"days": task_store.day_counts(query.get("from", today), query.get("to", query.get("from", today)))}
+
+def rule_to_json(rule):
+    return {key: rule[key] for key in ("id", "content", "freq", "start", "end", "time")}
+
+def api_rules(query):
+    return {"rules": [rule_to_json(rule) for rule in task_store.list_rules()]}
+
+def api_add_rule(body):
+    content = str(body.get("content", "")).strip()
+    if not content or "\n" in content:
+        raise ValueError("任务内容不能为空且不能换行")
+    if body.get("freq") not in RECUR_FREQS:
+        raise ValueError(f"重复方式只能是 {'/'.join(RECUR_FREQS)}")
+    start = body.get("start") or get_today_date()
+    if date_convert(start.replace("-", "")) != start:
+        raise ValueError("日期格式错误！")
+    return {"rule": rule_to_json(task_store.add_rule(content, body["freq"], start))}
+
+def api_stop_rule(body):
+    return {"rule": rule_to_json(task_store.stop_rule(body.get("id")))}
+
+def api_add(body):
+    tasks = [task_from_json(item) for item in body.get("tasks", [])]
+    task_store.add_many(tasks)
+    return {"tasks": [task_to_json(task) for task in tasks]}
+
+def api_edit(body):
+    task_id, = check_task_ids([body.get("id")])
+    content = str(body.get("content", "")).strip()
+    if not content or "\n" in content:
+        raise ValueError("任务内容不能为空且不能换行")
+    task_store.edit_content(task_id, content)
+    return {"count": 1}
+
+def api_status(body):
+    check_status(body.get("status"))
+    task_ids = check_task_ids(body.get("ids", []))
+    task_store.set_status_many(task_ids, body["status"])
+    return {"count": len(task_ids)}
+
+def api_delete(body):
+    task_ids = check_task_ids(body.get("ids", []))
+    task_store.delete_many(task_ids)
+    return {"count": len(task_ids)}
+
+def api_postpone(body):
+    if body.get("from", "today") == "yesterday":
+        source_date, target_date = get_yesterday_date(), get_today_date()
+    else:
+        source_date, target_date = get_today_date(), get_tomorrow_date()
+    postpone_tasks = [t for t in task_store.get_date(source_date) if t.status in [0, 2]]
+    if body.get("ids") is not None:
+        selected = set(body["ids"])
+        postpone_tasks = [t for t in postpone_tasks if t.id in selected]
+    return {"count": postpone_tasks_to(postpone_tasks, target_date), "to": target_date}
+
+def api_carry(body):
+    target_date = body.get("to", "")
+    if date_convert(target_date.replace("-", "")) != target_date:
+        raise ValueError("日期格式错误！")
+    tasks = [task_store.lookup(task_id) for task_id in check_task_ids(body.get("ids", []))]
+    return {"tasks": [task_to_json(task) for task in rollover_engine.carry(tasks, target_date)]}
+
+def api_rollover(body):
+    backlog, new_tasks = rollover_engine.rollover(body.get("from") or get_days_ago_date(ROLLOVER_DEFAULT_DAYS), body.get("to"))
+    return {"count": len(new_tasks), "backlog": len(backlog)}
+
+# 接口 -> (处理函数, 能调用它的界面操作)；第一个为未指明操作时的默认开关，空元组表示不受开关控制
+API_READ_ROUTES = {
+    "/tasks": (api_list, ()),
+    "/search": (api_search, ("search_content",)),
+    "/backlog": (api_backlog, ("rollover_backlog",)),
+    "/stats": (api_stats, ()),
+    "/rules": (api_rules, ("recurring",))
+}
+API_WRITE_ROUTES = {
+    "/add": (api_add, ("add_todo",)),
+    "/edit": (api_edit, ("edit_history_content", "edit_todo")),
+    "/status": (api_status, ("edit_history_status", "edit_today_status")),
+    "/delete": (api_delete, ("delete_todo", "clear_today")),
+    "/postpone": (api_postpone, ("postpone_todo", "postpone_yesterday")),
+    "/carry": (api_carry, ("rollover_backlog", "postpone_todo", "postpone_yesterday")),
+    "/rollover": (api_rollover, ("rollover_backlog",)),
+    "/rules/add": (api_add_rule, ("recurring",)),
+    "/rules/stop": (api_stop_rule, ("recurring",))
+}
+
+def route_func_key(path, func_keys, payload, action):
+    if path == "/postpone":
+        return "postpone_yesterday" if payload.get("from") == "yesterday" else "postpone_todo"
+    if action in func_keys:
+        return action
+    return func_keys[0] if func_keys else None
+
+class TodoServer:
+    def __init__(self):
+        self.write_queue = None
+        self.request_count = 0
+        self.host = None   # 监听地址 host:port，请求的 Host 头必须与之相同
+        self.token = None
+
+    def check_request(self, method, headers):
+        import hmac
+        if "origin" in headers or headers.get("host") != self.host:
+            return "只接受本机客户端的请求"
+        if not hmac.compare_digest(headers.get("x-todo-token", "").encode("latin-1"), self.token.encode("latin-1")):
+            return "访问令牌错误，请在服务端所在目录运行或设置 PYTHONTODO_TOKEN"
+        if method == "POST" and headers.get("content-type", "").partition(";")[0].strip().lower() != "application/json":
+            return "写请求的 Content-Type 必须是 application/json"
+        return None
+
+    async def writer(self):
+        # 唯一的写协程：队列中的写请求逐个提交
+        while True:
+            handler, body, future = await self.write_queue.get()
+            try:
+                future.set_result(handler(body))
+            except Exception as e:
+                future.set_exception(e)
+
+    async def dispatch(self, method, target, headers, body):
+        import asyncio
+        import urllib.parse
+        path, _, query_string = target.partition("?")
+        error = self.check_request(method, headers)
+        if error:
+            return HTTPStatus.FORBIDDEN, {"error": error}
+        try:
+            if method == "GET" and path in API_READ_ROUTES:
+                handler, func_keys = API_READ_ROUTES[path]
+                payload = dict(urllib.parse.parse_qsl(query_string))
+            elif method == "POST" and path in API_WRITE_ROUTES:
+                handler, func_keys = API_WRITE_ROUTES[path]
+                payload = json.loads(body or b"{}")
+            else:
+                return HTTPStatus.NOT_FOUND, {"error": f"未知接口：{method} {path}"}
+            func_key = route_func_key(path, func_keys, payload, headers.get("x-todo-action"))
+            if func_key and not get_func_status(func_key):
+                return HTTPStatus.FORBIDDEN, {"error": "该功能已被管理员关闭！"}
+            if method == "GET":
+                return HTTPStatus.OK, handler(payload)
+            future = asyncio.get_running_loop().create_future()
+            await self.write_queue.put((handler, payload, future))
+            return HTTPStatus.OK, await future
+        except KeyError as e:
+            return HTTPStatus.NOT_FOUND, {"error": e.args[0] if e.args else "任务不存在"}
+        except (ValueError, TypeError, AttributeError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+
+    async def handle_client(self, reader, writer):
+        # 最小化的 HTTP/1.1 实现，支持长连接
+        import asyncio
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self.dispatch(method, target, headers, body)
+                self.request_count += 1
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                             f"Content-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        import asyncio
+        import secrets
+        self.write_queue = asyncio.Queue()
+        task_store.refresh()
+        writer_task = asyncio.create_task(self.writer())
+        server = await asyncio.start_server(self.handle_client, host, port)
+        self.host = f"{host}:{server.sockets[0].getsockname()[1]}"
+        self.token = secrets.token_hex(TOKEN_BYTES)
+        write_token_file(self.token)  # 先写令牌再提示启动完成，客户端看到提示后即可读取
+        print(f"✅ Todo 服务已启动：http://{self.host}  (Ctrl+C 停止)", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer_task.cancel()
+            if os.path.exists(get_token_file()):
+                os.remove(get_token_file())
+
+class RemoteTaskStore:
+    # 瘦客户端：接口与 TaskStore 一致，读写全部转发给 serve 进程
+    def __init__(self, address):
+        import http.client
+        host, _, port = address.rpartition(":")
+        self.conn = http.client.HTTPConnection(host or SERVER_HOST, int(port or SERVER_PORT), timeout=30)
+        self.token = None
+
+    def get_token(self):
+        if self.token is None:
+            self.token = os.environ.get("PYTHONTODO_TOKEN", "")
+            if not self.token and os.path.exists(get_token_file()):
+                with open(get_token_file(), "r", encoding="utf-8") as f:
+                    self.token = f.read().strip()
+        return self.token
+
+    def request(self, method, path, payload=None):
+        import http.client
+        body = None if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        for attempt in range(2):
+            try:
+                headers = {"Content-Type": "application/json", "X-Todo-Token": self.get_token()}
+                if current_action:
+                    headers["X-Todo-Action"] = current_action  # 服务端按触发请求的菜单操作判断功能开关
+                self.conn.request(method, path, body, headers)
+                response = self.conn.getresponse()
+                data = json.loads(response.read())
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # 服务端断开了长连接时重连一次
+                self.conn.close()
+                if attempt:
+                    raise
+        if response.status == HTTPStatus.NOT_FOUND:
+            raise KeyError(data["error"])
+        if response.status == HTTPStatus.FORBIDDEN:
+            self.token = None  # 服务端重启后令牌会变，下次请求重新读取
+            raise PermissionError(data["error"])  # 不能用 ValueError：界面把它当作输入错误提示
+        if response.status != HTTPStatus.OK:
+            raise ValueError(data["error"])
+        return data
+
+    def fetch(self, path, **params):
+        import urllib.parse
+        query = urllib.parse.urlencode({key: value for key, value in params.items() if value is not None})
+        data = self.request("GET", f"{path}?{query}")
+        return [make_task(item["id"], item["content"], item["status"], item["create_time"]) for item in data["tasks"]]
+
+    def refresh(self):
+        pass
+
+    def reload(self):
+        pass
+
+    def get_date(self, task_date):
+        return self.fetch("/tasks", **{"from": task_date, "to": task_date})
+
+    def get_today(self):
+        return self.get_date(get_today_date())
+
+    def query(self, date_from=None, date_to=None, statuses=None):
+        status = ",".join(str(s) for s in sorted(statuses)) if statuses is not None else None
+        return iter(self.fetch("/tasks", **{"from": date_from or "0000-00-00", "to": date_to or "9999-99-99",
+                                           "status": status}))
+
+    def has_tasks(self):
+        return bool(self.fetch("/tasks", **{"from": "0000-00-00", "to": "9999-99-99", "limit": 1}))
+
+    def has_storage(self):
+        return self.has_tasks()
+
+    def search_content(self, keyword):
+        return self.fetch("/search", text=keyword)
+
+    def list_rules(self):
+        return [dict(rule, detached=set()) for rule in self.request("GET", "/rules")["rules"]]
+
+    def add_rule(self, content, freq, start):
+        return self.request("POST", "/rules/add", {"content": content, "freq": freq, "start": start})["rule"]
+
+    def stop_rule(self, rule_id):
+        return self.request("POST", "/rules/stop", {"id": rule_id})["rule"]
+
+    def day_counts(self, date_from, date_to):
+        import urllib.parse
+        data = self.request("GET", "/stats?" + urllib.parse.urlencode({"from": date_from, "to": date_to}))
+        return {task_date: tuple(counts) for task_date, counts in data["days"].items()}
+
+    def backlog(self, date_from, date_to):
+        return self.fetch("/backlog", **{"from": date_from, "to": date_to})
+
+    def carry(self, tasks, target_date):
+        data = self.request("POST", "/carry", {"ids": [task.id for task in tasks], "to": target_date})
+        return [make_task(item["id"], item["content"], item["status"], item["create_time"]) for item in data["tasks"]]
+
+    def add_many(self, tasks):
+        self.request("POST", "/add", {"tasks": [task_to_json(task) for task in tasks]})
+
+    def add(self, task):
+        self.add_many([task])
+
+    def edit_content(self, task_id, content):
+        self.request("POST", "/edit", {"id": task_id, "content": content})
+
+    def set_status_many(self, task_ids, status):
+        self.request("POST", "/status", {"ids": list(task_ids), "status": status})
+
+    def set_status(self, task_id, status):
+        self.set_status_many([task_id], status)
+
+    def delete_many(self, task_ids):
+        self.request("POST", "/delete", {"ids": list(task_ids)})
+
+    def delete(self, task_id):
+        self.delete_many([task_id])
+
+# ========== 命令行子命令：非交互、不渲染界面，执行完立即退出 ==========
+# 例：python PythonTodo.py add "数学卷子"；cat tasks.txt | python PythonTodo.py add
+#     python PythonTodo.py list --date 20260113-20260120 --status 0,2
+#     python PythonTodo.py set-status 1 --seq 1-5,8；python PythonTodo.py import todo_list_backup.txt
+# list/search 输出以制表符分隔：序号、任务ID、状态、创建时间、内容
+def cli_fail(message):
+    print(f"❌ {message}", file=sys.stderr)
+    return 1
+
+def cli_read_lines(values):
+    # 未给出参数或参数为 "-" 时从标准输入逐行读取
+    if not values or values == ["-"]:
+        return [line.strip() for line in sys.stdin if line.strip()]
+    return values
+
+def cli_print_tasks(tasks):
+    lines = [f"{index}\t{task.id}\t{task.status}\t{task.create_time}\t{task.content}"
+             for index, task in enumerate(tasks, start=1)]
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+    return len(lines)
+
+def cli_date_range(args):
+    if args.date:
+        return date_range_convert(args.date)
+    today = get_today_date()
+    return today, today
+
+def cli_targets(args):
+    # --seq 按某天(默认今日)列表中的序号选择；否则按任务ID，ID 可从标准输入读取
+    if args.seq:
+        date_range = cli_date_range(args)
+        if not date_range:
+            return None, "日期格式错误（yyyymmdd）！"
+        task_store.refresh()  # 先迁移旧格式行，选出的任务ID才与修改时一致
+        date_tasks = list(task_store.query(date_range[0], date_range[0]))
+        selection = parse_selection(args.seq, len(date_tasks))
+        if not selection:
+            return None, "序号不存在或格式错误！"
+        return [date_tasks[num-1] for num in selection], None
+    task_store.refresh()
+    targets = []
+    for task_id in cli_read_lines(args.task_ids):
+        try:
+            targets.append(task_store.lookup(task_id))
+        except KeyError:
+            return None, f"任务ID不存在：{task_id}"
+    return targets, None
+
+def cli_add(args):
+    contents = [content.strip() for content in cli_read_lines(args.contents)]
+    # 参数中的换行会把一条任务拆成文件里的几行，与接口一样直接拒绝
+    if any(not content or "\n" in content or "\r" in content for content in contents):
+        return cli_fail("任务内容不能为空且不能换行")
+    create_time = get_format_time()
+    task_store.add_many([make_task(new_task_id(), content, 0, create_time) for content in contents])
+    print(f"✅ 成功添加 {len(contents)} 条今日待办")
+    return 0
+
+def cli_import(args):
+    if args.file == "-":
+        tasks = parse_import_lines(sys.stdin)
+    elif not os.path.exists(args.file):
+        return cli_fail("文件不存在！")
+    else:
+        with open(args.file, "r", encoding="utf-8") as f:
+            tasks = parse_import_lines(f)
+    task_store.add_many(tasks)
+    print(f"✅ 成功导入 {len(tasks)} 条任务")
+    return 0
+
+def cli_list(args):
+    date_range = cli_date_range(args)
+    statuses = status_filter_convert(args.status or "")
+    if not date_range or statuses is None:
+        return cli_fail("日期或状态格式错误！")
+    task_store.ensure_stable_ids()  # 输出的任务ID要能用于之后的 set-status/delete
+    cli_print_tasks(task_store.query(date_range[0], date_range[1], statuses))
+    return 0
+
+def cli_search(args):
+    if args.text:
+        statuses = status_filter_convert(args.status or "")
+        if statuses is None:
+            return cli_fail("状态格式错误！")
+        cli_print_tasks([t for t in content_index.search(args.text) if t.status in statuses])
+        return 0
+    if not args.date:
+        return cli_fail("请指定 --date 或 --text")
+    return cli_list(args)
+
+def cli_set_status(args):
+    if args.status not in STATUS_MAP:
+        return cli_fail("状态量错误！只能输入 0/1/2/3")
+    targets, error = cli_targets(args)
+    if error:
+        return cli_fail(error)
+    task_store.set_status_many([t.id for t in targets], args.status)
+    print(f"✅ 已将 {len(targets)} 条任务状态修改为【{STATUS_MAP[args.status][1]}】")
+    return 0
+
+def cli_delete(args):
+    targets, error = cli_targets(args)
+    if error:
+        return cli_fail(error)
+    task_store.delete_many([t.id for t in targets])
+    print(f"✅ 已删除 {len(targets)} 条任务")
+    return 0
+
+def cli_postpone(args):
+    if args.source == "yesterday":
+        source_date, target_date = get_yesterday_date(), get_today_date()
+    else:
+        source_date, target_date = get_today_date(), get_tomorrow_date()
+    # 与菜单一样按日期取任务：旧格式行先迁移，谱系根是持久化的任务ID，重复顺延才能识别
+    postpone_tasks = [t for t in task_store.get_date(source_date) if t.status in [0, 2]]
+    if args.seq:
+        selection = parse_selection(args.seq, len(postpone_tasks))
+        if not selection:
+            return cli_fail("序号不存在或格式错误！")
+        postpone_tasks = [postpone_tasks[num-1] for num in selection]
+    print(f"✅ 成功顺延 {postpone_tasks_to(postpone_tasks, target_date)} 条任务至 {target_date}！")
+    return 0
+
+def cli_rollover(args):
+    if args.date:
+        date_range = date_range_convert(args.date)
+        if not date_range:
+            return cli_fail("日期格式错误（yyyymmdd 或 yyyymmdd-yyyymmdd）！")
+    else:
+        date_range = (get_days_ago_date(ROLLOVER_DEFAULT_DAYS), get_yesterday_date())
+    backlog, new_tasks = rollover_engine.rollover(*date_range)
+    print(f"✅ 积压 {len(backlog)} 条，新顺延 {len(new_tasks)} 条任务至今天")
+    return 0
+
+def cli_report(args):
+    if args.date:
+        date_range = date_range_convert(args.date)
+        if not date_range:
+            return cli_fail("日期格式错误（yyyymmdd 或 yyyymmdd-yyyymmdd）！")
+    else:
+        date_range = (get_days_ago_date(REPORT_DEFAULT_DAYS - 1), get_today_date())
+    # 制表符分隔：周期、未完成、已完成、进行中、未知、总数、完成率
+    for label, counts in build_report(task_store.day_counts(*date_range), args.by):
+        total = sum(counts)
+        print("\t".join([label] + [str(count) for count in counts] + [str(total), f"{counts[1] / total if total else 0:.4f}"]))
+    return 0
+
+def cli_recur(args):
+    if args.action == "list":
+        for rule in task_store.list_rules():
+            print(f"{rule['id']}\t{rule['freq']}\t{rule['start']}\t{rule['end'] or ''}\t{rule['content']}")
+        return 0
+    if args.action == "stop":
+        try:
+            task_store.stop_rule(args.rule_id)
+        except KeyError:
+            return cli_fail(f"规则ID不存在：{args.rule_id}")
+        return 0
+    start = date_convert(args.start) if args.start else get_today_date()
+    if not start:
+        return cli_fail("日期格式错误（yyyymmdd）！")
+    print(task_store.add_rule(args.content, args.freq, start)["id"])
+    return 0
+
+def cli_serve(args):
+    # 服务模式才用到 asyncio，在这里导入，不拖慢其他命令的启动
+    import asyncio
+    try:
+        asyncio.run(TodoServer().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("👋 Todo 服务已停止")
+    return 0
+
+CLI_COMMANDS = {
+    # 子命令 -> (处理函数, 受控的功能开关)
+    "add": (cli_add, "add_todo"),
+    "import": (cli_import, "add_todo"),
+    "list": (cli_list, None),
+    "search": (cli_search, "search_todo"),
+    "set-status": (cli_set_status, "edit_history_status"),
+    "delete": (cli_delete, "delete_todo"),
+    "postpone": (cli_postpone, "postpone_todo"),
+    "rollover": (cli_rollover, "rollover_backlog"),
+    "report": (cli_report, "report"),
+    "recur": (cli_recur, "recurring"),
+    "serve": (cli_serve, None)
+}
+
+def build_cli_parser():
+    parser = argparse.ArgumentParser(prog="PythonTodo", description="Python Todo List 命令行模式（不带参数启动交互菜单）")
+    parser.add_argument("--list", dest="list_name", help="操作的任务清单，默认为环境变量 PYTHONTODO_LIST 或 default")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add_parser = commands.add_parser("add", help="添加今日待办，省略内容时从标准输入逐行读取")
+    add_parser.add_argument("contents", nargs="*")
+    import_parser = commands.add_parser("import", help="导入 todo_list.txt 格式或每行一条内容的文件，- 表示标准输入")
+    import_parser.add_argument("file", nargs="?", default="-")
+    for name, help_text in (("list", "列出任务，默认今日"), ("search", "按日期区间或内容关键词查询")):
+        query_parser = commands.add_parser(name, help=help_text)
+        query_parser.add_argument("--date", help="yyyymmdd 或 yyyymmdd-yyyymmdd")
+        query_parser.add_argument("--status", help="状态筛选，如 0,2")
+        if name == "search":
+            query_parser.add_argument("--text", help="内容关键词")
+    status_parser = commands.add_parser("set-status", help="修改任务状态，任务ID省略时从标准输入读取")
+    status_parser.add_argument("status", type=int)
+    delete_parser = commands.add_parser("delete", help="删除任务，任务ID省略时从标准输入读取")
+    for target_parser in (status_parser, delete_parser):
+        target_parser.add_argument("task_ids", nargs="*")
+        target_parser.add_argument("--seq", help="按列表序号选择，如 1-5,8")
+        target_parser.add_argument("--date", help="--seq 对应的日期 yyyymmdd，默认今日")
+    postpone_parser = commands.add_parser("postpone", help="顺延未完成/进行中的任务")
+    postpone_parser.add_argument("--from", dest="source", choices=("today", "yesterday"), default="today",
+                                 help="today=今日顺延至明天，yesterday=昨日顺延至今天")
+    postpone_parser.add_argument("--seq", help="只顺延可顺延列表中的部分序号，如 1-3,5")
+    rollover_parser = commands.add_parser("rollover", help="把一段日期内积压的未完成/进行中任务一次顺延到今天，可重复执行")
+    rollover_parser.add_argument("--date", help=f"yyyymmdd-yyyymmdd，默认最近{ROLLOVER_DEFAULT_DAYS}天")
+    report_parser = commands.add_parser("report", help="按日/周/月输出完成率报表")
+    report_parser.add_argument("--date", help=f"yyyymmdd-yyyymmdd，默认最近{REPORT_DEFAULT_DAYS}天")
+    report_parser.add_argument("--by", choices=tuple(REPORT_PERIODS), default="day")
+    recur_parser = commands.add_parser("recur", help="重复任务规则：list 列出、add 新增、stop 从今天起停止")
+    recur_actions = recur_parser.add_subparsers(dest="action", required=True)
+    recur_actions.add_parser("list")
+    recur_add_parser = recur_actions.add_parser("add")
+    recur_add_parser.add_argument("content")
+    recur_add_parser.add_argument("--freq", choices=tuple(RECUR_FREQS), default="daily")
+    recur_add_parser.add_argument("--start", help="开始日期 yyyymmdd，默认今天")
+    recur_actions.add_parser("stop").add_argument("rule_id")
+    serve_parser = commands.add_parser("serve", help="启动本地 JSON API 服务，终端界面可通过 PYTHONTODO_SERVER 连接")
+    serve_parser.add_argument("--host", default=SERVER_HOST)
+    serve_parser.add_argument("--port", type=int, default=SERVER_PORT)
+    return parser
+
+def run_cli(argv):
+    args = build_cli_parser().parse_args(argv)
+    list_name = args.list_name or os.environ.get("PYTHONTODO_LIST")
+    if list_name:
+        if list_name not in list_manager.names():
+            return cli_fail(f"清单不存在：{list_name}（可在交互菜单中新建）")
+        list_manager.switch(list_name)
+    handler, func_key = CLI_COMMANDS[args.command]
+    if args.command == "postpone" and args.source == "yesterday":
+        func_key = "postpone_yesterday"
+    elif args.command == "search" and args.text:
+        func_key = "search_content"
+    if func_key and not get_func_status(func_key):
+        return cli_fail("该功能已被管理员关闭！")
+    return handler(args)
 
 # ========== ✅ 主程序入口 仅更新菜单顺序和映射表 无其他改动 ==========
 def main():
+    global task_store, current_action
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     init_config()
-    t = threading.Thread(target=time_update_thread, daemon=True)
-    t.start()
-    time.sleep(0.1)
-    
+    # 界面线程持有写入锁，只在等待菜单输入时交给后台线程写盘
+    write_behind.lock.acquire()
+    install_flush_signals()
+    if os.environ.get("PYTHONTODO_SERVER"):
+        task_store = RemoteTaskStore(os.environ["PYTHONTODO_SERVER"])
+    else:
+        if os.environ.get("PYTHONTODO_LIST") in list_manager.names():
+            list_manager.switch(os.environ["PYTHONTODO_LIST"])
+        archive_store.maybe_archive()
+        write_behind.start(get_write_behind_interval())
+
     func_action_map = {
         "add_todo": lambda: add_todo(todos),
         "edit_todo": lambda: edit_todo(todos),
@@ -556,49 +3885,76 @@ def main():
         "clear_today": lambda: clear_today_todo(),
         "postpone_todo": lambda: postpone_today_todo(),
         "postpone_yesterday": lambda: postpone_yesterday_todo(), # 新增映射
+        "rollover_backlog": lambda: rollover_backlog_todo(),
         "search_todo": lambda: search_todo_by_date(),
+        "search_content": lambda: search_todo_by_content(),
+        "report": lambda: report_todo(),
+        "recurring": lambda: recurring_todo(),
+        "switch_list": lambda: switch_list_todo(),
+        "all_lists_today": lambda: all_lists_today_todo(),
         "admin_entrance": lambda: admin_entrance()
     }
 
     while True:
-        todos = load_todos(True)
-        show_todos(todos)
-        print("\n【⚙️  操作菜单 | 全功能开关已生效】")
+        menu_lines = ["\n【⚙️  操作菜单 | 全功能开关已生效】"]
         menu_list = []
         menu_idx = 1
         # 固定菜单顺序 顺延今日→顺延昨日→查询历史
         func_order = ["add_todo", "edit_todo", "edit_history_content", "edit_history_status", 
                       "edit_today_status", "delete_todo", "clear_today", "postpone_todo",
-                      "postpone_yesterday","search_todo", "admin_entrance"]
+                      "postpone_yesterday", "rollover_backlog", "search_todo", "search_content",
+                      "recurring", "report", "switch_list", "all_lists_today", "admin_entrance"]
         for func_key in func_order:
             if get_func_status(func_key):
-                print(f"{menu_idx}. {FUNCTIONS[func_key]}")
+                label = FUNCTIONS[func_key]
+                if func_key == "switch_list":
+                    label += f"（当前：{list_manager.active}）"
+                menu_lines.append(f"{menu_idx}. {label}")
                 menu_list.append(func_key)
                 menu_idx += 1
-        print(f"0. 退出程序")
+        menu_lines.append(f"0. 退出程序")
 
         try:
-            choice = input("\n请输入操作编号(0-{})：".format(len(menu_list))).strip()
+            # 今日任务和操作菜单作为同一帧一次写出；瘦客户端读取失败时同样提示后重试，不直接退出
+            todos = task_store.get_today()
+            show_todos(todos, menu_lines)
+            page_tip = "，n/p 翻页" if today_pager.page_count > 1 else ""
+            with write_behind.idle():
+                choice = ui_input("\n请输入操作编号(0-{}{})：".format(len(menu_list), page_tip)).strip()
+            if choice.lower() in ("n", "p"):
+                today_pager.move(1 if choice.lower() == "n" else -1)
+                continue
             if not choice.isdigit():
                 print("❌ 请输入有效的数字序号！")
-                time.sleep(1)
+                ui_sleep(1)
                 continue
             choice = int(choice)
             if choice == 0:
-                os.system('cls' if os.name == 'nt' else 'clear')
-                print("=" * 70)
-                print("        👋 感谢使用 Todo List，下次再见！")
-                print("=" * 70)
+                write_behind.stop()  # 先写完排队的修改再退出
+                render_frame([
+                    "=" * 70,
+                    "        👋 感谢使用 Todo List，下次再见！",
+                    "=" * 70
+                ])
                 break
             elif 1 <= choice <= len(menu_list):
                 target_func = menu_list[choice-1]
-                func_action_map[target_func]()
+                current_action = target_func
+                try:
+                    perf_stats.run(target_func, func_action_map[target_func])
+                finally:
+                    current_action = None
             else:
                 print(f"❌ 输入错误！请输入0-{len(menu_list)}的数字")
-                time.sleep(1)
+                ui_sleep(1)
         except Exception as e:
             print(f"❌ 操作出错，自动重试！错误信息：{str(e)}")
-            time.sleep(2)
+            ui_sleep(2)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if getattr(sys, "frozen", False):
+        # 打包的 exe 中并行解析的子进程会以 --multiprocessing-fork 参数重新启动本程序，必须先交给 multiprocessing 处理；
+        # 只在打包版本中导入，不拖慢源码运行时的启动
+        import multiprocessing
+        multiprocessing.freeze_support()
+    run_profiled(main)
\ No newline at end of file
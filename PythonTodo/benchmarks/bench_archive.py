@@ -0,0 +1,60 @@
+# 归档基准：对比归档前后加载今日任务、按日期查询历史（冷启动）的耗时，以及两种压缩格式的归档耗时和体积
+# 用法：python benchmarks/bench_archive.py [任务条数]，默认 1000000
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+from generate_history import generate_history, use_directory, reset_state, app
+
+WINDOW_DAYS = 90
+
+
+def timed(action):
+    begin = time.perf_counter()
+    result = action()
+    return time.perf_counter() - begin, result
+
+
+def cold_history_query(target):
+    # 新进程视角：任务库和归档缓存都是空的
+    reset_state()
+    return len(list(app.task_store.query(target, target)))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.txt")
+        generate_history(source, size)
+        use_directory(tmp)
+        shutil.copy(source, app.TODO_FILE)
+        app.save_text_todos(app.load_text_todos(False))  # 先迁移旧格式行，归档前后任务ID一致
+        migrated = app.TODO_FILE + ".migrated"
+        shutil.copy(app.TODO_FILE, migrated)
+        target = min(t.task_date for t in app.iter_todos(None, None, None) if t.task_date >= "2000")
+        print(f"{size} 条任务，保留 {WINDOW_DAYS} 天，历史查询日期 {target}")
+
+        load_before, today_count = timed(lambda: len(app.load_todos(True)))
+        query_before, query_count = timed(lambda: cold_history_query(target))
+        hot_before = os.path.getsize(app.TODO_FILE)
+        for compression in ("lzma", "gzip"):
+            shutil.copy(migrated, app.TODO_FILE)
+            app.archive_store.clear()
+            app.switch_registry.set_option("ARCHIVE", "compression", compression)
+            archive_cost, archived = timed(lambda: app.archive_store.archive(app.get_archive_cutoff(WINDOW_DAYS)))
+            archive_dir = app.archive_store.get_dir()
+            archive_bytes = sum(os.path.getsize(os.path.join(archive_dir, name)) for name in os.listdir(archive_dir))
+            load_after, today_after = timed(lambda: len(app.load_todos(True)))
+            query_after, query_after_count = timed(lambda: cold_history_query(target))
+            assert (today_after, query_after_count) == (today_count, query_count)
+            print(f"\n[{compression}] 归档 {archived} 条耗时 {archive_cost:.2f}s，"
+                  f"归档体积 {archive_bytes / 1048576:.1f}MB，热文件 {hot_before / 1048576:.1f}MB -> "
+                  f"{os.path.getsize(app.TODO_FILE) / 1048576:.2f}MB")
+            print(f"  加载今日任务({today_count}条)      {load_before * 1000:>9.1f}ms -> {load_after * 1000:>8.1f}ms")
+            print(f"  冷启动查询历史某天({query_count}条)  {query_before * 1000:>9.1f}ms -> {query_after * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# 多进程并发写入基准：N 个写进程同时对同一份任务文件新增任务并修改状态，输出提交吞吐量；
+# 日志压缩阈值调小，让压缩与追加频繁交错；没有丢失修改由 tests/test_concurrency.py 校验
+# 用法：python benchmarks/bench_concurrency.py [进程数] [每进程任务数]，默认 8 200；
+# 设置环境变量 PYTHONTODO_BACKEND=sqlite 可测试 SQLite 后端
+import sys
+import time
+import tempfile
+import multiprocessing
+
+from generate_history import use_directory, app
+
+COMPACT_SIZE = 16 * 1024
+
+
+def setup(tmp):
+    use_directory(tmp)
+    app.JOURNAL_COMPACT_SIZE = COMPACT_SIZE
+
+
+def writer(tmp, worker, count, start_event):
+    # 与交互界面一样持有已加载的内存视图，别的进程写入后该视图就会过期
+    setup(tmp)
+    app.task_store.refresh()
+    start_event.wait()
+    for i in range(count):
+        task = app.make_task(app.new_task_id(), f"进程{worker}-任务{i}", 0, app.get_format_time())
+        app.task_store.add(task)
+        app.task_store.set_status(task.id, 1)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        setup(tmp)
+        app.init_config()
+        start_event = multiprocessing.Event()
+        processes = [multiprocessing.Process(target=writer, args=(tmp, worker, count, start_event))
+                     for worker in range(workers)]
+        for process in processes:
+            process.start()
+        time.sleep(0.5)
+        begin = time.perf_counter()
+        start_event.set()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - begin
+        commits = workers * count * 2
+        print(f"后端 {app.get_storage_backend()}，{workers} 个进程 x {count} 条任务，共 {commits} 次提交")
+        print(f"耗时 {elapsed:.2f}s，吞吐 {commits / elapsed:.0f} 次提交/秒，代数 {app.read_generation()}")
+        if any(process.exitcode for process in processes):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
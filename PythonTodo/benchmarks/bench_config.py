@@ -0,0 +1,52 @@
+# 开关配置基准：统计每次菜单渲染读取配置文件的次数，以及单次开关查询耗时
+# 用法：python benchmarks/bench_config.py [渲染次数]，默认 1000
+import sys
+import time
+import configparser
+import tempfile
+
+from generate_history import use_directory, app
+
+
+def legacy_get_func_status(func_name):
+    # 改造前的实现：每次查询都检查文件是否存在并完整解析一遍
+    config = configparser.ConfigParser()
+    config.read(app.CONFIG_FILE, encoding="utf-8")
+    return config.get("FUNCTION_SWITCH", func_name, fallback="1") == "1"
+
+
+def render_menu(get_status):
+    # 与主菜单一致：每次重绘逐个检查所有功能开关
+    return [func_key for func_key in app.FUNCTIONS if get_status(func_key)]
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        use_directory(tmp)
+        app.init_config()
+
+        begin = time.perf_counter()
+        for _ in range(renders):
+            render_menu(legacy_get_func_status)
+        legacy_cost = (time.perf_counter() - begin) / renders
+
+        reads_before = app.switch_registry.read_count
+        begin = time.perf_counter()
+        for _ in range(renders):
+            render_menu(app.get_func_status)
+        cached_cost = (time.perf_counter() - begin) / renders
+        cached_reads = app.switch_registry.read_count - reads_before
+
+        app.set_func_status("add_todo", False)
+        reads_before = app.switch_registry.read_count
+        render_menu(app.get_func_status)
+        after_write_reads = app.switch_registry.read_count - reads_before
+
+    print(f"每次菜单渲染读取配置文件：改造前 {len(app.FUNCTIONS)} 次 | 缓存后 {cached_reads / renders:.2f} 次")
+    print(f"开关写入后的下一次渲染读取配置文件：{after_write_reads} 次")
+    print(f"每次菜单渲染耗时：改造前 {legacy_cost * 1e6:.1f} μs | 缓存后 {cached_cost * 1e6:.1f} μs")
+
+
+if __name__ == "__main__":
+    main()
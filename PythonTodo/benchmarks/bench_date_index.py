@@ -0,0 +1,68 @@
+# 日期索引基准：对比逐行扫描与按日期索引定位读取时，加载今日任务、按日期区间查询、历史编辑按日期列出任务（冷启动）的耗时，
+# 以及首次建索引、末尾追加若干行后增量更新、整体重建的耗时；每个场景都校验两种方式的结果一致
+# 用法：python benchmarks/bench_date_index.py [任务条数]，默认 1000000
+import os
+import sys
+import time
+import tempfile
+
+from generate_history import generate_history, use_directory, reset_state, app
+
+APPEND_LINES = 1000
+RANGE_DAYS = 7
+
+
+def timed(action):
+    begin = time.perf_counter()
+    result = action()
+    return time.perf_counter() - begin, result
+
+
+def task_keys(tasks):
+    return [(task.id, task.status, task.content, task.create_time) for task in tasks]
+
+
+def cold_get_date(target):
+    # 新进程视角：任务库尚未加载
+    reset_state()
+    return app.task_store.get_date(target)
+
+
+def compare(name, action):
+    min_bytes = app.DATE_INDEX_MIN_BYTES
+    app.DATE_INDEX_MIN_BYTES = float("inf")
+    scan_cost, expected = timed(lambda: task_keys(action()))
+    app.DATE_INDEX_MIN_BYTES = min_bytes
+    index_cost, actual = timed(lambda: task_keys(action()))
+    assert actual == expected, f"{name}：按索引读取的结果与逐行扫描不一致"
+    print(f"  {name:<22}({len(expected):>5}条) 逐行扫描 {scan_cost * 1000:>9.1f}ms -> 索引 {index_cost * 1000:>8.1f}ms")
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        use_directory(tmp)
+        generate_history(app.TODO_FILE, size)
+        app.save_text_todos(app.load_text_todos(False))  # 先迁移旧格式行，任务ID固定后才能比较
+        print(f"{size} 条任务，快照 {os.path.getsize(app.TODO_FILE) / 1048576:.1f}MB")
+
+        build_cost, _ = timed(app.date_index.ensure_valid)
+        print(f"  首次建索引 {build_cost * 1000:.1f}ms，索引 {os.path.getsize(app.date_index.get_file()) / 1024:.1f}KB")
+        range_from = app.get_days_ago_date(200 + RANGE_DAYS)
+        range_to = app.get_days_ago_date(200)
+        history_date = app.get_days_ago_date(365)
+        compare("加载今日任务", lambda: app.load_todos(True))
+        compare(f"查询{RANGE_DAYS}天未完成/进行中", lambda: list(app.task_store.query(range_from, range_to, {0, 2})))
+        compare("历史编辑按日期列出", lambda: cold_get_date(history_date))
+
+        with open(app.TODO_FILE, "a", encoding="utf-8") as f:
+            create_time = app.get_format_time()
+            f.writelines(f"0|追加任务{i}|{create_time}|{app.new_task_id()}\n" for i in range(APPEND_LINES))
+        append_cost, _ = timed(app.date_index.ensure_valid)
+        rebuild_cost, _ = timed(lambda: app.date_index.ensure_valid(rebuild=True))
+        print(f"  末尾追加 {APPEND_LINES} 行后增量更新 {append_cost * 1000:.1f}ms，整体重建 {rebuild_cost * 1000:.1f}ms")
+        compare("追加后加载今日任务", lambda: app.load_todos(True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# 日志写入基准：对比「整文件重写」与「追加日志」的单次修改耗时随历史规模的变化
+# 用法：python benchmarks/bench_journal.py [规模1 规模2 ...]，默认 10000 100000 1000000
+import sys
+import time
+import random
+import tempfile
+
+from generate_history import generate_history, use_directory, reset_state, app
+
+MUTATIONS = 200
+REWRITE_MUTATIONS = 3
+
+
+def bench_rewrite(size):
+    cost = []
+    for _ in range(REWRITE_MUTATIONS):
+        begin = time.perf_counter()
+        all_todos = app.load_todos(False)
+        all_todos[random.randrange(size)].status = 1
+        app.save_todos(all_todos)
+        cost.append(time.perf_counter() - begin)
+    return sum(cost) / len(cost)
+
+
+def bench_journal(size):
+    task_ids = [task.id for task in app.load_todos(False)]
+    begin = time.perf_counter()
+    for _ in range(MUTATIONS):
+        task_id = random.choice(task_ids)
+        app.append_journal([app.journal_status(task_id, random.choice((0, 1, 2)))])
+    return (time.perf_counter() - begin) / MUTATIONS
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    with tempfile.TemporaryDirectory() as tmp:
+        use_directory(tmp)
+        print(f"{'历史条数':>10} {'整文件重写(ms/次)':>18} {'追加日志(ms/次)':>16}")
+        for size in sizes:
+            reset_state()
+            generate_history(app.TODO_FILE, size)
+            rewrite = bench_rewrite(size)
+            app.compact_journal()
+            journal = bench_journal(size)
+            print(f"{size:>10} {rewrite * 1000:>18.2f} {journal * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# 内存基准：用 tracemalloc 对比「每条任务一个字典」与 Task(__slots__) 加载全部历史的内存占用
+# 同时逐条核对两种表示渲染出的任务行完全一致
+# 用法：python benchmarks/bench_memory.py [任务条数]，默认 1000000
+import sys
+import tempfile
+import tracemalloc
+
+from generate_history import generate_history, use_directory, app
+
+
+def load_as_dicts():
+    # 改造前的任务表示：每条任务一个 5 键字典，日期和创建时间都是独立字符串
+    todos = []
+    today = app.get_today_date()
+    with open(app.TODO_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                task_id, status, content, create_time = app.parse_todo_line(line, today)
+                todos.append({
+                    "id": task_id,
+                    "content": content,
+                    "status": status,
+                    "create_time": create_time,
+                    "task_date": create_time.split(" ")[0]
+                })
+    return todos
+
+
+def measure(loader):
+    tracemalloc.start()
+    todos = loader()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return todos, current
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        use_directory(tmp)
+        generate_history(app.TODO_FILE, size)
+        dict_todos, dict_bytes = measure(load_as_dicts)
+        task_todos, task_bytes = measure(lambda: app.load_todos(False))
+
+    for old, new in zip(dict_todos, task_todos):
+        old_line = f"{app.STATUS_MAP[old['status']][0]} | {old['content']} | {old['create_time']} | {old['task_date']}"
+        new_line = f"{app.STATUS_MAP[new.status][0]} | {new.content} | {new.create_time} | {new.task_date}"
+        assert old_line == new_line, (old_line, new_line)
+
+    print(f"任务条数：{size}（渲染结果逐条一致）")
+    print(f"字典表示：{dict_bytes / 1024 / 1024:.1f} MB，每条 {dict_bytes / size:.0f} 字节")
+    print(f"Task 表示：{task_bytes / 1024 / 1024:.1f} MB，每条 {task_bytes / size:.0f} 字节")
+    print(f"内存占比：{task_bytes / dict_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# 并行加载基准：对比逐行加载与按核数分块多进程解析加载全部任务的耗时，并校验两者结果一致；
+# 另外确认小文件会自动退回逐行加载（不启动进程池）
+# 用法：python benchmarks/bench_parallel_load.py [任务条数]，默认 1000000
+import os
+import sys
+import time
+import tempfile
+
+from generate_history import generate_history, use_directory, app
+
+SMALL_SIZE = 10000
+
+
+def timed_load(workers, min_bytes):
+    app.PARSE_WORKERS = workers
+    app.PARALLEL_PARSE_MIN_BYTES = min_bytes
+    begin = time.perf_counter()
+    todos = app.load_todos(False)
+    return time.perf_counter() - begin, todos
+
+
+def task_key(todo):
+    # 旧格式行的ID按加载时刻生成，两次加载必然不同，只比较其余字段
+    return todo.content, todo.status, todo.create_time
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    default_min_bytes = app.PARALLEL_PARSE_MIN_BYTES
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        use_directory(tmp)
+        generate_history(app.TODO_FILE, size)
+        file_mb = os.path.getsize(app.TODO_FILE) / 1048576
+        print(f"{size} 条任务（{file_mb:.1f}MB），CPU 核数 {cores}，自动并行阈值 {default_min_bytes / 1048576:.0f}MB")
+
+        serial, expected = timed_load(1, default_min_bytes)
+        expected = [task_key(todo) for todo in expected]
+        print(f"  逐行加载          {serial:>7.2f}s")
+        workers = 2
+        while workers <= max(cores, 2):
+            # 阈值置 0 强制走并行路径，单核机器上也能看到进程池本身的开销
+            elapsed, todos = timed_load(workers, 0)
+            assert [task_key(todo) for todo in todos] == expected, "并行加载结果与逐行加载不一致"
+            print(f"  并行 {workers:>2} 个进程     {elapsed:>7.2f}s  加速 {serial / elapsed:.2f}x")
+            workers *= 2
+
+        generate_history(app.TODO_FILE, SMALL_SIZE)
+        app.PARSE_WORKERS = None
+        app.PARALLEL_PARSE_MIN_BYTES = default_min_bytes
+        fallback = app.parse_snapshot_parallel(app.TODO_FILE, app.get_today_date()) is None
+        elapsed, _ = timed_load(None, default_min_bytes)
+        print(f"  小文件 {SMALL_SIZE} 条自动{'退回逐行加载' if fallback else '并行加载'} {elapsed * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# 渲染基准：对比改造前「os.system 清屏 + 逐行 print 全部任务」与 ANSI 清屏 + 只格式化当前页、整帧一次写出的重绘耗时和子进程数
+# 用法：python benchmarks/bench_render.py [重绘次数] [今日任务条数]，默认 200 次、30 条；如 50 5000 对比大列表
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+from generate_history import use_directory, app
+
+spawn_count = 0
+
+
+def count_spawns():
+    # 统计 os.system 和 subprocess 启动的子进程数
+    global spawn_count
+    original_system = os.system
+    original_init = subprocess.Popen.__init__
+
+    def counting_system(command):
+        global spawn_count
+        spawn_count += 1
+        return original_system(command)
+
+    def counting_init(self, *args, **kwargs):
+        global spawn_count
+        spawn_count += 1
+        return original_init(self, *args, **kwargs)
+
+    os.system = counting_system
+    subprocess.Popen.__init__ = counting_init
+
+
+def legacy_show_todos(todos, current_time_str):
+    # 改造前的重绘方式
+    os.system('cls' if os.name == 'nt' else 'clear')
+    print("=" * 70)
+    print("        📋 Python Todo List (无日志+双顺延+全功能可控+无BUG)")
+    print("=" * 70)
+    print(f"\n📅 今日日期：{app.get_today_date()} ({app.get_today_date_yyyymmdd()}) | 昨日日期：{app.get_yesterday_date()} ({app.get_yesterday_date_yyyymmdd()})")
+    print(f"📌 {app.STATUS_TIPS}")
+    total = len(todos)
+    uncompleted = len([t for t in todos if t.status == 0])
+    ongoing = len([t for t in todos if t.status == 2])
+    completed = len([t for t in todos if t.status == 1])
+    unknown = len([t for t in todos if t.status == 3])
+    print(f"📊 今日任务统计：总任务: {total} | ❌未完成: {uncompleted} | ⚡进行中: {ongoing} | ✅已完成: {completed} | ❓未知: {unknown}")
+    print("\n【今日待办事项 | 次日自动隐藏，历史任务可查询/修改】")
+    for index, todo in enumerate(todos, start=1):
+        print(f"    {index}. {app.STATUS_MAP[todo.status][0]} | {todo.content} | 添加于：{todo.create_time}")
+    print("\n" + " " * 22 + f"🕒 当前时间：{current_time_str}")
+    print("=" * 70)
+
+
+def measure(redraw, rounds):
+    global spawn_count
+    spawn_count = 0
+    # 输出重定向到空设备，只统计重绘本身（包括子进程直接写终端的部分）
+    saved_fd = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        begin = time.perf_counter()
+        for _ in range(rounds):
+            redraw()
+            sys.stdout.flush()
+        cost = (time.perf_counter() - begin) / rounds
+    finally:
+        os.dup2(saved_fd, 1)
+        os.close(devnull)
+        os.close(saved_fd)
+    return cost, spawn_count / rounds
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    with tempfile.TemporaryDirectory() as tmp:
+        # 今日统计取自任务库的每日汇总，任务需要真正写入临时任务库
+        use_directory(tmp)
+        app.task_store.add_many([app.make_task(app.new_task_id(), f"今日任务{i}：数学卷子第{i}页", i % 4, app.get_format_time())
+                                 for i in range(size)])
+        todos = app.task_store.get_today()
+        count_spawns()
+        legacy_cost, legacy_spawns = measure(lambda: legacy_show_todos(todos, app.get_format_time()), rounds)
+        new_cost, new_spawns = measure(lambda: app.show_todos(todos), rounds)
+    print(f"今日任务 {size} 条，重绘 {rounds} 次，每页 {app.today_pager.page_size} 条")
+    print(f"改造前：每次重绘 {legacy_cost * 1000:.2f} ms，启动子进程 {legacy_spawns:.0f} 个")
+    print(f"改造后：每次重绘 {new_cost * 1000:.2f} ms，启动子进程 {new_spawns:.0f} 个")
+
+
+if __name__ == "__main__":
+    main()
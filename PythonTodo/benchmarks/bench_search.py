@@ -0,0 +1,39 @@
+# 流式查询基准：对比「加载全部历史再过滤」与 iter_todos 按日期查询的耗时和峰值内存
+# 用法：python benchmarks/bench_search.py [任务条数]，默认 1000000
+import sys
+import time
+import tempfile
+import tracemalloc
+
+from generate_history import generate_history, use_directory, app
+
+
+def measure(query):
+    tracemalloc.start()
+    begin = time.perf_counter()
+    count = query()
+    cost = time.perf_counter() - begin
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, cost, peak
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        use_directory(tmp)
+        # 查询历史最早的一天：流式查询要读过的行最少，与全量加载的差距最能体现按日期提前结束的效果
+        target = generate_history(app.TODO_FILE, size)["first_date"]
+        scenarios = [
+            ("全量加载后过滤", lambda: len([t for t in app.load_todos(False) if t.task_date == target])),
+            ("流式查询单日", lambda: sum(1 for _ in app.iter_todos(target, target))),
+            ("流式查询单日+状态", lambda: sum(1 for _ in app.iter_todos(target, target, {0, 2}))),
+        ]
+        print(f"任务条数：{size}，查询日期：{target}")
+        for name, query in scenarios:
+            count, cost, peak = measure(query)
+            print(f"{name:<12} 结果 {count:>4} 条 | 耗时 {cost * 1000:>8.1f} ms | 峰值内存 {peak / 1024 / 1024:>8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
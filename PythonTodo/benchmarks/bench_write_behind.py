@@ -0,0 +1,63 @@
+# 后台写入基准：对比同步写入与后台写入时界面上每次修改的耗时，可用 --disk-delay 模拟慢盘/网络盘（每次提交额外等待）
+# 进程被结束时的持久化保证由 tests/test_crash_recovery.py 校验
+# 用法：python benchmarks/bench_write_behind.py [--ops 200] [--disk-delay 20] [--history 100000]
+import time
+import argparse
+import tempfile
+
+from generate_history import generate_history, use_directory, app
+
+
+def slow_disk(delay):
+    commit_records = app.commit_records
+
+    def delayed(records):
+        time.sleep(delay)
+        commit_records(records)
+    app.commit_records = delayed
+
+
+def measure_latency(args):
+    # 与交互界面一样：界面线程持有锁做修改，两次操作之间在「等待输入」中放开锁
+    slow_disk(args.disk_delay / 1000)
+    print(f"界面修改耗时（历史 {args.history} 条，模拟每次提交额外等待 {args.disk_delay}ms，{args.ops} 次新增+改状态）")
+    for interval in (0, app.WRITE_BEHIND_INTERVAL):
+        with tempfile.TemporaryDirectory() as tmp:
+            use_directory(tmp)
+            app.init_config()
+            generate_history(app.TODO_FILE, args.history)
+            app.task_store.refresh()
+            app.write_behind.lock.acquire()
+            app.write_behind.start(interval)
+            costs = []
+            for i in range(args.ops):
+                begin = time.perf_counter()
+                task = app.make_task(app.new_task_id(), f"延迟测试{i}", 0, app.get_format_time())
+                app.task_store.add(task)
+                app.task_store.set_status(task.id, 1)
+                costs.append(time.perf_counter() - begin)
+                with app.write_behind.idle():
+                    time.sleep(0.005)
+            flushed = app.write_behind.flushed
+            begin = time.perf_counter()
+            app.write_behind.stop()
+            final_flush = time.perf_counter() - begin
+            app.write_behind.lock.release()
+            assert sum(task.content.startswith("延迟测试") for task in app.load_todos(False)) == args.ops
+            costs.sort()
+            name = "同步写入" if interval <= 0 else f"后台写入(间隔{interval:g}s)"
+            print(f"  {name:<18} 平均 {sum(costs) / len(costs) * 1000:>8.2f}ms  p99 {costs[int(len(costs) * 0.99)] * 1000:>8.2f}ms  "
+                  f"运行期间后台已写盘 {flushed} 次提交，退出时写出剩余耗时 {final_flush * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="后台写入基准")
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--disk-delay", type=float, default=20, help="模拟慢盘：每次提交额外等待的毫秒数")
+    parser.add_argument("--history", type=int, default=100000)
+    args = parser.parse_args()
+    measure_latency(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# 合成历史任务文件生成器：按 todo_list.txt 的真实格式生成指定条数的任务，供各基准脚本复用
+# 混入旧版本留下的 2 字段行（状态|内容）和 3 字段行（无任务ID），内容以中文为主、夹杂英文和数字，
+# 日期从若干年前一直分布到今天（周末任务少），今天和昨天留有未完成/进行中的任务供顺延场景使用
+# 同一随机种子生成的文件内容完全相同（日期相对运行当天）
+# 各基准脚本共用的部分也在这里：基准脚本都从 benchmarks 目录直接运行，该目录自动在 sys.path 中，
+# 从本模块导入 app、use_directory、reset_state 即可，不必各自修改 sys.path
+# 用法：python benchmarks/generate_history.py 条数 [输出文件] [--seed 0]，如 100000 todo_list.txt
+import os
+import sys
+import random
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import PythonTodo as app
+
+SUBJECTS = ("语文", "数学", "英语", "物理", "化学", "历史", "地理", "生物", "道法")
+ITEMS = ("卷子", "大卷T{a}-{b}", "练习册第{a}页", "作文《藏在______里的爱》", "练字", "单词U{u}表格默写",
+         "错题订正", "一遍过{a},{b}", "预习第{u}课", "复习第{u}章", "读《西游记》第{a}回", "2页计算", "大报")
+ENGLISH_ITEMS = ("review", "WORD_U{u}-U{v}", "Unit{u} reading", "listening test {a}")
+LEGACY_2_RATIO = 0.01   # 最早期只有「状态|内容」的行，按规则视为今天的任务
+LEGACY_3_RATIO = 0.1    # 还没有任务ID的「状态|内容|创建时间」行
+MIN_PER_DAY = 8
+MAX_DAYS = 3650
+
+
+RECENT_STATUS = (0, 0, 1, 2)                       # 今天和昨天的任务多为未完成/进行中
+OLD_STATUS = (0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 3)  # 早先的任务大多已完成
+
+# 每条任务要抽好几个随机数，randint/choices 的开销会占满生成时间，这里统一用 random() 换算
+def make_content(rng):
+    r = rng.random
+    fields = {"a": int(r() * 120) + 1, "b": int(r() * 120) + 1, "u": int(r() * 9) + 1, "v": int(r() * 9) + 1}
+    if r() < 0.1:
+        return ENGLISH_ITEMS[int(r() * len(ENGLISH_ITEMS))].format(**fields)
+    return SUBJECTS[int(r() * len(SUBJECTS))] + ITEMS[int(r() * len(ITEMS))].format(**fields)
+
+
+def pick_status(rng, is_recent):
+    statuses = RECENT_STATUS if is_recent else OLD_STATUS
+    return statuses[int(rng.random() * len(statuses))]
+
+
+def day_counts(rng, size, today):
+    # 从今天往前逐日分配条数，直到凑够 size；条数在平均值上下浮动，周末减半
+    per_day = max(MIN_PER_DAY, size // MAX_DAYS)
+    counts = []
+    remaining = size
+    day = today
+    while remaining > 0:
+        count = rng.randint(per_day // 2, per_day * 3 // 2)
+        if day.weekday() >= 5:
+            count //= 2
+        count = min(max(count, 1), remaining)
+        counts.append((day, count))
+        remaining -= count
+        day -= datetime.timedelta(days=1)
+    counts.reverse()
+    return counts
+
+
+def generate_history(path, size, seed=0):
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    legacy2 = int(size * LEGACY_2_RATIO)
+    legacy3 = int(size * LEGACY_3_RATIO)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"{pick_status(rng, False)}|{make_content(rng)}\n" for _ in range(legacy2))
+        counts = day_counts(rng, size - legacy2, today)
+        for day, count in counts:
+            is_recent = (today - day).days <= 1
+            # 日期、星期和当天零点的毫秒时间戳每天只算一次，任务在 7:00-23:00 之间
+            date_str = day.strftime("%Y-%m-%d")
+            week_name = app.WEEK_NAMES[day.weekday()]
+            base_ms = int(datetime.datetime(day.year, day.month, day.day).timestamp() * 1000)
+            seconds = sorted(7 * 3600 + int(rng.random() * 16 * 3600) for _ in range(count))
+            lines = []
+            for offset in seconds:
+                create_time = f"{date_str} {offset // 3600:02d}:{offset // 60 % 60:02d}:{offset % 60:02d} {week_name}"
+                line = f"{pick_status(rng, is_recent)}|{make_content(rng)}|{create_time}"
+                if written >= legacy3:
+                    task_id = app.to_base36(base_ms + offset * 1000).rjust(8, "0")
+                    line += "|" + task_id + app.to_base36(rng.getrandbits(20)).rjust(4, "0")
+                lines.append(line + "\n")
+                written += 1
+            f.writelines(lines)
+    return {"size": size, "seed": seed, "legacy_2_field": legacy2, "legacy_3_field": legacy3,
+            "first_date": counts[0][0].isoformat() if counts else today.isoformat()}
+
+
+def use_directory(directory):
+    # 任务文件和开关配置都放到 directory 下，进程内状态随之重置
+    app.TODO_FILE = os.path.join(directory, "todo_list.txt")
+    app.CONFIG_FILE = os.path.join(directory, os.path.basename(app.CONFIG_FILE))
+    reset_state()
+
+
+def reset_state():
+    # 丢弃进程内的缓存，相当于新启动的进程：按清单区分的全局对象按 LIST_STATE_FACTORIES 全部重建，
+    # 清单、开关配置、代数缓存和 SQLite 连接一并重置；任务文件和配置的路径不变
+    if app.sqlite_conn is not None:
+        app.sqlite_conn.close()
+    app.sqlite_conn = app.sqlite_conn_path = None
+    vars(app).update({key: factory() for key, factory in app.LIST_STATE_FACTORIES.items()})
+    app.list_manager = app.ListManager()
+    app.switch_registry = app.SwitchRegistry()
+    app.generation_cache = (None, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成的 todo_list.txt 历史任务文件")
+    parser.add_argument("size", type=int)
+    parser.add_argument("output", nargs="?", default="todo_list.txt")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    info = generate_history(args.output, args.size, args.seed)
+    print(f"✅ 已生成 {args.output}：{info}")
+
+
+if __name__ == "__main__":
+    main()
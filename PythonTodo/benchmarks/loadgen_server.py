@@ -0,0 +1,111 @@
+# serve 模式压测：在临时目录预置历史任务并启动服务进程，多个长连接并发请求，
+# 统计每秒请求数与 p50/p99 延迟；请求按比例混合读（今日列表/日期区间查询）与写（新增、改状态）
+# 用法：python benchmarks/loadgen_server.py [并发连接数] [持续秒数] [写请求比例]，默认 32 10 0.2
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import tempfile
+import subprocess
+
+from generate_history import generate_history, app
+
+HISTORY_SIZE = 20000
+RANGE_DAYS = 7
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def request(reader, writer, headers, method, path, payload=None):
+    body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(f"{method} {path} HTTP/1.1\r\n{headers}Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    data = json.loads(await reader.readexactly(length))
+    if status != 200:
+        raise RuntimeError(data["error"])
+    return data
+
+
+def random_range(first_date):
+    # 历史中随机的 RANGE_DAYS 天
+    first_day = app.date_to_day(first_date)
+    start = random.randint(first_day, max(first_day, app.date_to_day(app.get_today_date()) - RANGE_DAYS))
+    return app.day_to_date(start), app.day_to_date(start + RANGE_DAYS - 1)
+
+
+async def client(port, token, first_date, deadline, write_ratio, latencies, counts):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    headers = f"Host: 127.0.0.1:{port}\r\nContent-Type: application/json\r\nX-Todo-Token: {token}\r\n"
+    today = app.get_today_date()
+    own_ids = []
+    while time.perf_counter() < deadline:
+        roll = random.random()
+        begin = time.perf_counter()
+        if roll < write_ratio / 2 or not own_ids and roll < write_ratio:
+            data = await request(reader, writer, headers, "POST", "/add", {"tasks": [{"content": f"压测任务{random.random()}"}]})
+            own_ids.append(data["tasks"][0]["id"])
+            kind = "add"
+        elif roll < write_ratio:
+            await request(reader, writer, headers, "POST", "/status", {"ids": [random.choice(own_ids)], "status": random.choice((0, 1, 2))})
+            kind = "status"
+        elif roll < 0.5 + write_ratio / 2:
+            await request(reader, writer, headers, "GET", f"/tasks?from={today}&to={today}")
+            kind = "today"
+        else:
+            date_from, date_to = random_range(first_date)
+            await request(reader, writer, headers, "GET", f"/tasks?from={date_from}&to={date_to}&status=0,2")
+            kind = "range"
+        latencies.append(time.perf_counter() - begin)
+        counts[kind] = counts.get(kind, 0) + 1
+    writer.close()
+
+
+async def run_load(port, token, first_date, connections, duration, write_ratio):
+    latencies, counts = [], {}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(client(port, token, first_date, deadline, write_ratio, latencies, counts) for _ in range(connections)))
+    return latencies, counts
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    write_ratio = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+    with tempfile.TemporaryDirectory() as tmp:
+        first_date = generate_history(os.path.join(tmp, app.TODO_FILE), HISTORY_SIZE)["first_date"]
+        port = free_port()
+        server = subprocess.Popen([sys.executable, os.path.abspath(app.__file__), "serve", "--port", str(port)],
+                                  cwd=tmp, stdout=subprocess.PIPE)
+        try:
+            server.stdout.readline()  # 启动完成（已加载任务库、写出访问令牌）后才打印
+            with open(os.path.join(tmp, app.TODO_FILE + app.TOKEN_SUFFIX), encoding="utf-8") as f:
+                token = f.read()
+            latencies, counts = asyncio.run(run_load(port, token, first_date, connections, duration, write_ratio))
+        finally:
+            server.terminate()
+            server.wait()
+    latencies.sort()
+    total = len(latencies)
+    print(f"{connections} 个连接，{duration:.0f}s，历史 {HISTORY_SIZE} 条，写请求比例 {write_ratio:.0%}")
+    print(f"请求数 {total}（{', '.join(f'{k}={v}' for k, v in sorted(counts.items()))}）")
+    print(f"吞吐 {total / duration:.0f} req/s，p50 {latencies[total // 2] * 1000:.2f}ms，"
+          f"p99 {latencies[int(total * 0.99)] * 1000:.2f}ms，最大 {latencies[-1] * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
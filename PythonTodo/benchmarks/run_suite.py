@@ -0,0 +1,170 @@
+# 可复现的基准套件：用 generate_history 生成指定规模的历史文件，逐个计时核心场景，结果输出为 JSON
+# 交互函数直接调用，界面输入 ui_input 按场景预置应答、提示停顿 ui_sleep 置空、屏幕输出丢弃；
+# 每次运行前都从生成好的原始文件恢复，保证各场景、各次运行的输入一致
+# 用法：python benchmarks/run_suite.py [--sizes 10000 100000 1000000] [--repeat 3] [--seed 0]
+#                                      [--output 结果.json] [--compare 旧版本结果.json]
+# 设置环境变量 PYTHONTODO_BACKEND=sqlite 可测试 SQLite 后端
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import datetime
+import statistics
+import subprocess
+import contextlib
+
+from generate_history import generate_history, use_directory, reset_state, app
+
+FUNC_STATUS_CALLS = 10000
+REGRESSION_RATIO = 1.2
+
+
+def feed(*answers):
+    it = iter(answers)
+    app.ui_input = lambda prompt="": next(it)
+
+
+def reset_storage(source):
+    # 恢复原始文件，清掉日志、锁、索引、数据库等派生文件，并丢弃进程内的缓存
+    reset_state()
+    directory = os.path.dirname(app.TODO_FILE)
+    for name in os.listdir(directory):
+        if name.startswith(os.path.basename(os.path.splitext(app.TODO_FILE)[0])):
+            os.remove(os.path.join(directory, name))
+    shutil.copy(source, app.TODO_FILE)
+    if app.get_storage_backend() == "sqlite":
+        app.get_sqlite_conn()  # 首次连接时从文本文件导入，不计入场景耗时
+
+
+def date_range_input(days):
+    today = datetime.date.today()
+    return f"{(today - datetime.timedelta(days=days - 1)):%Y%m%d}-{today:%Y%m%d}"
+
+
+def build_scenarios(raw_file, migrated_file):
+    # (名称, 恢复哪个原始文件, 计时前的准备, 计时的操作)
+    # raw_file 含未迁移的旧格式行；迁移后的文件代表日常运行的稳态，交互场景用它
+    def warm_store():
+        app.task_store.refresh()
+
+    def preload_all():
+        return app.load_todos(False)
+
+    def warm_stats():
+        app.stats_rollup.day_counts(app.get_today_date(), app.get_today_date())
+
+    def func_status():
+        for _ in range(FUNC_STATUS_CALLS):
+            app.get_func_status("add_todo")
+
+    return [
+        ("load_todos_today", raw_file, None, lambda prepared: app.load_todos(True)),
+        ("load_todos_all", raw_file, None, lambda prepared: app.load_todos(False)),
+        ("save_todos_all", raw_file, preload_all, lambda prepared: app.save_todos(prepared)),
+        ("search_by_date_cold", migrated_file, lambda: feed(date_range_input(7), "0,2", ""),
+         lambda prepared: app.search_todo_by_date()),
+        ("search_by_date_warm", migrated_file, lambda: (warm_store(), feed(date_range_input(7), "0,2", "")),
+         lambda prepared: app.search_todo_by_date()),
+        ("postpone_today_cold", migrated_file, lambda: feed("y"), lambda prepared: app.postpone_today_todo()),
+        ("postpone_today_warm", migrated_file, lambda: (warm_store(), feed("y")),
+         lambda prepared: app.postpone_today_todo()),
+        ("postpone_yesterday_warm", migrated_file, lambda: (warm_store(), feed("y")),
+         lambda prepared: app.postpone_yesterday_todo()),
+        ("rollover_year_warm", migrated_file, warm_store,
+         lambda prepared: app.rollover_engine.rollover(app.get_days_ago_date(365))),
+        ("report_year_by_month_warm", migrated_file, warm_stats,
+         lambda prepared: app.build_report(app.task_store.day_counts(app.get_days_ago_date(365), app.get_today_date()), "month")),
+        (f"get_func_status_x{FUNC_STATUS_CALLS}", migrated_file, app.init_config, lambda prepared: func_status()),
+    ]
+
+
+def run_size(size, repeat, seed, tmp):
+    raw_file = os.path.join(tmp, f"history_{size}.txt")
+    migrated_file = os.path.join(tmp, f"history_{size}_migrated.txt")
+    generate_history(raw_file, size, seed)
+    os.makedirs(os.path.join(tmp, "work"), exist_ok=True)
+    use_directory(os.path.join(tmp, "work"))
+    reset_storage(raw_file)
+    app.save_text_todos(app.load_text_todos(False))
+    shutil.copy(app.TODO_FILE, migrated_file)
+
+    results = []
+    for name, source, prepare, action in build_scenarios(raw_file, migrated_file):
+        runs = []
+        for _ in range(repeat):
+            reset_storage(source)
+            prepared = prepare() if prepare else None
+            with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+                begin = time.perf_counter()
+                action(prepared)
+                runs.append(time.perf_counter() - begin)
+        results.append({"size": size, "scenario": name, "seconds": runs,
+                        "min": min(runs), "median": statistics.median(runs)})
+        print(f"{size:>9} {name:<28} min {min(runs) * 1000:>10.2f}ms  median {statistics.median(runs) * 1000:>10.2f}ms",
+              file=sys.stderr)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base_file, results):
+    # 按 (规模, 场景) 对比中位数，超过 REGRESSION_RATIO 倍的标记为退化
+    with open(base_file, "r", encoding="utf-8") as f:
+        base = {(r["size"], r["scenario"]): r["median"] for r in json.load(f)["results"]}
+    print(f"\n与 {base_file} 对比（中位数，当前/基准）：", file=sys.stderr)
+    for result in results:
+        key = (result["size"], result["scenario"])
+        if key in base and base[key] > 0:
+            ratio = result["median"] / base[key]
+            mark = "  ⚠️ 退化" if ratio > REGRESSION_RATIO else ""
+            print(f"{key[0]:>9} {key[1]:<28} {ratio:>6.2f}x{mark}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PythonTodo 基准套件")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="结果 JSON 写入文件，默认输出到标准输出")
+    parser.add_argument("--compare", help="与之前保存的结果 JSON 对比")
+    args = parser.parse_args()
+
+    app.ui_sleep = lambda seconds: None
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            results.extend(run_size(size, args.repeat, args.seed, tmp))
+        if app.sqlite_conn is not None:
+            app.sqlite_conn.close()
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": os.environ.get("PYTHONTODO_BACKEND", "text"),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
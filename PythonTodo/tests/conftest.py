@@ -0,0 +1,65 @@
+# 测试公共部分：在临时目录中运行，按清单全局对象工厂重建状态，避免用例之间共用内存视图
+# 服务端和写入进程以子进程方式启动，工作目录为同一临时目录，与测试进程共用任务文件和配置
+import os
+import re
+import sys
+import subprocess
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(APP_DIR, "PythonTodo.py")
+sys.path.insert(0, APP_DIR)
+import PythonTodo as app
+
+
+def reset_state():
+    if app.sqlite_conn is not None:
+        app.sqlite_conn.close()
+    app.sqlite_conn = app.sqlite_conn_path = None
+    module = vars(app)
+    module.update({key: factory() for key, factory in app.LIST_STATE_FACTORIES.items()})
+    app.TODO_FILE = "todo_list.txt"
+    app.switch_registry = app.SwitchRegistry()
+    app.list_manager = app.ListManager()
+    app.write_behind = app.WriteBehind()
+    app.today_pager = app.Pager()
+    app.generation_cache = (None, 0)
+    app.current_action = None
+
+
+def child_env():
+    env = dict(os.environ)
+    for key in ("PYTHONTODO_SERVER", "PYTHONTODO_LIST", "PYTHONTODO_STATS", "PYTHONTODO_CPROFILE"):
+        env.pop(key, None)
+    env["PYTHONIOENCODING"] = "utf-8"
+    return env
+
+
+def run_app(cwd, *args, **kwargs):
+    return subprocess.Popen([sys.executable, APP_SCRIPT, *args], cwd=cwd, env=child_env(), **kwargs)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reset_state()
+    yield tmp_path
+    reset_state()
+
+
+@pytest.fixture
+def start_server(workdir):
+    servers = []
+
+    def start():
+        server = run_app(workdir, "serve", "--port", "0", stdout=subprocess.PIPE, text=True, encoding="utf-8")
+        servers.append(server)
+        match = re.search(r"http://([\d.]+:\d+)", server.stdout.readline())
+        assert match, "服务未启动"
+        return match.group(1)
+
+    yield start
+    for server in servers:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,17 @@
+# 存储后端：首次启用 SQLite 时自动导入全部文本任务，包括已归档的
+import datetime
+
+from conftest import app, reset_state
+
+
+def test_first_sqlite_use_imports_archived_tasks(workdir):
+    old = datetime.date.today() - datetime.timedelta(days=400)
+    with open(app.TODO_FILE, "w", encoding="utf-8") as f:
+        f.write(f"1|归档的任务|{old} 08:00:00|{app.new_task_id()}\n")
+        f.write(f"0|今天的任务|{app.get_format_time()}|{app.new_task_id()}\n")
+    assert app.archive_store.archive(app.get_archive_cutoff(90)) == 1
+
+    app.switch_registry.set_option("STORAGE", "backend", "sqlite")
+    reset_state()
+    assert sorted(task.content for task in app.load_todos(False)) == ["今天的任务", "归档的任务"]
+    assert [task.content for task in app.task_store.get_date(old.isoformat())] == ["归档的任务"]
@@ -0,0 +1,15 @@
+# 命令行子命令：内容中带换行的任务被拒绝，不会拆成文件里的几行
+import pytest
+
+from conftest import app
+
+
+@pytest.mark.parametrize("content", ["数学卷子\n英语卷子", "数学卷子\r英语卷子", "  "])
+def test_add_rejects_line_breaks_and_empty_content(content, workdir):
+    assert app.run_cli(["add", "语文作文", content]) == 1
+    assert app.load_todos(False) == []
+
+
+def test_add_strips_content(workdir):
+    assert app.run_cli(["add", " 语文作文 ", "数学卷子"]) == 0
+    assert [task.content for task in app.load_todos(False)] == ["语文作文", "数学卷子"]
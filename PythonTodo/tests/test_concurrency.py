@@ -0,0 +1,33 @@
+# 多进程并发写入：多个写进程同时对同一份任务文件新增任务并修改状态，任何一次修改都不能丢失或重复
+import os
+import sys
+import subprocess
+
+import pytest
+
+from conftest import app, reset_state, child_env
+
+WORKERS = 6
+COUNT = 100
+WRITER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "writer_process.py")
+
+
+@pytest.mark.parametrize("backend", ["text", "sqlite"])
+def test_concurrent_writers_lose_nothing(backend, workdir):
+    app.switch_registry.set_option("STORAGE", "backend", backend)
+    go_file = os.path.join(workdir, "go")
+    processes = [subprocess.Popen([sys.executable, WRITER_SCRIPT, "stress", str(worker), str(COUNT), go_file],
+                                  cwd=workdir, env=child_env(), stdout=subprocess.PIPE, text=True)
+                 for worker in range(WORKERS)]
+    for process in processes:
+        assert process.stdout.readline().strip() == "ready"
+    open(go_file, "w").close()
+    for process in processes:
+        assert process.wait(timeout=300) == 0
+
+    reset_state()
+    todos = app.load_todos(False)
+    expected = [f"进程{worker}-任务{i}" for worker in range(WORKERS) for i in range(COUNT)]
+    assert sorted(todo.content for todo in todos) == sorted(expected), "新增丢失或重复"
+    assert [todo.content for todo in todos if todo.status != 1] == [], "状态修改丢失"
+    assert app.read_generation() == WORKERS * COUNT * 2
@@ -0,0 +1,73 @@
+# 崩溃恢复：后台写入的进程在随机时刻被 SIGKILL / SIGTERM 结束（常常正在写日志或压缩），
+# 之后任务文件、日志、统计和全文索引都必须能恢复，并满足持久化保证：
+#   - 保留下来的修改是操作序列的一个前缀（不会后面的修改在、前面的丢了），没有重复任务
+#   - SIGKILL：已写盘的修改全部保留；SIGTERM：已完成的修改全部保留（退出前写完排队的修改）
+import os
+import sys
+import time
+import random
+import signal
+import subprocess
+import collections
+
+import pytest
+
+from conftest import app, reset_state, child_env
+
+ROUNDS = 8
+KILL_WINDOW = (0.05, 1.0)  # 子进程就绪后多久结束它（秒）
+WRITER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "writer_process.py")
+
+
+def read_progress(progress_file):
+    acked = flushed = 0
+    with open(progress_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.endswith("\n"):
+                acked, flushed = map(int, line.split())
+    return acked, flushed
+
+
+def kept_operations(todos, acked):
+    # 操作序列：2i=新增任务i，2i+1=把任务i改为已完成；返回保留下来的前缀长度
+    by_content = {todo.content: todo for todo in todos}
+    survived = []
+    for i in range(max(acked // 2, len(todos)) + 1):
+        task = by_content.get(f"任务{i}")
+        survived += [task is not None, task is not None and task.status == 1]
+    kept = survived.index(False)
+    assert not any(survived[kept:]), f"第 {kept} 个操作丢失但之后的操作还在"
+    return kept
+
+
+@pytest.mark.skipif(os.name == "nt", reason="需要 POSIX 信号")
+@pytest.mark.parametrize("round_index", range(ROUNDS))
+def test_writer_killed_mid_flush_recovers(round_index, workdir):
+    sig = (signal.SIGKILL, signal.SIGTERM)[round_index % 2]
+    progress_file = os.path.join(workdir, "progress")
+    process = subprocess.Popen([sys.executable, WRITER_SCRIPT, "crash", progress_file], cwd=workdir, env=child_env(),
+                               stdout=subprocess.PIPE, text=True)
+    assert process.stdout.readline().strip() == "ready"
+    time.sleep(random.Random(round_index).uniform(*KILL_WINDOW))
+    process.send_signal(sig)
+    process.wait()
+    acked, flushed = read_progress(progress_file)
+
+    reset_state()
+    todos = app.load_todos(False)
+    assert len({todo.content for todo in todos}) == len(todos), "存在重复任务"
+    kept = kept_operations(todos, acked)
+    assert kept >= (flushed if sig == signal.SIGKILL else acked)
+
+    # 统计汇总和全文索引的快照+日志接得上就用，接不上就重建，结果都必须与任务一致
+    expected = collections.Counter((todo.task_date, todo.status) for todo in todos)
+    counts = app.stats_rollup.day_counts("0000", "9999")
+    assert collections.Counter({(task_date, status): count for task_date, row in counts.items()
+                                for status, count in enumerate(row) if count}) == expected
+    assert len(app.content_index.search("任务")) == len(todos)
+
+    # 恢复后的日志还能继续追加，新进程读到的与写入的一致
+    app.task_store.add(app.make_task(app.new_task_id(), "恢复后的任务", 1, app.get_format_time()))
+    reset_state()
+    assert len(app.load_todos(False)) == len(todos) + 1
+    assert len(app.content_index.search("任务")) == len(todos) + 1
@@ -0,0 +1,18 @@
+# 多个任务清单：跨清单读取临时切换再切回，不改变界面状态；用户切换清单时今日列表回到第一页
+from conftest import app
+
+
+def test_using_keeps_today_page_and_user_switch_resets_it(workdir, monkeypatch):
+    app.list_manager.add("work")
+    app.task_store.add(app.make_task(app.new_task_id(), "默认清单的任务", 0, app.get_format_time()))
+    app.today_pager.page = 2
+    assert [(name, len(tasks)) for name, tasks in app.list_manager.today_by_list()] == [("default", 1), ("work", 0)]
+    assert app.list_manager.active == "default"
+    assert app.today_pager.page == 2
+
+    answers = iter(["2"])
+    monkeypatch.setattr(app, "ui_input", lambda prompt="": next(answers))
+    monkeypatch.setattr(app, "ui_sleep", lambda seconds: None)
+    app.switch_list_todo()
+    assert app.list_manager.active == "work"
+    assert app.today_pager.page == 0
@@ -0,0 +1,70 @@
+# 派生数据快照：写出的是 JSON 头 + 数组字节，能原样读回；内容被改坏时重建而不是报错或执行其中的内容
+import json
+
+import pytest
+
+from conftest import app
+
+
+def add_tasks(contents):
+    app.task_store.add_many([app.make_task(app.new_task_id(), content, 0, app.get_format_time()) for content in contents])
+
+
+def fail_rebuild(self):
+    raise AssertionError("快照有效时不应重建")
+
+
+def test_content_index_snapshot_round_trip(workdir, monkeypatch):
+    add_tasks(["数学卷子", "英语单词U3表格默写", "数学练习册第12页"])
+    assert [task.content for task in app.content_index.search("数学")] == ["数学卷子", "数学练习册第12页"]
+    with open(app.content_index.get_file(), "rb") as f:
+        header = json.loads(f.readline())
+    assert header["stamp"] == repr(app.get_storage_stamp())
+
+    app.content_index = app.ContentIndex()
+    with monkeypatch.context() as patch:
+        patch.setattr(app.ContentIndex, "rebuild_data", fail_rebuild)
+        assert [task.content for task in app.content_index.search("数学")] == ["数学卷子", "数学练习册第12页"]
+        add_tasks(["数学大报"])  # 增量记在日志里，不重建
+        assert len(app.content_index.search("数学")) == 3
+        app.content_index = app.ContentIndex()
+        assert len(app.content_index.search("数学")) == 3
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: b"\x80\x04garbage",
+    lambda data: data[:-2],
+    lambda data: data.replace(b'"doc_ids": [', b'"doc_ids": {"x": 1}, "old": ['),
+])
+def test_content_index_rebuilds_damaged_snapshot(workdir, damage):
+    add_tasks(["数学卷子", "英语单词U3表格默写"])
+    app.content_index.search("数学")
+    path = app.content_index.get_file()
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(damage(data))
+    app.content_index = app.ContentIndex()
+    assert [task.content for task in app.content_index.search("数学")] == ["数学卷子"]
+
+
+def test_stats_rollup_snapshot_round_trip(workdir, monkeypatch):
+    add_tasks(["数学卷子", "英语卷子"])
+    today = app.get_today_date()
+    assert app.stats_rollup.day_counts(today, today) == {today: (2, 0, 0, 0)}
+    app.stats_rollup = app.StatsRollup()
+    with monkeypatch.context() as patch:
+        patch.setattr(app.StatsRollup, "rebuild_data", fail_rebuild)
+        assert app.stats_rollup.day_counts(today, today) == {today: (2, 0, 0, 0)}
+    with open(app.stats_rollup.get_file(), "rb") as f:
+        header = json.loads(f.readline())
+    header["data"][today] = ["2", 0, 0, 0]
+    with open(app.stats_rollup.get_file(), "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+    app.stats_rollup = app.StatsRollup()
+    assert app.stats_rollup.day_counts(today, today) == {today: (2, 0, 0, 0)}
+
+
+def test_weekly_report_keeps_legacy_dates():
+    rows = dict(app.build_report({"2026/01/13": (1, 0, 0, 0), "2026-01-13": (0, 1, 0, 0), "2026-01-18": (0, 1, 0, 0)}, "week"))
+    assert rows == {"2026/01/13": [1, 0, 0, 0], "2026-01-12 起一周": [0, 2, 0, 0], "合计": [1, 2, 0, 0]}
@@ -0,0 +1,107 @@
+# 瘦客户端回归：逐个关闭功能开关，界面刷新和其余菜单操作都不能被服务端拒绝，被关闭的操作必须被拒绝
+import datetime
+
+import pytest
+
+from conftest import app
+
+# 按菜单操作顺序执行，每项为 (操作, 依次输入的内容)；积压顺延排在顺延昨日之前，清空今日放在最后
+def action_script():
+    today = datetime.date.today()
+    yesterday = today - datetime.timedelta(days=1)
+    return [
+        ("add_todo", lambda todos: app.add_todo(todos), ["新任务"]),
+        ("edit_todo", lambda todos: app.edit_todo(todos), ["1", "改过的今日任务"]),
+        ("edit_history_content", lambda todos: app.edit_history_todo_content(), [f"{yesterday:%Y%m%d}", "1", "改过的昨日任务"]),
+        ("edit_history_status", lambda todos: app.edit_history_todo_status(), [f"{yesterday:%Y%m%d}", "1", "2"]),
+        ("edit_today_status", lambda todos: app.complete_todo(todos), ["1", "1"]),
+        ("delete_todo", lambda todos: app.delete_todo(todos), ["2"]),
+        ("rollover_backlog", lambda todos: app.rollover_backlog_todo(), ["", "y"]),
+        ("postpone_yesterday", lambda todos: app.postpone_yesterday_todo(), ["y"]),
+        ("postpone_todo", lambda todos: app.postpone_today_todo(), ["y"]),
+        ("search_todo", lambda todos: app.search_todo_by_date(), [f"{today:%Y%m%d}", "", ""]),
+        ("search_content", lambda todos: app.search_todo_by_content(), ["任务", ""]),
+        ("report", lambda todos: app.report_todo(), ["", "2", ""]),
+        ("recurring", lambda todos: app.recurring_todo(), ["1", "每天的任务", "1", "", "2", "1", "0"]),
+        ("clear_today", lambda todos: app.clear_today_todo(), ["y"]),
+    ]
+
+# 只读取不受开关控制的接口的操作，关闭开关后服务端照常应答，由界面自己拦下
+UNGATED_ACTIONS = {"search_todo", "report"}
+
+
+def seed_tasks():
+    today = datetime.date.today()
+    lines = [f"0|今日任务{n}|{today} 08:0{n}:00" for n in range(1, 5)]
+    for days in (1, 1, 3):
+        lines.append(f"0|{days}天前的任务|{today - datetime.timedelta(days=days)} 09:00:00")
+    with open(app.TODO_FILE, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def run_action(func_key, action, inputs, monkeypatch):
+    # 与主菜单相同：先按当前状态渲染一帧，再带着操作名执行
+    feed = iter(inputs)
+    monkeypatch.setattr(app, "ui_input", lambda prompt="": next(feed))
+    todos = app.task_store.get_today()
+    app.show_todos(todos)
+    app.current_action = func_key
+    try:
+        action(todos)
+    finally:
+        app.current_action = None
+    return list(feed)
+
+
+@pytest.mark.parametrize("disabled", [key for key in app.FUNCTIONS if key not in ("switch_list", "all_lists_today", "admin_entrance")])
+def test_thin_client_with_switch_disabled(disabled, start_server, monkeypatch):
+    seed_tasks()
+    app.set_func_status(disabled, False)
+    address = start_server()
+    monkeypatch.setattr(app, "task_store", app.RemoteTaskStore(address))
+    monkeypatch.setattr(app, "ui_sleep", lambda seconds: None)
+    script = action_script()
+
+    # 界面的开关缓存过期时（例如管理员在别的进程里刚关掉），请求到了服务端也必须被拒绝
+    with monkeypatch.context() as patch:
+        patch.setattr(app, "get_func_status", lambda func_key: True)
+        for func_key, action, inputs in script:
+            if func_key == disabled and func_key not in UNGATED_ACTIONS:
+                with pytest.raises(PermissionError, match="已被管理员关闭"):
+                    run_action(func_key, action, inputs, patch)
+
+    for func_key, action, inputs in script:
+        remaining = run_action(func_key, action, inputs, monkeypatch)
+        if func_key != disabled:
+            assert not remaining, f"{func_key} 未执行完"
+    app.show_todos(app.task_store.get_today())
+    assert app.task_store.get_today() == [] or disabled == "clear_today"
+
+
+def test_server_rejects_foreign_requests(start_server):
+    import http.client
+    import json
+    address = start_server()
+    with open(app.get_token_file(), encoding="utf-8") as f:
+        token = f.read()
+    host, _, port = address.partition(":")
+    body = json.dumps({"tasks": [{"content": "跨站写入"}]}).encode("utf-8")
+    valid = {"Host": address, "Content-Type": "application/json", "X-Todo-Token": token}
+
+    def post(**changes):
+        conn = http.client.HTTPConnection(host, int(port), timeout=10)
+        headers = {key: value for key, value in dict(valid, **changes).items() if value is not None}
+        conn.request("POST", "/add", body, headers)
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        return response.status
+
+    assert post(**{"X-Todo-Token": None}) == 403
+    assert post(**{"X-Todo-Token": "0" * len(token)}) == 403
+    assert post(Origin="http://evil.example") == 403
+    assert post(Host=f"evil.example:{port}") == 403
+    assert post(**{"Content-Type": "text/plain"}) == 403
+    assert app.RemoteTaskStore(address).get_today() == []
+    assert post() == 200
+    assert [task.content for task in app.RemoteTaskStore(address).get_today()] == ["跨站写入"]
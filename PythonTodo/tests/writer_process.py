@@ -0,0 +1,54 @@
+# 测试用的写入子进程：在测试的临时目录中运行，任务文件和配置都用相对路径
+# 用法：python tests/writer_process.py crash 进度文件
+#       python tests/writer_process.py stress 进程编号 任务数 开始标记文件
+import os
+import sys
+import time
+import random
+
+from conftest import app
+
+CRASH_COMPACT_SIZE = 8 * 1024  # 日志压缩阈值调小，让结束进程的时刻也落在压缩过程中
+CRASH_INTERVAL = 0.05
+STRESS_COMPACT_SIZE = 16 * 1024  # 多个进程同时写时，压缩与追加频繁交错
+
+
+def crash(progress_file):
+    # 按界面的方式持锁修改、等待时放开，不停地新增任务再改为已完成，直到被测试结束；
+    # 每完成一次操作记下「已完成的操作数 已写盘的提交数」
+    app.JOURNAL_COMPACT_SIZE = CRASH_COMPACT_SIZE
+    app.write_behind.lock.acquire()
+    app.write_behind.start(CRASH_INTERVAL)
+    app.install_flush_signals()
+    app.task_store.refresh()
+    rng = random.Random()
+    with open(progress_file, "a", encoding="utf-8", buffering=1) as progress:
+        print("ready", flush=True)
+        i = 0
+        while True:
+            task = app.make_task(app.new_task_id(), f"任务{i}", 0, app.get_format_time())
+            app.task_store.add(task)
+            app.task_store.set_status(task.id, 1)
+            progress.write(f"{2 * i + 2} {app.write_behind.flushed}\n")
+            i += 1
+            with app.write_behind.idle():
+                time.sleep(rng.random() * 0.005)
+
+
+def stress(worker, count, go_file):
+    # 与交互界面一样先持有已加载的内存视图，所有写进程就绪后同时开始，别的进程写入后该视图就会过期
+    app.JOURNAL_COMPACT_SIZE = STRESS_COMPACT_SIZE
+    app.task_store.refresh()
+    print("ready", flush=True)
+    while not os.path.exists(go_file):
+        time.sleep(0.001)
+    for i in range(int(count)):
+        task = app.make_task(app.new_task_id(), f"进程{worker}-任务{i}", 0, app.get_format_time())
+        app.task_store.add(task)
+        app.task_store.set_status(task.id, 1)
+
+
+MODES = {"crash": crash, "stress": stress}
+
+if __name__ == "__main__":
+    MODES[sys.argv[1]](*sys.argv[2:])